@@ -0,0 +1,59 @@
+"""Overhead of the raw capture on the ingest path.
+
+Feeds a synthetic capture in serial-sized blocks through framing and packet
+parsing, and through a CaptureWriter. Reports the capture time relative to
+the ingest time and the CPU-share of capturing a saturated serial line.
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+from bench_framing import synthetic_capture
+from bistmon.capture import CaptureWriter
+from bistmon.framing import FrameParser
+from bistmon.framing import FrameType
+from bistmon.packet import parse_packet
+
+BLOCK_SIZES = (64, 512, 4096)  # busy UART with small reads, in_waiting of a slow reader
+LINE_RATE = 115200 / 10  # bytes/s of a serial port at 115200 baud
+
+
+def ingest(blocks: list[bytes]) -> float:
+    framer = FrameParser()
+    t_start = time.perf_counter()
+    for block in blocks:
+        for frame_type, payload in framer.feed(block):
+            parse_packet(payload, has_packet_id=frame_type == FrameType.CHUNK)
+    return time.perf_counter() - t_start
+
+
+def capture(blocks: list[bytes], writer: CaptureWriter, port: int) -> float:
+    """Duration of queueing the blocks, packing the records and writing them (no fsync)."""
+    t_start = time.perf_counter()
+    for block in blocks:
+        writer.write(port, block)
+    writer.flush(fsync=False)
+    return time.perf_counter() - t_start
+
+
+if __name__ == "__main__":
+    data = synthetic_capture(4 * 1024 * 1024)
+    # flushed in capture(), so the background thread does not disturb the timing
+    with (
+        tempfile.TemporaryDirectory() as path,
+        CaptureWriter(Path(path) / "capture.bin", flush_interval=3600) as writer,
+    ):
+        port = writer.add_port("bench")
+        for block_size in BLOCK_SIZES:
+            blocks = [data[pos : pos + block_size] for pos in range(0, len(data), block_size)]
+            duration_ingest = min(ingest(blocks) for _ in range(5))
+            duration_capture = min(capture(blocks, writer, port) for _ in range(5))
+            print(
+                f"block {block_size:4d} B: "
+                f"ingest {len(data) / duration_ingest / 1e6:5.2f} MB/s, "
+                f"capture {1e9 * duration_capture / len(blocks):4.0f} ns/block, "
+                f"overhead {100 * duration_capture / duration_ingest:4.1f} %, "
+                # CPU-time for capturing a saturated serial line
+                f"CPU at 115200 baud {100 * duration_capture / len(data) * LINE_RATE:.3f} %"
+            )
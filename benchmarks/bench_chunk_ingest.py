@@ -0,0 +1,62 @@
+"""Ingest of chunks from their CBOR bytes into the collector.
+
+A large device sends its first session (new connections) and further
+sessions (known connections, only counted). Every chunk is decoded with
+Packet.from_raw and handed to process_chunk, like a recording is loaded.
+"""
+
+import logging
+import random
+import time
+
+from bistmon.config_framework import ConnectionType
+from bistmon.config_framework import FrameworkKey
+from bistmon.data_storage import DeviceDataCollector
+from bistmon.logger import log
+from bistmon.packet import Packet
+from bistmon.simulator import VirtualDevice
+
+FAMILY = "NRF52840"
+SESSIONS = 4
+CONNECTIONS_PER_PIN = 6
+
+
+def ingest(device: VirtualDevice, chunks: list[list[bytes]]) -> list[float]:
+    """Microseconds per chunk of every session."""
+    collector = DeviceDataCollector()
+    collector.process_header(Packet.from_raw(device.header()))
+    durations = []
+    for session_chunks in chunks:
+        t_start = time.perf_counter()
+        for chunk_id, raw in enumerate(session_chunks):
+            collector.process_chunk(Packet.from_raw(raw, chunk_id))
+        durations.append(1e6 * (time.perf_counter() - t_start) / len(session_chunks))
+    return durations
+
+
+if __name__ == "__main__":
+    log.setLevel(logging.WARNING)
+    print(" pins | pins/chunk | bytes/chunk | 1st session us/chunk | later sessions us/chunk")
+    for n_pins, pins_per_chunk in ((256, 8), (1024, 8), (1024, 32)):
+        device = VirtualDevice(
+            FAMILY, pins=n_pins, sessions=SESSIONS, pins_per_chunk=pins_per_chunk, seed=0
+        )
+        rng = random.Random(0)
+        for connections in device.connections:  # more connections than the simulated shorts
+            connections += [
+                {
+                    FrameworkKey.CONNECTION_TYPE: ConnectionType.INTERNAL,
+                    FrameworkKey.OTHER_PIN: rng.randrange(n_pins),
+                    FrameworkKey.CONNECTION_PARAMETER: rng.randrange(6),
+                }
+                for _ in range(CONNECTIONS_PER_PIN)
+            ]
+        chunks = [
+            [device.chunk(session, chunk_id) for chunk_id in range(device.total_chunks)]
+            for session in range(SESSIONS)
+        ]
+        size = sum(len(raw) for raw in chunks[0]) / len(chunks[0])
+        runs = [ingest(device, chunks) for _ in range(5)]
+        first = min(run[0] for run in runs)
+        later = min(sum(run[1:]) / (SESSIONS - 1) for run in runs)
+        print(f"{n_pins:5} | {pins_per_chunk:10} | {size:11.0f} | {first:20.1f} | {later:23.1f}")
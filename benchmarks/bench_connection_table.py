@@ -0,0 +1,109 @@
+"""Columnar connection-table compared to the former connection-dicts.
+
+Measures the memory of the connections of a large synthetic device and the
+time of the consumers: weak- and phase-masking, the six phase matrices and
+the vector analysis. The former dict-based phase masking is timed alongside.
+Repeated sessions report the same connections, the table holds each once
+(the size includes the index used to find them again).
+"""
+
+import logging
+import sys
+import time
+import tracemalloc
+
+from bistmon.config_framework import ConnectionType
+from bistmon.config_framework import FrameworkKey
+from bistmon.connection_analyzer import analyze_connections
+from bistmon.connection_table import COLUMNS
+from bistmon.data_storage import DeviceDataCollector
+from bistmon.logger import log
+from bistmon.packet import Packet
+from bistmon.phase_masking import keep_phase
+from bistmon.simulator import VirtualDevice
+
+FAMILY = "NRF52840"
+SESSIONS = 7
+
+
+def legacy_connections(device: dict) -> list[list[dict]]:
+    """Connection-dicts per pin, as stored before the table."""
+    return [
+        [
+            {
+                FrameworkKey.OTHER_PIN: conn[FrameworkKey.OTHER_PIN],
+                FrameworkKey.CONNECTION_PARAMETER: conn[FrameworkKey.CONNECTION_PARAMETER],
+                FrameworkKey.CONNECTION_TYPE: conn[FrameworkKey.CONNECTION_TYPE],
+                "masked": conn["masked"],
+            }
+            for conn in pin["connections"]
+            for _ in range(conn["count"])  # every session added its connections again
+        ]
+        for pin in device["pins"]
+    ]
+
+
+def legacy_phase_masking(pins: list[int], connections: list[list[dict]]) -> None:
+    connection_pairs = {}
+    for pin, pin_connections in zip(pins, connections, strict=True):
+        for conn in pin_connections:
+            if conn.get(FrameworkKey.CONNECTION_TYPE, 0) == ConnectionType.INTERNAL:
+                phase = conn.get(FrameworkKey.CONNECTION_PARAMETER, -1)
+                if 0 <= phase <= 5:
+                    pair = (pin, conn.get(FrameworkKey.OTHER_PIN))
+                    if pair not in connection_pairs:
+                        connection_pairs[pair] = {"phases": set(), "connections": []}
+                    connection_pairs[pair]["phases"].add(phase)
+                    connection_pairs[pair]["connections"].append(conn)
+    for pair_data in connection_pairs.values():
+        for conn in pair_data["connections"]:
+            phase = conn.get(FrameworkKey.CONNECTION_PARAMETER, -1)
+            conn["phase_masked"] = not keep_phase(phase, pair_data["phases"])
+
+
+def collect(n_pins: int) -> DeviceDataCollector:
+    device = VirtualDevice(FAMILY, pins=n_pins, sessions=SESSIONS, pins_per_chunk=8, seed=0)
+    collector = DeviceDataCollector()
+    collector.process_header(Packet.from_raw(device.header()))
+    for session in range(SESSIONS):
+        for chunk_id in range(device.total_chunks):
+            collector.process_chunk(Packet.from_raw(device.chunk(session, chunk_id), chunk_id))
+    return collector
+
+
+def timed(function) -> float:  # noqa: ANN001
+    t_start = time.perf_counter()
+    function()
+    return 1e3 * (time.perf_counter() - t_start)
+
+
+if __name__ == "__main__":
+    log.setLevel(logging.WARNING)
+    print("durations in ms: former phase-masking, phase-masking, weak-masking,")
+    print("                 6 phase-matrices, vector-analysis")
+    print(" pins | connections | dicts kB | table kB |    durations")
+    for n_pins in (64, 512, 4096):
+        collector = collect(n_pins)
+        device = collector.devices[FAMILY]
+        pins = [pin["pin"] for pin in device["pins"]]
+
+        tracemalloc.start()
+        connections = legacy_connections(device)
+        size_dicts = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        table = device["connections"]
+        size_table = sum(table.column(name).nbytes for name in COLUMNS)
+        size_table += sys.getsizeof(table._row_of)  # noqa: SLF001
+        size_table += sum(sys.getsizeof(key) for key in table._row_of)  # noqa: SLF001
+
+        durations = [
+            timed(lambda: legacy_phase_masking(pins, connections)),  # noqa: B023
+            timed(lambda: collector._apply_phase_masking(FAMILY)),  # noqa: B023, SLF001
+            timed(lambda: collector._filter_weak_connections(FAMILY)),  # noqa: B023, SLF001
+            timed(lambda: [collector.create_phase_matrix(FAMILY, p) for p in range(6)]),  # noqa: B023
+            timed(lambda: analyze_connections(collector)),  # noqa: B023
+        ]
+        print(
+            f"{n_pins:5} | {len(table):11} | {size_dicts / 1e3:8.0f} | {size_table / 1e3:8.0f} | "
+            + " | ".join(f"{duration:8.1f}" for duration in durations)
+        )
@@ -0,0 +1,75 @@
+"""Memory of the device model of a fleet of 100 devices.
+
+Devices and pins are __slots__ objects now, before they were dicts with the
+same keys. The dicts are rebuilt from the objects to compare the size of
+the containers (the values, i.e. connection-tables and raw chunks, are
+shared). The total is the memory allocated while collecting the fleet.
+Reading a field of every pin is timed for the dicts, the attributes and the
+dict-compatible access of the objects.
+"""
+
+import logging
+import sys
+import time
+import tracemalloc
+
+from bistmon.data_storage import DeviceDataCollector
+from bistmon.logger import log
+from bistmon.packet import Packet
+from bistmon.simulator import VirtualDevice
+
+N_DEVICES = 100
+N_PINS = 48
+SESSIONS = 3
+
+
+def fleet() -> DeviceDataCollector:
+    collector = DeviceDataCollector()
+    for index in range(N_DEVICES):
+        device = VirtualDevice(f"DEV{index}", pins=N_PINS, sessions=SESSIONS, seed=index)
+        collector.process_header(Packet.from_raw(device.header()))
+        for session in range(SESSIONS):
+            for chunk_id in range(device.total_chunks):
+                collector.process_chunk(Packet.from_raw(device.chunk(session, chunk_id), chunk_id))
+    return collector
+
+
+def size_of_containers(devices: dict) -> int:
+    return sum(
+        sys.getsizeof(device) + sum(sys.getsizeof(pin) for pin in device["pins"])
+        for device in devices.values()
+    )
+
+
+def timed(function) -> float:  # noqa: ANN001
+    t_start = time.perf_counter()
+    for _ in range(100):
+        function()
+    return 1e3 * (time.perf_counter() - t_start) / 100
+
+
+if __name__ == "__main__":
+    log.setLevel(logging.WARNING)
+    tracemalloc.start()
+    collector = fleet()
+    size_total = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    devices = collector.devices
+    dicts = {
+        family: {**device, "pins": [dict(pin) for pin in device["pins"]]}
+        for family, device in devices.items()
+    }
+    size_slots = size_of_containers(devices)
+    size_dicts = size_of_containers(dicts)
+    print(f"{N_DEVICES} devices, {N_PINS} pins, {SESSIONS} sessions")
+    print(f"collected total        {size_total / 1e3:8.0f} kB")
+    print(f"devices + pins, dicts  {size_dicts / 1e3:8.0f} kB")
+    print(f"devices + pins, slots  {size_slots / 1e3:8.0f} kB")
+
+    all_pins = [pin for device in devices.values() for pin in device["pins"]]
+    all_dicts = [pin for device in dicts.values() for pin in device["pins"]]
+    print("events-mask of every pin:")
+    print(f"  dicts    pin[key]    {timed(lambda: [p['events_mask'] for p in all_dicts]):6.3f} ms")
+    print(f"  slots    pin.field   {timed(lambda: [p.events_mask for p in all_pins]):6.3f} ms")
+    print(f"  slots    pin[key]    {timed(lambda: [p['events_mask'] for p in all_pins]):6.3f} ms")
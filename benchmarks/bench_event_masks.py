@@ -0,0 +1,66 @@
+"""Event-masks as primary representation compared to lists of event-names.
+
+Measures decoding (former 32-bit loop vs. byte lookup table), the strength
+analysis (name membership tests vs. bit tests vs. a table of the 12 check-bits,
+per pin and for an array of masks) and the memory of the events of 100k pins.
+"""
+
+import random
+import timeit
+import tracemalloc
+
+import numpy as np
+from bistmon.event_decoder import PIN_EVENT_TYPES
+from bistmon.event_decoder import decode_event_type_one_hot
+from bistmon.pin_analyzer import _analyze_checks
+from bistmon.pin_analyzer import analyze_pin
+from bistmon.pin_analyzer import analyze_pin_mask
+from bistmon.pin_analyzer import analyze_pin_masks
+from bistmon.simulator import VirtualDevice
+
+N_PINS = 100_000
+
+
+def legacy_decode(event_bits: int) -> list[str]:
+    """Former implementation, looping over all 32 bits."""
+    return [
+        PIN_EVENT_TYPES.get(bit_position, f"UNKNOWN_EVENT_{bit_position}")
+        for bit_position in range(32)
+        if event_bits & (1 << bit_position)
+    ]
+
+
+def allocated(factory) -> int:  # noqa: ANN001
+    tracemalloc.start()
+    data = factory()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del data
+    return size
+
+
+if __name__ == "__main__":
+    # realistic masks: step-results of the simulator plus random other events
+    rng = random.Random(0)
+    masks = [
+        mask | rng.getrandbits(13) for mask in VirtualDevice(pins=N_PINS // 8, seed=0).events
+    ] * 8
+    names = [legacy_decode(mask) for mask in masks]
+
+    for label, function, data in (
+        ("decode, 32-bit loop     ", legacy_decode, masks),
+        ("decode, byte-table      ", decode_event_type_one_hot, masks),
+        ("analyze_pin(names)      ", analyze_pin, names),
+        ("analyze, bit tests      ", _analyze_checks, masks),
+        ("analyze_pin_mask(mask)  ", analyze_pin_mask, masks),
+    ):
+        duration = min(timeit.repeat(lambda f=function, d=data: list(map(f, d)), number=1))
+        print(f"{label}: {1e9 * duration / N_PINS:6.0f} ns/pin")
+    mask_array = np.array(masks, dtype=np.int64)
+    duration = min(timeit.repeat(lambda: analyze_pin_masks(mask_array), number=1))
+    print(f"analyze_pin_masks(array): {1e9 * duration / N_PINS:6.1f} ns/pin")
+
+    size_names = allocated(lambda: [legacy_decode(mask) for mask in masks])
+    size_masks = allocated(lambda: [mask | (1 << 30) for mask in masks])  # fresh int objects
+    print(f"memory per pin, names + mask: {(size_names + size_masks) / N_PINS:6.0f} B")
+    print(f"memory per pin, mask only:    {size_masks / N_PINS:6.0f} B")
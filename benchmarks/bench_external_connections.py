@@ -0,0 +1,75 @@
+"""External connection matrices of all device pairs of a fleet.
+
+Every pin of every device has an external connection to a random device.
+The matrices of all ordered pairs are built from the edge list of the
+collector and, for reference, by the former rescan of all connections of
+device a per pair.
+"""
+
+import logging
+import random
+import time
+
+import numpy as np
+from bistmon.config_framework import ConnectionType
+from bistmon.config_framework import FrameworkKey
+from bistmon.data_storage import DeviceDataCollector
+from bistmon.logger import log
+from bistmon.packet import Packet
+from bistmon.simulator import VirtualDevice
+
+N_PINS = 48
+
+
+def fleet(n_devices: int) -> DeviceDataCollector:
+    rng = random.Random(0)
+    collector = DeviceDataCollector()
+    for index in range(n_devices):
+        device = VirtualDevice(f"DEV{index}", pins=N_PINS, sessions=1, seed=index)
+        for connections in device.connections:
+            connections.append(
+                {
+                    FrameworkKey.CONNECTION_TYPE: ConnectionType.EXTERNAL,
+                    FrameworkKey.OTHER_PIN: rng.randrange(N_PINS),
+                    FrameworkKey.CONNECTION_PARAMETER: f"DEV{rng.randrange(n_devices)}",
+                }
+            )
+        collector.process_header(Packet.from_raw(device.header()))
+        for chunk_id in range(device.total_chunks):
+            collector.process_chunk(Packet.from_raw(device.chunk(0, chunk_id), chunk_id))
+    return collector
+
+
+def legacy_connection_array(collector: DeviceDataCollector, family_a, family_b) -> np.ndarray:  # noqa: ANN001
+    pins_a = [pin["pin"] for pin in collector.devices[family_a]["pins"]]
+    pins_b = [pin["pin"] for pin in collector.devices[family_b]["pins"]]
+    matrix = np.zeros((len(pins_a), len(pins_b)), dtype=np.int64)
+    for row, pin in enumerate(collector.devices[family_a]["pins"]):
+        for conn in pin["connections"]:
+            if conn[FrameworkKey.CONNECTION_TYPE] == ConnectionType.EXTERNAL:
+                other = conn[FrameworkKey.OTHER_PIN]
+                if conn[FrameworkKey.CONNECTION_PARAMETER] == family_b and other in pins_b:
+                    matrix[row, pins_b.index(other)] = 1
+    return matrix
+
+
+if __name__ == "__main__":
+    log.setLevel(logging.WARNING)
+    print(" devices | pairs | rescan per pair ms | edge list ms")
+    for n_devices in (4, 16, 64):
+        collector = fleet(n_devices)
+        pairs = [(a, b) for a in collector.devices for b in collector.devices if a != b]
+
+        t_start = time.perf_counter()
+        legacy = [legacy_connection_array(collector, a, b) for a, b in pairs]
+        duration_legacy = time.perf_counter() - t_start
+
+        t_start = time.perf_counter()
+        matrices = [collector.create_connection_array(a, b) for a, b in pairs]
+        duration = time.perf_counter() - t_start
+        assert all(np.array_equal(x, y) for x, y in zip(legacy, matrices, strict=True))
+
+        print(
+            f"{n_devices:8} | {len(pairs):5} | {1e3 * duration_legacy:18.1f} "
+            f"| {1e3 * duration:12.1f}"
+        )
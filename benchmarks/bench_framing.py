@@ -0,0 +1,135 @@
+"""Throughput of the framing engine on a synthetic multi-megabyte capture.
+
+Compares the FrameParser and DebugLineExtractor with the former per-byte loops.
+"""
+
+import random
+import time
+from collections.abc import Callable
+
+import cbor2
+from bistmon.config_framework import FrameworkKey
+from bistmon.framing import CHUNK_END
+from bistmon.framing import CHUNK_START
+from bistmon.framing import HEADER_END
+from bistmon.framing import HEADER_START
+from bistmon.framing import DebugLineExtractor
+from bistmon.framing import FrameParser
+from bistmon.framing import FrameType
+from bistmon.framing import encode_frame
+
+READ_SIZE = 4096  # typical size of one serial.read()
+
+
+def synthetic_capture(size: int, seed: int = 42) -> bytes:
+    """Chunks with a few pins and connections, mixed with DEBUG-lines."""
+    rng = random.Random(seed)
+    data = bytearray()
+    packet_id = 0
+    while len(data) < size:
+        pins = [
+            {
+                FrameworkKey.PIN: rng.randrange(64),
+                FrameworkKey.EVENTS: rng.getrandbits(26),
+                FrameworkKey.CONNECTIONS: [
+                    {
+                        FrameworkKey.OTHER_PIN: rng.randrange(64),
+                        FrameworkKey.CONNECTION_PARAMETER: rng.randrange(6),
+                        FrameworkKey.CONNECTION_TYPE: 0,
+                    }
+                    for _ in range(rng.randrange(4))
+                ],
+            }
+            for _ in range(2)
+        ]
+        cbor = cbor2.dumps({FrameworkKey.CHUNK_ID: packet_id, FrameworkKey.PINS: pins})
+        data += encode_frame(FrameType.CHUNK, cbor, packet_id)
+        packet_id += 1
+        if packet_id % 16 == 0:
+            data += f"\nDEBUG: chunk {packet_id} sent\n".encode()
+    return bytes(data)
+
+
+def legacy_frames(reads: list[bytes]) -> int:
+    """Former state machine of packet_processor (framing only)."""
+    frames = 0
+    buffer = bytearray()
+    packet_data = bytearray()
+    receiving_header = receiving_chunk = False
+    for new_data in reads:
+        buffer.extend(new_data)
+        while len(buffer) >= 4:
+            if buffer[:4] == HEADER_START:
+                receiving_header = True
+                packet_data = bytearray()
+                buffer = buffer[4:]
+            elif buffer[:4] in (HEADER_END, CHUNK_END):
+                if buffer[:4] == HEADER_END:
+                    receiving_header = False
+                else:
+                    receiving_chunk = False
+                if packet_data:
+                    frames += 1
+                packet_data = bytearray()
+                buffer = buffer[4:]
+            elif buffer[:4] == CHUNK_START:
+                receiving_chunk = True
+                packet_data = bytearray()
+                buffer = buffer[4:]
+            elif receiving_header or receiving_chunk:
+                packet_data.append(buffer[0])
+                buffer = buffer[1:]
+            else:
+                buffer = buffer[1:]
+    return frames
+
+
+def frame_parser_frames(reads: list[bytes]) -> int:
+    framer = FrameParser()
+    frames = 0
+    for new_data in reads:
+        for _ in framer.feed(new_data):
+            frames += 1
+    return frames
+
+
+def legacy_debug_lines(reads: list[bytes]) -> int:
+    """Former per-byte DEBUG-extraction of packet_processor."""
+    lines = 0
+    debug_buffer = bytearray()
+    for new_data in reads:
+        for byte in new_data:
+            debug_buffer.append(byte)
+            if byte == ord("\n"):
+                line_text = debug_buffer.decode("utf-8", errors="ignore").strip()
+                if line_text.startswith("DEBUG:"):
+                    lines += 1
+                debug_buffer.clear()
+            elif len(debug_buffer) > 1000:
+                debug_buffer.clear()
+    return lines
+
+
+def extractor_debug_lines(reads: list[bytes]) -> int:
+    extractor = DebugLineExtractor()
+    return sum(len(extractor.feed(new_data)) for new_data in reads)
+
+
+def measure(name: str, func: Callable[[list[bytes]], int], data: bytes) -> None:
+    reads = [data[i : i + READ_SIZE] for i in range(0, len(data), READ_SIZE)]
+    t_start = time.perf_counter()
+    frames = func(reads)
+    duration = time.perf_counter() - t_start
+    print(
+        f"{name:>18}: {len(data) / 1e6:6.1f} MB, {frames:7d} items, "
+        f"{len(data) / 1e6 / duration:8.2f} MB/s"
+    )
+
+
+if __name__ == "__main__":
+    capture = synthetic_capture(16 * 2**20)
+    measure("FrameParser", frame_parser_frames, capture)
+    # the per-byte machine is too slow for the full capture
+    measure("legacy framing", legacy_frames, capture[: 2**20])
+    measure("DebugLineExtractor", extractor_debug_lines, capture)
+    measure("legacy debug-lines", legacy_debug_lines, capture[: 2**20])
@@ -0,0 +1,136 @@
+"""Idle CPU-load and wake-up latency of the serial ingest for 1 vs 16 idle ports.
+
+Every port is a pseudo-terminal (linux / macOS only) served by a reader- and
+processor-thread, once with the former busy-polling loops and once with the
+blocking implementation of concurrent_monitor.
+"""
+
+import logging
+import os
+import queue
+import statistics
+import threading
+import time
+from collections.abc import Callable
+
+import cbor2
+from bistmon.ack_writer import AckWriter
+from bistmon.concurrent_monitor import packet_processor
+from bistmon.concurrent_monitor import serial_reader
+from bistmon.framing import FrameParser
+from bistmon.framing import FrameType
+from bistmon.framing import encode_frame
+from bistmon.logger import log
+from bistmon.ring_buffer import ByteRingBuffer
+from serial import Serial
+
+IDLE_DURATION = 3.0  # s
+N_WAKEUPS = 20
+
+
+class LatencyCollector:
+    """Stand-in for the packet-queue of the collector that only timestamps received packets."""
+
+    def __init__(self) -> None:
+        self.received = queue.Queue()
+
+    def put(self, _item: object) -> None:
+        self.received.put(time.perf_counter())
+
+
+def polling_reader(serial: Serial, data_queue: queue.Queue, stop_event: threading.Event) -> None:
+    """Former serial_reader: polls in_waiting every 1 ms."""
+    while not stop_event.is_set():
+        if serial.in_waiting:
+            data_queue.put(serial.read(serial.in_waiting))
+        else:
+            time.sleep(0.001)
+
+
+def polling_processor(
+    _serial: Serial, data_queue: queue.Queue, stop_event: threading.Event, collector: object
+) -> None:
+    """Former packet_processor: spins on get_nowait() with 0.1 ms sleeps."""
+    framer = FrameParser()
+    while not stop_event.is_set():
+        try:
+            new_data = data_queue.get_nowait()
+        except queue.Empty:
+            time.sleep(0.0001)
+            continue
+        for _, _payload in framer.feed(new_data):
+            collector.put(None)
+
+
+def polling_port(
+    serial: Serial, stop_event: threading.Event, collector: LatencyCollector
+) -> list[threading.Thread]:
+    data_queue = queue.Queue(maxsize=1000)
+    return [
+        threading.Thread(target=polling_reader, args=(serial, data_queue, stop_event)),
+        threading.Thread(
+            target=polling_processor, args=(serial, data_queue, stop_event, collector)
+        ),
+    ]
+
+
+def blocking_port(
+    serial: Serial, stop_event: threading.Event, collector: LatencyCollector
+) -> list[threading.Thread]:
+    rx_buffer = ByteRingBuffer()
+    ack_writer = AckWriter(serial)
+    return [
+        threading.Thread(target=serial_reader, args=(serial, rx_buffer, stop_event)),
+        threading.Thread(
+            target=packet_processor,
+            args=(rx_buffer, stop_event, ack_writer, collector, None),
+        ),
+    ]
+
+
+def measure(name: str, create_port: Callable, n_ports: int) -> None:
+    stop_event = threading.Event()
+    ports = []
+    threads = []
+    for _ in range(n_ports):
+        master, slave = os.openpty()
+        serial = Serial(os.ttyname(slave), timeout=0.25)
+        collector = LatencyCollector()
+        threads += create_port(serial, stop_event, collector)
+        ports.append((master, slave, serial, collector))
+    for thread in threads:
+        thread.start()
+
+    time.sleep(0.5)  # settle
+    cpu_start = time.process_time()
+    time.sleep(IDLE_DURATION)
+    cpu_load = (time.process_time() - cpu_start) / IDLE_DURATION
+
+    frame = encode_frame(FrameType.HEADER, cbor2.dumps({1: "SIM"}))
+    latencies = []
+    for i in range(N_WAKEUPS):
+        master, _, _, collector = ports[i % n_ports]
+        time.sleep(0.05)  # let everything fall asleep again
+        t_write = time.perf_counter()
+        os.write(master, frame)
+        latencies.append(collector.received.get(timeout=2) - t_write)
+
+    stop_event.set()
+    for thread in threads:
+        thread.join()
+    for master, slave, serial, _ in ports:
+        serial.close()
+        os.close(master)
+        os.close(slave)
+    print(
+        f"{name:>8}, {n_ports:2d} ports: idle CPU {100 * cpu_load:6.1f} %, "
+        f"wake-up latency median {1e3 * statistics.median(latencies):5.2f} ms, "
+        f"max {1e3 * max(latencies):5.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    log.setLevel(logging.WARNING)
+    for n_ports in (1, 16):
+        measure("polling", polling_port, n_ports)
+        measure("blocking", blocking_port, n_ports)
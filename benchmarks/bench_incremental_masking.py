@@ -0,0 +1,56 @@
+"""Per-chunk cost of a large device that keeps sending sessions after completion.
+
+The header expects one session, every further session is masked as it
+arrives: weak-masking on every chunk and phase-masking after every session
+(like a refreshing plot). The incremental collector only updates the new
+connections and those of changed pins or pin pairs, the full collector masks
+all connections each time, like before.
+"""
+
+import logging
+import time
+
+from bistmon.data_storage import DeviceDataCollector
+from bistmon.logger import log
+from bistmon.packet import Packet
+from bistmon.simulator import VirtualDevice
+
+FAMILY = "NRF52840"
+N_PINS = 1024
+
+
+class FullCollector(DeviceDataCollector):
+    """Collector that always filters and masks all pins, like before."""
+
+    def _filter_weak_connections(self, device_family, pins=None, start=0):  # noqa: ANN001, ANN202, ARG002
+        super()._filter_weak_connections(device_family)
+
+    def _apply_phase_masking(self, device_family):  # noqa: ANN001, ANN202
+        self.devices[device_family].pop("phase_pairs", None)
+        super()._apply_phase_masking(device_family)
+
+
+def run(collector: DeviceDataCollector, device: VirtualDevice, sessions: int) -> float:
+    collector.process_header(Packet.from_raw(device.header()))
+    t_start = time.perf_counter()
+    for session in range(sessions):
+        for chunk_id in range(device.total_chunks):
+            collector.process_chunk(Packet.from_raw(device.chunk(session, chunk_id), chunk_id))
+        collector._apply_phase_masking(FAMILY)  # noqa: SLF001
+    return 1e6 * (time.perf_counter() - t_start) / (sessions * device.total_chunks)
+
+
+if __name__ == "__main__":
+    log.setLevel(logging.WARNING)
+    print(" sessions | connections | full us/chunk | incremental us/chunk")
+    for sessions in (4, 16, 64):
+        device = VirtualDevice(FAMILY, pins=N_PINS, sessions=1, pins_per_chunk=8, seed=0)
+        full = FullCollector()
+        duration_full = run(full, device, sessions)
+        incremental = DeviceDataCollector()
+        duration = run(incremental, device, sessions)
+        table = incremental.devices[FAMILY]["connections"]
+        expected = full.devices[FAMILY]["connections"]
+        assert (table.masked == expected.masked).all()
+        assert (table.phase_masked == expected.phase_masked).all()
+        print(f"{sessions:9} | {len(table):11} | {duration_full:13.0f} | {duration:20.0f}")
@@ -0,0 +1,115 @@
+"""Per-port throughput and ACK round-trip time of the selector-based multi-port monitor.
+
+Fake devices run in a separate process and are connected via pseudo-terminals
+(linux / macOS only). Every device sends chunks that request an ACK and waits
+for it before sending the next one (stop-and-wait, like the firmware).
+"""
+
+import logging
+import multiprocessing
+import os
+import selectors
+import statistics
+import threading
+import time
+
+import cbor2
+from bistmon.ack_writer import ACK_END
+from bistmon.config_framework import FrameworkKey
+from bistmon.config_framework import HeaderKey
+from bistmon.framing import FrameType
+from bistmon.framing import encode_frame
+from bistmon.logger import log
+from bistmon.multi_monitor import MultiPortMonitor
+
+DURATION = 2.0  # s
+ACK_SIZE = 12
+
+
+def chunk_frame(chunk_id: int) -> bytes:
+    pins = [
+        {
+            FrameworkKey.PIN: pin,
+            FrameworkKey.EVENTS: 1 << 13,
+            FrameworkKey.CONNECTIONS: [
+                {FrameworkKey.OTHER_PIN: (pin + 1) % 8, FrameworkKey.CONNECTION_PARAMETER: 1}
+            ],
+        }
+        for pin in range(8)
+    ]
+    data = {FrameworkKey.CHUNK_ID: chunk_id, FrameworkKey.PINS: pins, HeaderKey.ACK_REQUESTED: 1}
+    return encode_frame(FrameType.CHUNK, cbor2.dumps(data), packet_id=chunk_id)
+
+
+def fake_devices(masters: list[int], duration: float, pipe) -> None:  # noqa: ANN001
+    """Serve all devices in one loop: send a chunk, wait for its ACK, repeat."""
+    header = {
+        HeaderKey.DEVICE_FAMILY: "SIM",
+        HeaderKey.TOTAL_CHUNKS: 1_000_000,
+        HeaderKey.ACK_REQUESTED: 1,
+    }
+    selector = selectors.DefaultSelector()
+    state = {}
+    for master in masters:
+        selector.register(master, selectors.EVENT_READ)
+        os.write(master, encode_frame(FrameType.HEADER, cbor2.dumps(header)))
+        state[master] = {"pending": b"", "t_sent": time.perf_counter(), "chunks": 0, "bytes": 0}
+        state[master]["rtts"] = []
+
+    t_end = time.perf_counter() + duration
+    while time.perf_counter() < t_end:
+        for key, _ in selector.select(timeout=0.1):
+            port = state[key.fd]
+            port["pending"] += os.read(key.fd, 4096)
+            while len(port["pending"]) >= ACK_SIZE:
+                ack, port["pending"] = port["pending"][:ACK_SIZE], port["pending"][ACK_SIZE:]
+                if int.from_bytes(ack[-4:], "little") != ACK_END:
+                    raise ValueError("Malformed ACK")
+                port["rtts"].append(time.perf_counter() - port["t_sent"])
+                frame = chunk_frame(port["chunks"])
+                port["t_sent"] = time.perf_counter()
+                os.write(key.fd, frame)
+                port["chunks"] += 1
+                port["bytes"] += len(frame)
+    pipe.send([(port["chunks"], port["bytes"], port["rtts"][1:]) for port in state.values()])
+
+
+def measure(n_ports: int) -> None:
+    ptys = [os.openpty() for _ in range(n_ports)]
+    monitor = MultiPortMonitor(
+        [os.ttyname(slave) for _, slave in ptys], debug_lines=False, interactive=False
+    )
+    monitor.open()
+    monitor_thread = threading.Thread(target=monitor.run)
+    monitor_thread.start()
+
+    ctx = multiprocessing.get_context("fork")
+    receiver, sender = ctx.Pipe(duplex=False)
+    devices = ctx.Process(target=fake_devices, args=([m for m, _ in ptys], DURATION, sender))
+    devices.start()
+    results = receiver.recv()
+    devices.join()
+
+    monitor.stop()
+    monitor_thread.join()
+    monitor.close()
+    for master, slave in ptys:
+        os.close(master)
+        os.close(slave)
+
+    chunks = [chunks / DURATION for chunks, _, _ in results]
+    throughput = [size / DURATION / 1e3 for _, size, _ in results]
+    rtts = sorted(rtt for _, _, port_rtts in results for rtt in port_rtts)
+    print(
+        f"{n_ports:2d} ports: per port {statistics.mean(chunks):7.0f} chunks/s "
+        f"{statistics.mean(throughput):7.1f} kB/s (min {min(throughput):7.1f}), "
+        f"total {sum(throughput):7.1f} kB/s, "
+        f"ACK-RTT median {1e3 * statistics.median(rtts):5.2f} ms, "
+        f"p99 {1e3 * rtts[int(0.99 * (len(rtts) - 1))]:5.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    log.setLevel(logging.WARNING)
+    for n_ports in (1, 2, 4, 8, 16, 32):
+        measure(n_ports)
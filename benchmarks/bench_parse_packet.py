@@ -0,0 +1,95 @@
+"""Packets per second of parse_packet compared to the former hex-based decoder."""
+
+import timeit
+from collections.abc import Callable
+
+import cbor2
+from bistmon.config_framework import FrameworkKey
+from bistmon.framing import calculate_crc
+from bistmon.packet import parse_packet
+
+N_PACKETS = 5_000
+
+
+def legacy_parse_packet(hex_data: str, *, has_packet_id: bool = False) -> dict:
+    """Former implementation, working on the hex-representation of the payload."""
+    offset = 0
+    packet_id = -1
+    if has_packet_id:
+        packet_id = int.from_bytes(bytes.fromhex(hex_data[:8]), "little")
+        offset = 4
+    length = int.from_bytes(bytes.fromhex(hex_data[offset * 2 : offset * 2 + 4]), "little")
+    cbor_start = offset * 2 + 4
+    cbor_end = cbor_start + length * 2
+    cbor_bytes = bytes.fromhex(hex_data[cbor_start:cbor_end])
+    received_hash = int.from_bytes(bytes.fromhex(hex_data[cbor_end : cbor_end + 8]), "little")
+    calculated_hash = calculate_crc(cbor_bytes)
+    decoded = cbor2.loads(cbor_bytes)
+    return {
+        "ack_requested": decoded.get(8, 0),
+        "packet_id": packet_id,
+        "data": decoded,
+        "hash_valid": received_hash == calculated_hash,
+        "received_hash": received_hash,
+        "calculated_hash": calculated_hash,
+        "raw_bytes": cbor_bytes,
+    }
+
+
+def synthetic_payload(n_pins: int) -> memoryview:
+    pins = [
+        {
+            FrameworkKey.PIN: pin,
+            FrameworkKey.EVENTS: 0x1555000,
+            FrameworkKey.CONNECTIONS: [
+                {
+                    FrameworkKey.OTHER_PIN: pin + 1,
+                    FrameworkKey.CONNECTION_PARAMETER: phase,
+                    FrameworkKey.CONNECTION_TYPE: 0,
+                }
+                for phase in range(3)
+            ],
+        }
+        for pin in range(n_pins)
+    ]
+    cbor = cbor2.dumps({FrameworkKey.CHUNK_ID: 7, FrameworkKey.PINS: pins})
+    payload = (7).to_bytes(4, "little") + len(cbor).to_bytes(2, "little") + cbor
+    return memoryview(payload + calculate_crc(cbor).to_bytes(4, "little"))
+
+
+def measure(func: Callable[[], object]) -> float:
+    """Best of several runs, in seconds per packet."""
+    return min(timeit.repeat(func, number=N_PACKETS, repeat=5)) / N_PACKETS
+
+
+def compare(n_pins: int) -> None:
+    payload = synthetic_payload(n_pins)
+    # exactly the slice parse_packet decodes: [PACKET_ID][LENGTH][CBOR][CRC]
+    length = int.from_bytes(payload[4:6], "little")
+    cbor_bytes = bytes(payload[6 : 6 + length])
+    print(f"payload: {len(payload)} bytes")
+    t_cbor = measure(lambda: cbor2.loads(cbor_bytes))
+    print(f"  cbor2.loads: {1 / t_cbor:8.0f} packets/s, {t_cbor * 1e6:6.2f} us")
+
+    # CBOR-decoding is the same for both. Subtracting its timing leaves mostly noise for
+    # large packets, so the overhead is timed with cbor2.loads returning the decoded data.
+    decoded = cbor2.loads(cbor_bytes)
+    for name, func in (
+        ("legacy (hex)", lambda: legacy_parse_packet(payload.hex(), has_packet_id=True)),
+        ("parse_packet", lambda: parse_packet(payload, has_packet_id=True)),
+    ):
+        t_packet = measure(func)
+        loads, cbor2.loads = cbor2.loads, lambda _data: decoded
+        try:
+            t_overhead = measure(func)
+        finally:
+            cbor2.loads = loads
+        print(
+            f"{name:>13}: {1 / t_packet:8.0f} packets/s, "
+            f"{t_overhead * 1e6:6.2f} us overhead besides cbor2.loads"
+        )
+
+
+if __name__ == "__main__":
+    for n_pins in (2, 16, 64):
+        compare(n_pins)
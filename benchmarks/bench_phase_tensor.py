@@ -0,0 +1,85 @@
+"""All six phase matrices as one tensor compared to cell-by-cell DataFrames.
+
+The former implementation created a labelled DataFrame per phase and set
+every cell with df.at[], the tensor is filled by fancy indexing in one pass.
+"""
+
+import logging
+import time
+
+import pandas as pd
+from bistmon.config_framework import ConnectionType
+from bistmon.config_framework import FrameworkKey
+from bistmon.config_targets import get_pin_name
+from bistmon.data_storage import PHASE_ERROR_EVENTS
+from bistmon.data_storage import DeviceDataCollector
+from bistmon.event_decoder import EVENT_MASKS
+from bistmon.logger import log
+from bistmon.packet import Packet
+from bistmon.simulator import VirtualDevice
+
+FAMILY = "NRF52840"
+SESSIONS = 7
+
+
+def legacy_phase_matrix(collector: DeviceDataCollector, phase: int) -> pd.DataFrame:
+    device = collector.devices[FAMILY]
+    labels = [get_pin_name(FAMILY, pin["pin"]) for pin in device["pins"]]
+    df = pd.DataFrame(0, index=labels, columns=labels)
+    error_mask = EVENT_MASKS.get(PHASE_ERROR_EVENTS[phase], 0)
+    for pin in device["pins"]:
+        pin_name_a = get_pin_name(FAMILY, pin["pin"])
+        pin_works = not pin["events_mask"] & error_mask
+        if pin_works:
+            df.at[pin_name_a, pin_name_a] = 1
+        for conn in pin["connections"]:
+            if conn.get(FrameworkKey.CONNECTION_TYPE, 0) == ConnectionType.INTERNAL:
+                pin_name_b = get_pin_name(FAMILY, conn.get(FrameworkKey.OTHER_PIN))
+                if (
+                    conn.get(FrameworkKey.CONNECTION_PARAMETER, -1) == phase
+                    and pin_name_b in labels
+                    and pin_works
+                ):
+                    if conn.get("phase_masked", False):
+                        df.at[pin_name_a, pin_name_b] = 3
+                    elif conn.get("masked", False):
+                        df.at[pin_name_a, pin_name_b] = 2
+                    else:
+                        df.at[pin_name_a, pin_name_b] = 1
+    return df
+
+
+def collect(n_pins: int) -> DeviceDataCollector:
+    device = VirtualDevice(FAMILY, pins=n_pins, sessions=SESSIONS, pins_per_chunk=8, seed=0)
+    collector = DeviceDataCollector()
+    collector.process_header(Packet.from_raw(device.header()))
+    for session in range(SESSIONS):
+        for chunk_id in range(device.total_chunks):
+            collector.process_chunk(Packet.from_raw(device.chunk(session, chunk_id), chunk_id))
+    collector._apply_phase_masking(FAMILY)  # noqa: SLF001
+    return collector
+
+
+if __name__ == "__main__":
+    log.setLevel(logging.WARNING)
+    print(" pins | df.at per cell ms | tensor ms | tensor + 6 DataFrames ms")
+    for n_pins in (64, 256, 1024):
+        collector = collect(n_pins)
+
+        t_start = time.perf_counter()
+        legacy = [legacy_phase_matrix(collector, phase) for phase in range(6)]
+        duration_legacy = time.perf_counter() - t_start
+
+        t_start = time.perf_counter()
+        tensor = collector.create_phase_tensor(FAMILY)
+        duration_tensor = time.perf_counter() - t_start
+
+        t_start = time.perf_counter()
+        frames = [collector._phase_frame(FAMILY, tensor[phase]) for phase in range(6)]  # noqa: SLF001
+        duration_frames = time.perf_counter() - t_start
+        assert all(df.equals(frame) for df, frame in zip(legacy, frames, strict=True))
+
+        print(
+            f"{n_pins:5} | {1e3 * duration_legacy:17.1f} | {1e3 * duration_tensor:9.2f} "
+            f"| {1e3 * (duration_tensor + duration_frames):24.2f}"
+        )
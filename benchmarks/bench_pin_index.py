@@ -0,0 +1,59 @@
+"""Scaling of ingest and event-matrix with the number of pins per device.
+
+Synthetic devices of 64 to 4096 pins are fed (pre-parsed) into a collector.
+With the pin-index the cost per pin has to stay flat, the former linear scan
+over device["pins"] is timed alongside for reference.
+"""
+
+import logging
+import time
+
+from bistmon.data_storage import DeviceDataCollector
+from bistmon.logger import log
+from bistmon.packet import Packet
+from bistmon.simulator import VirtualDevice
+
+SESSIONS = 2
+PINS_PER_CHUNK = 8
+
+
+def packets(n_pins: int) -> list[Packet]:
+    device = VirtualDevice(pins=n_pins, sessions=SESSIONS, pins_per_chunk=PINS_PER_CHUNK, seed=0)
+    return [Packet.from_raw(device.header())] + [
+        Packet.from_raw(device.chunk(session, chunk_id), chunk_id)
+        for session in range(SESSIONS)
+        for chunk_id in range(device.total_chunks)
+    ]
+
+
+def linear_lookups(device: dict) -> float:
+    """Former lookup of every pin, as in process_chunk before the index."""
+    t_start = time.perf_counter()
+    for pin_num in range(len(device["pins"])):
+        next((p for p in device["pins"] if p["pin"] == pin_num), None)
+    return time.perf_counter() - t_start
+
+
+if __name__ == "__main__":
+    log.setLevel(logging.WARNING)
+    print(" pins | ingest us/pin | event-matrix us/pin | linear lookup us/pin")
+    for n_pins in (64, 256, 1024, 4096):
+        data = packets(n_pins)
+        collector = DeviceDataCollector()
+        t_start = time.perf_counter()
+        collector.process_header(data[0])
+        for packet in data[1:]:
+            collector.process_chunk(packet)
+        duration_ingest = time.perf_counter() - t_start
+        assert collector.devices["NRF52840"]["complete"]
+
+        t_start = time.perf_counter()
+        collector.create_event_matrix("NRF52840")
+        duration_matrix = time.perf_counter() - t_start
+
+        duration_linear = linear_lookups(collector.devices["NRF52840"])
+        print(
+            f"{n_pins:5} | {1e6 * duration_ingest / n_pins / SESSIONS:13.1f} "
+            f"| {1e6 * duration_matrix / n_pins:19.1f} "
+            f"| {1e6 * duration_linear / n_pins:20.1f}"
+        )
@@ -0,0 +1,53 @@
+"""Ingest throughput measured by a max-speed replay of a simulated rack.
+
+A capture of 32 virtual devices (full test-data, 64 B blocks, interleaved
+per port) is replayed through framing, parse_packet and the collectors.
+"""
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from bistmon.capture import CaptureWriter
+from bistmon.logger import log
+from bistmon.replay import Replay
+from bistmon.simulator import VirtualDevice
+
+N_DEVICES = 32
+BLOCK_SIZE = 64
+
+
+def create_capture(path: Path) -> int:
+    streams = [b"".join(VirtualDevice(seed=index).frames()) for index in range(N_DEVICES)]
+    with CaptureWriter(path) as writer:
+        ports = [writer.add_port(f"/dev/ttySIM{index}") for index in range(N_DEVICES)]
+        for position in range(0, max(len(stream) for stream in streams), BLOCK_SIZE):
+            for port, stream in zip(ports, streams, strict=True):
+                if position < len(stream):
+                    writer.write(port, stream[position : position + BLOCK_SIZE])
+    return sum(len(stream) for stream in streams)
+
+
+if __name__ == "__main__":
+    log.setLevel(logging.WARNING)
+    os.chdir(tempfile.mkdtemp())  # device-reports are written to ./logs
+    path = Path("capture.bin")
+    size = create_capture(path)
+    for debug_lines in (True, False):
+        replay = Replay(path, debug_lines=debug_lines)
+        replay.run()
+        frames = sum(
+            session.framer.frames_header + session.framer.frames_chunk
+            for session in replay.sessions.values()
+        )
+        complete = sum(
+            device["complete"]
+            for collector in replay.collectors.values()
+            for device in collector.devices.values()
+        )
+        print(
+            f"debug_lines={debug_lines!s:5}: {size / replay.duration / 1e6:5.2f} MB/s, "
+            f"{frames / replay.duration:6.0f} frames/s, {complete} devices complete "
+            f"(incl. reports) in {replay.duration:.2f} s"
+        )
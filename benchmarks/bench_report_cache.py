@@ -0,0 +1,82 @@
+"""Derived data of the reports of a fleet with and without the cache.
+
+Every device gets its report (like on completion), followed by repeated
+manual saves of all devices without new data in between. Only the derived
+data the reports request is timed, the text formatting of the matrices is
+the same for both collectors. The uncached collector recomputes every
+matrix, the strengths and the vectors on each use.
+"""
+
+import logging
+import random
+import time
+
+from bistmon.config_framework import ConnectionType
+from bistmon.config_framework import FrameworkKey
+from bistmon.data_storage import DeviceDataCollector
+from bistmon.logger import log
+from bistmon.packet import Packet
+from bistmon.simulator import VirtualDevice
+
+N_PINS = 48
+N_SAVES = 5
+
+
+class UncachedCollector(DeviceDataCollector):
+    """Collector that recomputes every derived table."""
+
+    def _cached(self, key, version, compute):  # noqa: ANN001, ANN202, ARG002
+        self.cache_misses += 1
+        return compute()
+
+
+def fill(collector: DeviceDataCollector, n_devices: int) -> None:
+    rng = random.Random(0)
+    for index in range(n_devices):
+        device = VirtualDevice(f"DEV{index}", pins=N_PINS, seed=index)
+        for connections in device.connections[::4]:
+            connections.append(
+                {
+                    FrameworkKey.CONNECTION_TYPE: ConnectionType.EXTERNAL,
+                    FrameworkKey.OTHER_PIN: rng.randrange(N_PINS),
+                    FrameworkKey.CONNECTION_PARAMETER: f"DEV{rng.randrange(n_devices)}",
+                }
+            )
+        collector.process_header(Packet.from_raw(device.header()))
+        for session in range(device.sessions):
+            for chunk_id in range(device.total_chunks):
+                collector.process_chunk(Packet.from_raw(device.chunk(session, chunk_id), chunk_id))
+
+
+def derived_data_of_reports(collector: DeviceDataCollector) -> None:
+    families = sorted(collector.devices)
+    for family in families:  # save_device_report
+        for other in families:
+            if other != family:
+                collector.create_connection_array(family, other)
+        collector.create_phase_tensor(family)
+        collector.get_pin_strengths(family)
+    for _ in range(N_SAVES):  # manual_save
+        for family in families:
+            for other in families:
+                if other != family:
+                    collector.create_connection_array(family, other)
+            collector.create_phase_tensor(family)
+            collector.get_pin_strengths(family)
+        collector.get_connection_vectors()
+
+
+if __name__ == "__main__":
+    log.setLevel(logging.WARNING)
+    print(" devices | uncached ms | cached ms |  hits | misses")
+    for n_devices in (4, 16, 64):
+        durations = []
+        for collector in (UncachedCollector(), DeviceDataCollector()):
+            fill(collector, n_devices)
+            t_start = time.perf_counter()
+            derived_data_of_reports(collector)
+            durations.append(time.perf_counter() - t_start)
+        print(
+            f"{n_devices:8} | {1e3 * durations[0]:11.1f} | {1e3 * durations[1]:9.1f} "
+            f"| {collector.cache_hits:5} | {collector.cache_misses:6}"
+        )
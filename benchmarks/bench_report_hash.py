@@ -0,0 +1,61 @@
+"""Report hash streamed from the arrays compared to hashing pandas DataFrames.
+
+The former hash concatenated df.to_numpy().tobytes() of the labelled
+connection- and phase-matrices. report_hash feeds the compact arrays to
+hashlib one by one. Both start from an empty cache of derived data.
+"""
+
+import hashlib
+import logging
+import time
+
+from bistmon.data_storage import DeviceDataCollector
+from bistmon.logger import log
+from bistmon.packet import Packet
+from bistmon.simulator import VirtualDevice
+
+FAMILY = "NRF52840"
+SESSIONS = 7
+
+
+def legacy_report_hash(collector: DeviceDataCollector, family: str) -> str:
+    combined_bytes = bytearray()
+    for other_device in sorted(collector.devices.keys()):
+        if family != other_device:
+            df = collector.create_connection_matrix(family, other_device)
+            combined_bytes += df.to_numpy().tobytes()
+    for phase in range(6):
+        combined_bytes += collector.create_phase_matrix(family, phase).to_numpy().tobytes()
+    strengths = collector.get_pin_strengths(family)
+    combined_bytes += bytearray([(0 if s is None else int(s)) & 0xFF for s in strengths])
+    return hashlib.sha256(combined_bytes).hexdigest()
+
+
+def collect(n_pins: int) -> DeviceDataCollector:
+    device = VirtualDevice(FAMILY, pins=n_pins, sessions=SESSIONS, pins_per_chunk=8, seed=0)
+    collector = DeviceDataCollector()
+    collector.process_header(Packet.from_raw(device.header()))
+    for session in range(SESSIONS):
+        for chunk_id in range(device.total_chunks):
+            collector.process_chunk(Packet.from_raw(device.chunk(session, chunk_id), chunk_id))
+    return collector
+
+
+if __name__ == "__main__":
+    log.setLevel(logging.WARNING)
+    print(" pins | DataFrames ms | streamed ms")
+    for n_pins in (64, 256, 1024):
+        collector = collect(n_pins)
+
+        collector._cache.clear()  # noqa: SLF001
+        t_start = time.perf_counter()
+        legacy = legacy_report_hash(collector, FAMILY)
+        duration_legacy = time.perf_counter() - t_start
+
+        collector._cache.clear()  # noqa: SLF001
+        t_start = time.perf_counter()
+        digest = collector.report_hash(FAMILY)
+        duration = time.perf_counter() - t_start
+        assert digest == legacy
+
+        print(f"{n_pins:5} | {1e3 * duration_legacy:13.1f} | {1e3 * duration:11.1f}")
@@ -0,0 +1,65 @@
+"""Handoff of small serial fragments from reader- to processor-thread.
+
+Compares the former queue.Queue(maxsize=1000) with the coalescing ByteRingBuffer.
+"""
+
+import queue
+import threading
+import time
+
+from bistmon.ring_buffer import ByteRingBuffer
+from bistmon.ring_buffer import OverflowPolicy
+
+N_FRAGMENTS = 200_000
+FRAGMENT = bytes(range(64))  # typical read-size at high baudrates
+
+
+def run_queue() -> tuple[float, int]:
+    data_queue = queue.Queue(maxsize=1000)
+    received = reads = 0
+
+    def consume() -> None:
+        nonlocal received, reads
+        while received < N_FRAGMENTS * len(FRAGMENT):
+            received += len(data_queue.get())
+            reads += 1
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    t_start = time.perf_counter()
+    for _ in range(N_FRAGMENTS):
+        data_queue.put(FRAGMENT)
+    consumer.join()
+    return time.perf_counter() - t_start, reads
+
+
+def run_ring(policy: OverflowPolicy) -> tuple[float, int]:
+    ring = ByteRingBuffer(capacity=64 * 1024, policy=policy)
+    received = 0
+
+    def consume() -> None:
+        nonlocal received
+        while received < N_FRAGMENTS * len(FRAGMENT):
+            received += len(ring.get())
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    t_start = time.perf_counter()
+    for _ in range(N_FRAGMENTS):
+        ring.put(FRAGMENT)
+    consumer.join()
+    print(f"  {ring.stats}")
+    return time.perf_counter() - t_start, ring.reads
+
+
+def report(name: str, duration: float, reads: int) -> None:
+    size = N_FRAGMENTS * len(FRAGMENT) / 1e6
+    print(
+        f"{name:>18}: {size / duration:7.1f} MB/s, {N_FRAGMENTS / duration:9.0f} fragments/s, "
+        f"{reads:6d} reads by processor"
+    )
+
+
+if __name__ == "__main__":
+    report("queue.Queue", *run_queue())
+    report("ByteRingBuffer", *run_ring(OverflowPolicy.BLOCK))
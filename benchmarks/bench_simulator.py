@@ -0,0 +1,86 @@
+"""Load-test of the ingest with simulated devices: time until a whole rack is reported.
+
+The simulator (as with `bistmon simulate`) runs in a separate process, every
+device transmits the full test-data (48 pins, 7 sessions) in stop-and-wait
+mode with 1 % corrupted frames. The monitor is the single-process selector loop.
+"""
+
+import logging
+import multiprocessing
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from bistmon.logger import log
+from bistmon.multi_monitor import MultiPortMonitor
+from bistmon.simulator import SimulatedPort
+from bistmon.simulator import Simulator
+from bistmon.simulator import VirtualDevice
+
+
+def simulate(n_devices: int, pipe) -> None:  # noqa: ANN001
+    ports = [
+        SimulatedPort(VirtualDevice(seed=index), ack_timeout=0.1, noise=0.01)
+        for index in range(n_devices)
+    ]
+    pipe.send([port.name for port in ports])
+    pipe.recv()  # monitor is ready
+    simulator = Simulator(ports)
+    simulator.run()
+    pipe.send([(port.stats, port.rtts) for port in ports])
+    pipe.recv()  # keep ports open until the monitor is done
+    simulator.close()
+
+
+def measure(n_devices: int) -> None:
+    ctx = multiprocessing.get_context("fork")
+    pipe, child_pipe = ctx.Pipe()
+    process = ctx.Process(target=simulate, args=(n_devices, child_pipe))
+    process.start()
+    monitor = MultiPortMonitor(pipe.recv(), debug_lines=False, interactive=False)
+    monitor.open()
+    thread = threading.Thread(target=monitor.run)
+    thread.start()
+
+    t_start = time.perf_counter()
+    pipe.send("go")
+    results = pipe.recv()
+    # wait for the collectors to catch up
+    deadline = time.perf_counter() + 60
+    while time.perf_counter() < deadline and not all(
+        device.get("saved")
+        for session in monitor.sessions
+        for device in session.collector.devices.values()
+    ):
+        time.sleep(0.01)
+    duration = time.perf_counter() - t_start
+    monitor.stop()
+    thread.join()
+    monitor.close()
+    pipe.send("done")
+    process.join()
+
+    frames = sum(stats["frames_sent"] for stats, _ in results)
+    retransmissions = sum(stats["retransmissions"] for stats, _ in results)
+    complete = sum(
+        device["complete"]
+        for session in monitor.sessions
+        for device in session.collector.devices.values()
+    )
+    assert complete == n_devices, f"only {complete} of {n_devices} devices complete"
+    rtts = sorted(rtt for _, port_rtts in results for rtt in port_rtts)
+    print(
+        f"{n_devices:2d} devices: complete {complete:2d} after {duration:5.2f} s, "
+        f"{frames / duration:6.0f} frames/s ({retransmissions} retransmitted), "
+        f"ACK-RTT median {1e3 * statistics.median(rtts):5.2f} ms, "
+        f"p99 {1e3 * rtts[int(0.99 * (len(rtts) - 1))]:5.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    log.setLevel(logging.WARNING)
+    os.chdir(tempfile.mkdtemp())  # device-reports are written to ./logs
+    for n_devices in (1, 8, 32):
+        measure(n_devices)
@@ -0,0 +1,92 @@
+"""Masking of weak connections on large synthetic devices.
+
+Compares _filter_weak_connections (strength-table and one vectorized pass)
+with the former implementation, that searched the strength of both pins of
+every connection by comparing event-lists of all pins of the device.
+"""
+
+import logging
+import time
+
+from bistmon.config_framework import ConnectionType
+from bistmon.config_framework import FrameworkKey
+from bistmon.data_storage import DeviceDataCollector
+from bistmon.event_decoder import decode_event_type_one_hot
+from bistmon.logger import log
+from bistmon.packet import Packet
+from bistmon.pin_analyzer import analyze_pin
+from bistmon.simulator import VirtualDevice
+
+SESSIONS = 7
+FAMILY = "NRF52840"
+
+
+def legacy_should_mask(device: dict, pin_events: dict, events: list, phase: int) -> bool:
+    strength = None
+    for pin in device["pins"]:
+        if pin_events[pin["pin"]] == events:
+            strength = pin.get("strength")
+            break
+    if strength is None:
+        strength = analyze_pin(events)
+    if strength is None or strength == 0:
+        return False
+    if strength >= 1 and phase in (1, 3):
+        return True
+    return strength <= -1 and phase in (0, 2)
+
+
+def legacy_filter(device: dict) -> None:
+    # event-lists were stored per pin, the Pin objects have no field for them
+    pin_events = {
+        pin["pin"]: decode_event_type_one_hot(pin["events_mask"]) for pin in device["pins"]
+    }
+    for pin in device["pins"]:
+        for conn in pin["connections"]:
+            if conn.get(FrameworkKey.CONNECTION_TYPE, 0) == ConnectionType.INTERNAL:
+                phase = conn.get(FrameworkKey.CONNECTION_PARAMETER, -1)
+                target_events = pin_events.get(conn.get(FrameworkKey.OTHER_PIN), [])
+                events = pin_events[pin["pin"]]
+                conn["masked"] = legacy_should_mask(
+                    device, pin_events, events, phase
+                ) or legacy_should_mask(device, pin_events, target_events, phase)
+            else:
+                conn["masked"] = False
+
+
+def collect(n_pins: int) -> DeviceDataCollector:
+    device = VirtualDevice(FAMILY, pins=n_pins, sessions=SESSIONS, pins_per_chunk=8, seed=0)
+    collector = DeviceDataCollector()
+    collector.process_header(Packet.from_raw(device.header()))
+    for session in range(SESSIONS):
+        for chunk_id in range(device.total_chunks):
+            collector.process_chunk(Packet.from_raw(device.chunk(session, chunk_id), chunk_id))
+    return collector
+
+
+def masks(device: dict) -> list[bool]:
+    return [conn["masked"] for pin in device["pins"] for conn in pin["connections"]]
+
+
+if __name__ == "__main__":
+    log.setLevel(logging.WARNING)
+    print(" pins | connections | legacy ms | vectorized ms | speedup")
+    for n_pins in (64, 256, 1024, 4096):
+        collector = collect(n_pins)
+        device = collector.devices[FAMILY]
+        expected = masks(device)
+
+        t_start = time.perf_counter()
+        collector._filter_weak_connections(FAMILY)  # noqa: SLF001
+        duration_new = time.perf_counter() - t_start
+        assert masks(device) == expected
+
+        t_start = time.perf_counter()
+        legacy_filter(device)
+        duration_legacy = time.perf_counter() - t_start
+        assert masks(device) == expected
+
+        print(
+            f"{n_pins:5} | {len(expected):11} | {1e3 * duration_legacy:9.1f} "
+            f"| {1e3 * duration_new:13.2f} | {duration_legacy / duration_new:7.1f}"
+        )
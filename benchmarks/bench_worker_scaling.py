@@ -0,0 +1,58 @@
+"""Rack throughput of `bistmon serial --workers N` with 32 simulated ports.
+
+Fake devices (see bench_multi_port.py) run in separate processes, 4 ports each,
+and send chunks in stop-and-wait mode. With enough CPU cores the total
+throughput should scale nearly linearly with the number of workers.
+"""
+
+import logging
+import multiprocessing
+import os
+
+from bench_multi_port import fake_devices
+from bistmon.logger import log
+from bistmon.worker_pool import WorkerPool
+
+DURATION = 3.0  # s
+N_PORTS = 32
+PORTS_PER_DEVICE_PROCESS = 4
+
+
+def measure(n_workers: int) -> float:
+    ptys = [os.openpty() for _ in range(N_PORTS)]
+    pool = WorkerPool(
+        [os.ttyname(slave) for _, slave in ptys], n_workers, debug_lines=False, interactive=False
+    )
+    pool.start()
+
+    ctx = multiprocessing.get_context("fork")
+    devices = []
+    for index in range(0, N_PORTS, PORTS_PER_DEVICE_PROCESS):
+        receiver, sender = ctx.Pipe(duplex=False)
+        masters = [master for master, _ in ptys[index : index + PORTS_PER_DEVICE_PROCESS]]
+        process = ctx.Process(target=fake_devices, args=(masters, DURATION, sender))
+        process.start()
+        devices.append((process, receiver))
+    results = []
+    for process, receiver in devices:
+        results += receiver.recv()
+        process.join()
+
+    pool.stop()
+    for master, slave in ptys:
+        os.close(master)
+        os.close(slave)
+
+    chunks = sum(port_chunks for port_chunks, _, _ in results) / DURATION
+    size = sum(port_bytes for _, port_bytes, _ in results) / DURATION
+    print(f"{n_workers:2d} workers: {chunks:8.0f} chunks/s, {size / 1e3:8.1f} kB/s total")
+    return chunks
+
+
+if __name__ == "__main__":
+    log.setLevel(logging.WARNING)
+    print(f"{N_PORTS} ports, {os.cpu_count()} CPU cores")
+    baseline = measure(1)
+    for n_workers in (2, 4, 8):
+        if n_workers <= (os.cpu_count() or 1):
+            print(f"   speedup {measure(n_workers) / baseline:4.2f}x")
@@ -0,0 +1,94 @@
+"""Acknowledgement of received packets."""
+
+import queue
+import statistics
+import threading
+import time
+from collections import deque
+
+from serial import Serial
+
+from .logger import log
+
+# ACK protocol
+ACK_START: int = 0x191A1B1C
+ACK_END: int = 0x1D1E1F20
+
+
+def send_ack(serial: Serial, received_hash: int) -> None:
+    """Send simple ACK with crc"""
+    try:
+        ack_data = bytearray()
+        ack_data.extend(ACK_START.to_bytes(4, "little"))
+        ack_data.extend(received_hash.to_bytes(4, "little"))
+        ack_data.extend(ACK_END.to_bytes(4, "little"))
+
+        serial.write(ack_data)
+        log.debug(f"ACK sent for crc: 0x{received_hash:08X}")
+    except Exception as e:
+        log.exception("ACK send failed", exc_info=e)
+
+
+class AckWriter:
+    """Serial writer thread with its own queue, dedicated to ACKs.
+
+    ACKs are queued as soon as the CRC of a packet checks out, so they never
+    wait for collector-work. Single-threaded event-loops can disable the thread,
+    send() then writes immediately. The latency from a completely received frame
+    until its ACK is written is recorded (last 1000 ACKs).
+    """
+
+    def __init__(self, serial: Serial, history: int = 1000, *, threaded: bool = True) -> None:
+        self.serial = serial
+        self.threaded = threaded
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="AckWriter", daemon=True)
+        self.latencies: deque[float] = deque(maxlen=history)
+        self.acks_sent = 0
+
+    def start(self) -> None:
+        if self.threaded:
+            self._thread.start()
+
+    def stop(self, timeout: float = 2) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=timeout)
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive() or not self.threaded
+
+    def send(self, received_hash: int, t_received: float | None = None) -> None:
+        """Queue ACK, t_received (from time.perf_counter) marks when the frame was complete."""
+        if t_received is None:
+            t_received = time.perf_counter()
+        if self.threaded:
+            self._queue.put((received_hash, t_received))
+        else:
+            self.write(received_hash, t_received)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            self.write(*item)
+
+    def write(self, received_hash: int, t_received: float) -> None:
+        """Send ACK immediately from the calling thread."""
+        send_ack(self.serial, received_hash)
+        self.latencies.append(time.perf_counter() - t_received)
+        self.acks_sent += 1
+
+    @property
+    def stats(self) -> dict[str, float]:
+        """ACK-latencies in ms."""
+        latencies = sorted(self.latencies)
+        if not latencies:
+            return {"acks_sent": self.acks_sent}
+        return {
+            "acks_sent": self.acks_sent,
+            "latency_median": 1e3 * statistics.median(latencies),
+            "latency_p99": 1e3 * latencies[int(0.99 * (len(latencies) - 1))],
+            "latency_max": 1e3 * latencies[-1],
+        }
@@ -0,0 +1,181 @@
+"""Raw capture of everything received on the serial ports.
+
+Append-only binary log, little-endian:
+
+    file:    [MAGIC 8B][VERSION 2B] record*
+    record:  [TYPE 1B][TIMESTAMP 8B][PORT 2B][LENGTH 4B][payload]
+
+Every opening of a capture starts with a START record (payload: wall-clock
+time in ns), followed by PORT records (payload: port name), so appended
+sessions stay distinguishable. DATA records hold one received block with
+the monotonic time of its arrival in ns. Corrupt frames and DEBUG text are
+kept as well, as nothing is parsed before capturing.
+"""
+
+import os
+import struct
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from enum import Enum
+from pathlib import Path
+from typing import NamedTuple
+
+from typing_extensions import Self
+
+from .logger import log
+
+MAGIC: bytes = b"BISTCAP\x00"
+VERSION: int = 1
+_FILE_HEADER = struct.Struct("<8sH")
+_RECORD_HEADER = struct.Struct("<BQHI")
+RECORD_HEADER_SIZE: int = _RECORD_HEADER.size
+
+
+class RecordType(int, Enum):
+    """Type of a capture-record, see the module docstring."""
+
+    START = 0
+    PORT = 1
+    DATA = 2
+
+
+_DATA: int = RecordType.DATA.value  # plain int packs faster
+
+
+class Record(NamedTuple):
+    """Decoded capture-record."""
+
+    record_type: RecordType
+    timestamp_ns: int
+    port: int
+    payload: bytes | memoryview
+
+
+class CaptureWriter:
+    """Buffered capture-writer, a background thread writes and fsyncs periodically.
+
+    write() only queues the block with its timestamp (a deque append is
+    thread-safe without a lock). Packing the record headers happens in a
+    batch on flush, so the ingest path stays cheap.
+    """
+
+    def __init__(self, path: Path, flush_interval: float = 1.0) -> None:
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("ab")
+        if self._file.tell() == 0:
+            self._file.write(_FILE_HEADER.pack(MAGIC, VERSION))
+        else:
+            with self.path.open("rb") as file:
+                check_header(file.read(_FILE_HEADER.size))
+        self._pending: deque[tuple[int, int, int, bytes]] = deque()
+        self._lock = threading.Lock()  # orders meta-records and their port-index
+        self._flush_lock = threading.Lock()  # keeps the order of flushed buffers
+        self._ports: list[str] = []
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="CaptureWriter", daemon=True)
+        self.bytes_captured = 0
+        self.records = 0
+        self.fsyncs = 0
+        self._append(RecordType.START, 0, time.time_ns().to_bytes(8, "little"))
+        self._thread.start()
+        log.info("Capturing raw data to %s", self.path)
+
+    def add_port(self, name: str) -> int:
+        """Register a port, returns its index for write()."""
+        with self._lock:
+            self._ports.append(str(name))
+            index = len(self._ports) - 1
+        self._append(RecordType.PORT, index, str(name).encode())
+        return index
+
+    def write(self, port: int, data: bytes) -> None:
+        """Capture a received block (bytes, it is kept until the next flush)."""
+        self._pending.append((_DATA, time.monotonic_ns(), port, data))
+
+    def _append(self, record_type: RecordType, port: int, payload: bytes) -> None:
+        """Add a meta-record."""
+        with self._lock:
+            # timestamp under the lock keeps the records in order
+            self._pending.append((record_type.value, time.monotonic_ns(), port, payload))
+
+    def flush(self, *, fsync: bool = True) -> None:
+        """Pack the queued records and write them to disk, writers are not delayed."""
+        with self._flush_lock:
+            buffer = bytearray()
+            pack = _RECORD_HEADER.pack
+            pending = self._pending
+            for _ in range(len(pending)):
+                record_type, timestamp_ns, port, payload = pending.popleft()
+                buffer += pack(record_type, timestamp_ns, port, len(payload))
+                buffer += payload
+                self.records += 1
+                if record_type == _DATA:
+                    self.bytes_captured += len(payload)
+            if buffer:
+                self._file.write(buffer)
+                self._file.flush()
+                if fsync:
+                    os.fsync(self._file.fileno())
+                    self.fsyncs += 1
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.flush_interval):
+            self._flush_logged()
+
+    def _flush_logged(self) -> None:
+        """Flush of the background thread, which keeps running after an error."""
+        try:
+            self.flush()
+        except OSError as e:
+            log.exception("Capture failed", exc_info=e)
+
+    def close(self) -> None:
+        self._stop_event.set()
+        self._thread.join(timeout=2 * self.flush_interval)
+        self.flush()
+        self._file.close()
+        log.info(
+            "Captured %d bytes in %d records to %s", self.bytes_captured, self.records, self.path
+        )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+
+def check_header(data: bytes | memoryview) -> None:
+    if len(data) < _FILE_HEADER.size:
+        raise ValueError("File is too small for a capture")
+    magic, version = _FILE_HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("File is no capture")
+    if version != VERSION:
+        msg = f"Capture-version {version} is not supported"
+        raise ValueError(msg)
+
+
+def iter_records(data: bytes | memoryview) -> Iterator[Record]:
+    """Decode records of a capture (i.e. a mmap), payloads are views into data.
+
+    A truncated record at the end (crash while writing) is ignored. The
+    caller releases the payloads and closes the iterator when stopping
+    early, so a mmap can be closed afterwards.
+    """
+    check_header(data)
+    with memoryview(data) as view:
+        offset = _FILE_HEADER.size
+        while offset + RECORD_HEADER_SIZE <= len(view):
+            record_type, timestamp_ns, port, length = _RECORD_HEADER.unpack_from(view, offset)
+            offset += RECORD_HEADER_SIZE
+            if offset + length > len(view):
+                log.warning("Capture ends with a truncated record")
+                break
+            payload = view[offset : offset + length]
+            yield Record(RecordType(record_type), timestamp_ns, port, payload)
+            offset += length
@@ -1,6 +1,5 @@
 import signal
 import sys
-import threading
 from importlib import metadata
 from pathlib import Path
 from types import FrameType
@@ -13,6 +12,13 @@ from .concurrent_monitor import offline_mode
 from .helper_serial import serial_port_list
 from .logger import increase_verbose_level
 from .logger import log
+from .multi_monitor import monitor_serials
+from .replay import replay_capture
+from .ring_buffer import OverflowPolicy
+from .simulator import SimulatedPort
+from .simulator import VirtualDevice
+from .simulator import run_simulation
+from .worker_pool import monitor_workers
 
 cli = typer.Typer(help="A serial monitor and analysis tool")
 
@@ -69,33 +75,106 @@ def list_ports() -> None:
 @cli.command("serial")
 def process_serial(
     serial_ports: Annotated[
-        list[str] | str | None, typer.Option(help="will capture every port when omitted")
+        list[str] | None, typer.Option(help="will capture every port when omitted")
+    ] = None,
+    *,
+    debug_lines: Annotated[
+        bool, typer.Option(help="log DEBUG-text of devices, disable on production rigs")
+    ] = True,
+    buffer_policy: Annotated[
+        OverflowPolicy | None,
+        typer.Option(
+            help="behavior when the receive-buffer is full (single port without workers) "
+            "[default: grow]"
+        ),
+    ] = None,
+    workers: Annotated[
+        int, typer.Option(help="shard ports across worker-processes, 0 keeps all in this process")
+    ] = 0,
+    capture: Annotated[
+        Path | None, typer.Option(help="append all received raw data to this binary log")
     ] = None,
 ) -> None:
     """Process live data coming from serial port."""
     if serial_ports is None:
         serial_ports = serial_port_list()
-    if isinstance(serial_ports, str):
-        serial_ports = [serial_ports]
+
+    if not serial_ports:
+        log.error("No serial-port found")
+        return
+    if buffer_policy is not None and (workers > 0 or len(serial_ports) > 1):
+        # one selector-loop serves several ports, it has no receive-buffer
+        log.error("--buffer-policy only applies to a single port without --workers")
+        return
 
     log.info("Receiving Ports: %s", serial_ports)
-    log.info("Note: current implementation only allows 1 Monitor -> will select first in list")
     log.info("Note: press ctrl+c to end service")
 
-    monitor_serial(serial_ports[0])
-
-    uart_threads: list[threading.Thread] = []
-    for port in serial_ports:
-        uart_thread = threading.Thread(
-            target=monitor_serial,
-            args=(port),
-            daemon=True,
+    if workers > 0:
+        monitor_workers(serial_ports, workers, debug_lines=debug_lines, capture=capture)
+    elif len(serial_ports) == 1:
+        monitor_serial(
+            serial_ports[0],
+            debug_lines=debug_lines,
+            buffer_policy=buffer_policy or OverflowPolicy.GROW,
+            capture=capture,
         )
-        uart_thread.start()
-        uart_threads.append(uart_thread)
-
-    for uart_thread in uart_threads:
-        uart_thread.join()
+    else:
+        monitor_serials(serial_ports, debug_lines=debug_lines, capture=capture)
+
+
+@cli.command("replay")
+def replay(
+    path: Path,
+    *,
+    realtime: Annotated[
+        bool,
+        typer.Option("--realtime/--max-speed", help="keep the timing of the recording"),
+    ] = False,
+    debug_lines: Annotated[bool, typer.Option(help="log DEBUG-text of devices")] = True,
+) -> None:
+    """Replay a raw capture through the live receive-pipeline."""
+    replay_capture(path, realtime=realtime, debug_lines=debug_lines)
+
+
+@cli.command("simulate")
+def simulate(
+    devices: Annotated[int, typer.Option(help="number of virtual devices (one port each)")] = 1,
+    *,
+    family: Annotated[str, typer.Option(help="device family reported in the header")] = "NRF52840",
+    pins: Annotated[int, typer.Option(help="pins per device")] = 48,
+    sessions: Annotated[int, typer.Option(help="test sessions per device")] = 7,
+    pins_per_chunk: Annotated[int, typer.Option(help="pins per chunk-packet")] = 2,
+    chunk_rate: Annotated[float, typer.Option(help="frames per second, 0 is unlimited")] = 0,
+    ack: Annotated[bool, typer.Option(help="request ACKs and retransmit without")] = True,
+    ack_timeout: Annotated[float, typer.Option(help="seconds until a retransmission")] = 0.5,
+    retries: Annotated[int, typer.Option(help="retransmissions until a frame is skipped")] = 5,
+    noise: Annotated[float, typer.Option(help="probability of a corrupted frame")] = 0,
+    rounds: Annotated[int, typer.Option(help="repetitions of the test-data, 0 is endless")] = 1,
+    debug_lines: Annotated[bool, typer.Option(help="send DEBUG-text between frames")] = False,
+    seed: Annotated[int | None, typer.Option(help="seed for reproducible test-data")] = None,
+) -> None:
+    """Simulate BIST devices on pseudo-terminals (linux / macOS)."""
+    ports = [
+        SimulatedPort(
+            VirtualDevice(
+                family,
+                pins=pins,
+                sessions=sessions,
+                pins_per_chunk=pins_per_chunk,
+                ack_requested=ack,
+                seed=None if seed is None else seed + index,
+            ),
+            rounds=rounds,
+            chunk_rate=chunk_rate,
+            ack_timeout=ack_timeout,
+            retries=retries,
+            noise=noise,
+            debug_lines=debug_lines,
+        )
+        for index in range(devices)
+    ]
+    run_simulation(ports)
 
 
 if __name__ == "__main__":
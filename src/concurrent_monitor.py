@@ -3,233 +3,175 @@ import select
 import sys
 import threading
 import time
+from collections.abc import Callable
+from functools import partial
 from pathlib import Path
 
-import cbor2
-import crcmod
 from serial import Serial
 
+from .ack_writer import AckWriter
+from .capture import CaptureWriter
+from .config_framework import HeaderKey
 from .data_storage import DeviceDataCollector
+from .data_storage import chunk_in_range
+from .framing import DebugLineExtractor
+from .framing import FrameParser
+from .framing import FrameType
 from .logger import log
+from .packet import Packet
+from .packet import parse_packet
+from .ring_buffer import ByteRingBuffer
+from .ring_buffer import OverflowPolicy
+
+# Blocking reads return at least this often to check for a stop-request
+IDLE_TIMEOUT: float = 0.25
+
+
+def process_frame(
+    ack_writer: AckWriter,
+    packet_queue: queue.SimpleQueue,
+    collector: DeviceDataCollector,
+    frame_type: FrameType,
+    payload: memoryview,
+) -> None:
+    """Parse a framed packet, acknowledge it right away and queue it for the collector.
+
+    Chunks with a chunk-id outside of the last header of the port are neither
+    acknowledged nor collected, so the device sends them again.
+    """
+    t_received = time.perf_counter()
+    packet = parse_packet(payload, has_packet_id=frame_type == FrameType.CHUNK)
+    if not packet:
+        return
+    if frame_type == FrameType.HEADER:
+        if packet.hash_valid:
+            collector.announced_chunks = packet.data.get(HeaderKey.TOTAL_CHUNKS, 0)
+    elif not chunk_in_range(packet.chunk_id, collector.announced_chunks):
+        log.warning(f"Chunk {packet.chunk_id} is out of range, no ACK sent")
+        return
+
+    if packet.ack_requested:
+        # Send ACK if hash is valid
+        if packet.hash_valid:
+            ack_writer.send(packet.received_hash, t_received)
+        else:
+            log.warning("Hash invalid, no ACK sent")
+    else:
+        log.debug("ACK not requested, no ACK sent")
 
-# Protocol identifiers (4 bytes each, little endian)
-HEADER_START: bytes = bytes([0x0C, 0x0B, 0x0A, 0x09])
-HEADER_END: bytes = bytes([0x10, 0x0F, 0x0E, 0x0D])
-CHUNK_START: bytes = bytes([0x04, 0x03, 0x02, 0x01])
-CHUNK_END: bytes = bytes([0x08, 0x07, 0x06, 0x05])
-
-# CRC calculation
-calculate_crc = crcmod.predefined.mkPredefinedCrcFun("crc-32")
-
-# ACK protocol
-ACK_START: int = 0x191A1B1C
-ACK_END: int = 0x1D1E1F20
-
-ACK_REQUESTED: int = 8
-
-
-def send_ack(serial: Serial, received_hash):
-    """Send simple ACK with crc"""
-    try:
-        ack_data = bytearray()
-        ack_data.extend(ACK_START.to_bytes(4, "little"))
-        ack_data.extend(received_hash.to_bytes(4, "little"))
-        ack_data.extend(ACK_END.to_bytes(4, "little"))
-
-        serial.write(ack_data)
-        log.debug(f"ACK sent for crc: 0x{received_hash:08X}")
-    except Exception as e:
-        log.exception("ACK send failed", exc_info=e)
-
+    packet_queue.put((collector, frame_type, packet))
 
-def parse_packet(hex_data, *, has_packet_id=False):
-    """Parse CBOR packet: [PACKET_ID?][LENGTH][CBOR][CRC]"""
-    try:
-        offset = 0
-        packet_id = -1
 
-        if has_packet_id:
-            packet_id = int.from_bytes(bytes.fromhex(hex_data[:8]), "little")
-            offset = 4
+def process_packet(collector: DeviceDataCollector, frame_type: FrameType, packet: Packet) -> None:
+    """Hand a packet to the collector."""
+    data = packet.data
+    if frame_type == FrameType.HEADER:
+        # Debug: Print CBOR structure with keys
+        log.debug(f"CBOR Header: Device Family {data.get(1)}, Total Chunks {data.get(2)}")
+        log.debug(f"📦 CBOR Header Data: {data}")
 
-        # Extract length (2 bytes, little endian)
-        length = int.from_bytes(bytes.fromhex(hex_data[offset * 2 : offset * 2 + 4]), "little")
+        # Process header in collector
+        collector.process_header(packet)
+    else:
+        # Debug: Print CBOR structure with keys
+        log.debug(f"Received Chunk {data.get(0)} (Packet ID: {packet.packet_id})")
+        log.debug(f"CBOR Data: {data}")
 
-        # Extract CBOR data
-        cbor_start = offset * 2 + 4
-        cbor_end = cbor_start + length * 2
-        cbor_hex = hex_data[cbor_start:cbor_end]
-        cbor_bytes = bytes.fromhex(cbor_hex)
+        # Process chunk in collector
+        collector.process_chunk(packet)
 
-        # Extract hash (4 bytes at end)
-        hash_hex = hex_data[cbor_end : cbor_end + 8]
-        received_hash = int.from_bytes(bytes.fromhex(hash_hex), "little")
+        # Check if collection is complete and export CBOR
+        collector.is_complete()
 
-        # Verify hash
-        calculated_hash = calculate_crc(cbor_bytes)
-        hash_valid = received_hash == calculated_hash
 
-        # Decode CBOR
+def collector_worker(packet_queue: queue.SimpleQueue) -> None:
+    """Process 3: Feed packets to the collector, decoupled from framing and ACKs"""
+    log.debug("Collector thread started")
+    while True:
+        item = packet_queue.get()
+        if item is None:
+            break
         try:
-            decoded = cbor2.loads(cbor_bytes)
-        except:
-            decoded = {"error": "cbor decode failed"}
-
-        return {
-            "ack_requested": decoded.get(ACK_REQUESTED, 0),
-            "packet_id": packet_id,
-            "data": decoded,
-            "hash_valid": hash_valid,
-            "received_hash": received_hash,
-            "calculated_hash": calculated_hash,
-            "raw_bytes": cbor_bytes,
-        }
-    except Exception as e:
-        log.exception("Parse packet error", exc_info=e)
-    return None
+            process_packet(*item)
+        except Exception as e:
+            log.exception("Collector error", exc_info=e)
+    log.debug("Collector stopped")
 
 
-def serial_reader(serial: Serial, data_queue, stop_event):
+def serial_reader(
+    serial: Serial,
+    rx_buffer: ByteRingBuffer,
+    stop_event,
+    capture: Callable[[bytes], None] | None = None,
+):
+    """Process 1: Read from serial port, blocks until data arrives or timeout expires"""
     log.debug("Serial reader thread started")
 
-    while not stop_event.is_set():
-        try:
-            if serial.in_waiting:
-                new_data = serial.read(serial.in_waiting)
-                if new_data:
-                    data_queue.put(new_data)
-            else:
-                time.sleep(0.001)  # Very small delay when no data
+    try:
+        while not stop_event.is_set():
+            # read() blocks (select-based) for the first byte, the rest is fetched at once
+            new_data = serial.read(max(1, serial.in_waiting))
+            if new_data:
+                if serial.in_waiting:
+                    new_data += serial.read(serial.in_waiting)
+                if capture:
+                    capture(new_data)
+                rx_buffer.put(new_data)
 
-        except Exception as e:
-            log.exception("Reader error", exc_info=e)
-            break
+    except Exception as e:
+        log.exception("Reader error", exc_info=e)
 
     log.debug("Serial reader stopped")
 
 
-def packet_processor(serial: Serial, data_queue, stop_event, collector):
+def packet_processor(
+    rx_buffer: ByteRingBuffer,
+    stop_event,
+    ack_writer: AckWriter,
+    packet_queue: queue.SimpleQueue,
+    collector: DeviceDataCollector,
+    *,
+    debug_lines: bool = True,
+):
     """Process 2: Process incoming data and handle protocol"""
     log.debug("Packet processor thread started")
 
-    buffer = bytearray()
-    packet_data = bytearray()
-    debug_buffer = bytearray()
-    receiving_header = False
-    receiving_chunk = False
+    framer = FrameParser()
+    debug_extractor = DebugLineExtractor() if debug_lines else None
 
     while not stop_event.is_set():
         try:
-            # Get data from queue (non-blocking)
-            try:
-                new_data = data_queue.get_nowait()
-
-                # Extract DEBUG messages
-                for byte in new_data:
-                    debug_buffer.append(byte)
-
-                    # Check if we have a complete line ending with \n
-                    if byte == ord("\n"):
-                        try:
-                            line_text = debug_buffer.decode("utf-8", errors="ignore").strip()
-                            # Only print if it starts with DEBUG:
-                            if line_text.startswith("DEBUG:"):
-                                log.debug(line_text)
-                        except:
-                            pass
-                        debug_buffer.clear()  # Clear for next line
-
-                    # Prevent memory leak - clear if buffer gets too large
-                    elif len(debug_buffer) > 1000:
-                        debug_buffer.clear()
-
-                # Add all data to binary protocol buffer (unmodified)
-                buffer.extend(new_data)
-
-            except queue.Empty:
-                time.sleep(0.0001)
+            # Wait for data (all fragments at once), the timeout only serves to check the stop-event
+            new_data = rx_buffer.get(timeout=IDLE_TIMEOUT)
+            if not new_data:
                 continue
 
-            # Look for protocol markers (binary protocol handling)
-            while len(buffer) >= 4:
-                if buffer[:4] == HEADER_START:
-                    log.debug("=== Header Start ===")
-                    receiving_header = True
-                    packet_data = bytearray()
-                    buffer = buffer[4:]
-
-                elif buffer[:4] == HEADER_END:
-                    log.debug("=== Header End ===")
-                    receiving_header = False
-                    if packet_data:
-                        result = parse_packet(packet_data.hex(), has_packet_id=False)
-
-                        # Debug: Print CBOR structure with keys
-                        data = result.get("data", {})
-                        log.debug(
-                            f"CBOR Header: Device Family {data.get(1)}, Total Chunks {data.get(2)}"
-                        )
-                        log.debug(f"📦 CBOR Header Data: {data}")
-
-                        # Process header in collector
-                        collector.process_header(result)
-
-                        if result.get("ack_requested", 1):
-                            # Send ACK if hash is valid
-                            if result["hash_valid"]:
-                                send_ack(serial, result["received_hash"])
-                            else:
-                                log.warning("Hash invalid, no ACK sent")
-                        else:
-                            log.debug("ACK not requested, no ACK sent")
-                    packet_data = bytearray()
-                    buffer = buffer[4:]
-
-                elif buffer[:4] == CHUNK_START:
-                    receiving_chunk = True
-                    packet_data = bytearray()
-                    buffer = buffer[4:]
-
-                elif buffer[:4] == CHUNK_END:
-                    receiving_chunk = False
-                    if packet_data:
-                        result = parse_packet(packet_data.hex(), has_packet_id=True)
-                        if result:
-                            # Debug: Print CBOR structure with keys
-                            data = result.get("data", {})
-                            log.debug(
-                                f"Received Chunk {data.get(0)} (Packet ID: {result['packet_id']})"
-                            )
-                            log.debug(f"CBOR Data: {data}")
-
-                            # Process chunk in collector
-                            collector.process_chunk(result)
-
-                            # Check if collection is complete and export CBOR
-                            collector.is_complete()
-
-                            if result.get("ack_requested", 1):
-                                # Send ACK if hash is valid
-                                if result["hash_valid"]:
-                                    send_ack(serial, result["received_hash"])
-                                else:
-                                    log.warning("Hash invalid, no ACK sent")
-                            else:
-                                log.debug("ACK not requested, no ACK sent")
-                    packet_data = bytearray()
-                    buffer = buffer[4:]
-
-                elif receiving_header or receiving_chunk:
-                    # Collect packet data
-                    packet_data.append(buffer[0])
-                    buffer = buffer[1:]
-                else:
-                    # Skip unknown byte
-                    buffer = buffer[1:]
+            # Extract DEBUG messages
+            if debug_extractor:
+                for line_text in debug_extractor.feed(new_data):
+                    log.debug(line_text)
+
+            # Binary protocol handling (unmodified data)
+            for frame_type, payload in framer.feed(new_data):
+                process_frame(ack_writer, packet_queue, collector, frame_type, payload)
 
         except Exception as e:
             log.exception("Processor error", exc_info=e)
 
+    log.info(
+        "Framing: %d headers, %d chunks, %d resyncs, %d bytes skipped",
+        framer.frames_header,
+        framer.frames_chunk,
+        framer.resyncs,
+        framer.bytes_skipped,
+    )
+    log.info(
+        "Receive buffer: high-water %d of %d bytes, %d bytes dropped, %d writes blocked",
+        rx_buffer.high_water,
+        rx_buffer.capacity,
+        rx_buffer.bytes_dropped,
+        rx_buffer.writes_blocked,
+    )
     log.debug("Packet processor stopped")
 
 
@@ -258,34 +200,58 @@ def offline_mode(file: Path):
         log.error("Failed to load data.")
 
 
-def monitor_serial(serial_port: str, baudrate: int = 9600):
-    """Concurrent serial monitor with two threads"""
+def monitor_serial(
+    serial_port: str,
+    baudrate: int = 9600,
+    *,
+    debug_lines: bool = True,
+    buffer_policy: OverflowPolicy = OverflowPolicy.GROW,
+    capture: Path | None = None,
+):
+    """Concurrent serial monitor with threads for reading, framing, ACKs and collecting"""
     log.debug(f"Opening {serial_port} at {baudrate} baud...")
 
     collector = DeviceDataCollector()
 
-    with Serial(serial_port, baudrate, timeout=1) as serial:
-        data_queue = queue.Queue(maxsize=1000)
+    with Serial(serial_port, baudrate, timeout=IDLE_TIMEOUT) as serial:
+        rx_buffer = ByteRingBuffer(policy=buffer_policy)
+        packet_queue = queue.SimpleQueue()
+        ack_writer = AckWriter(serial)
         stop_event = threading.Event()
 
         log.info("Starting concurrent monitoring...")
         log.info("Press 's' to save, 'r' to save raw XML, 'v' to visualize")
 
+        capture_writer = CaptureWriter(capture) if capture else None
+        capture_port = None
+        if capture_writer:
+            capture_port = partial(capture_writer.write, capture_writer.add_port(serial_port))
+
         reader_thread = threading.Thread(
-            target=serial_reader, args=(serial, data_queue, stop_event), name="SerialReader"
+            target=serial_reader,
+            args=(serial, rx_buffer, stop_event, capture_port),
+            name="SerialReader",
         )
 
         processor_thread = threading.Thread(
             target=packet_processor,
-            args=(serial, data_queue, stop_event, collector),
+            args=(rx_buffer, stop_event, ack_writer, packet_queue, collector),
+            kwargs={"debug_lines": debug_lines},
             name="PacketProcessor",
         )
 
+        collector_thread = threading.Thread(
+            target=collector_worker, args=(packet_queue,), name="Collector"
+        )
+
         reader_thread.daemon = True
         processor_thread.daemon = True
+        collector_thread.daemon = True
 
+        ack_writer.start()
         reader_thread.start()
         processor_thread.start()
+        collector_thread.start()
 
         try:
             while True:
@@ -300,7 +266,10 @@ def monitor_serial(serial_port: str, baudrate: int = 9600):
                     elif cmd == "q":
                         break
 
-                if not reader_thread.is_alive() or not processor_thread.is_alive():
+                if not all(
+                    thread.is_alive()
+                    for thread in (reader_thread, processor_thread, collector_thread, ack_writer)
+                ):
                     log.warning("Thread died")
                     break
 
@@ -316,5 +285,11 @@ def monitor_serial(serial_port: str, baudrate: int = 9600):
                 timeout=2
             )  # TODO: this does not kill the process, could survive as zombie
             processor_thread.join(timeout=2)
+            packet_queue.put(None)
+            collector_thread.join(timeout=2)
+            ack_writer.stop()
+            log.info("ACKs: %s", ack_writer.stats)
+            if capture_writer:
+                capture_writer.close()
 
             log.debug("Monitor stopped")
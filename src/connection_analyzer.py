@@ -6,12 +6,13 @@ Analyzes pin connections and creates coordinate system vectors
 from pathlib import Path
 
 import matplotlib.pyplot as plt
+import numpy as np
 import seaborn as sns
 
 from .config_framework import PHASE_VECTORS
 from .config_framework import ConnectionType
-from .config_framework import FrameworkKey
 from .config_targets import get_pin_name
+from .connection_table import pin_major_rows
 from .logger import log
 
 # Phase masking is now handled in data_storage.py before vector analysis
@@ -27,57 +28,44 @@ def analyze_connections(collector):
         # Track connections by pin pairs
         pair_connections = {}
 
-        # Process all pins
-        for pin in device_data["pins"]:
-            source_pin = pin["pin"]
-
-            # Process all connections of this pin
-            for conn in pin["connections"]:
-                conn_type = conn.get(FrameworkKey.CONNECTION_TYPE, 0)
-
-                # Skip masked connections
-                if conn.get("masked", False):
-                    continue
-
-                # Skip phase-masked connections
-                if conn.get("phase_masked", False):
-                    continue
-
-                # Get phase for this connection
-                original_phase = conn.get(FrameworkKey.CONNECTION_PARAMETER, -1)
-
-                # Only process internal connections
-                if conn_type == ConnectionType.INTERNAL:
-                    target_pin = conn.get(FrameworkKey.OTHER_PIN)
-                    phase = conn.get(FrameworkKey.CONNECTION_PARAMETER, -1)
-
-                    # Skip if phase is invalid
-                    if phase not in PHASE_VECTORS:
-                        continue
-
-                    # Determine Pin A (smaller number) and Pin B (larger number)
-                    pin_a = min(source_pin, target_pin)
-                    pin_b = max(source_pin, target_pin)
-                    pair_key = f"{pin_a}-{pin_b}"
-
-                    if pair_key not in pair_connections:
-                        pair_connections[pair_key] = {
-                            "pin_a": pin_a,
-                            "pin_b": pin_b,
-                            "a_to_b_vectors": [],
-                            "b_to_a_vectors": [],
-                            "phases": set(),
-                        }
+        # Process all unmasked internal connections with a valid phase, in order of the pins
+        table = device_data["connections"]
+        rows = pin_major_rows(device_data["pins"])
+        rows = rows[
+            (table.type[rows] == ConnectionType.INTERNAL)
+            & ~table.masked[rows]
+            & ~table.phase_masked[rows]
+            & np.isin(table.param[rows], list(PHASE_VECTORS))
+        ]
+        for source_pin, target_pin, phase, count in zip(
+            table.source[rows].tolist(),
+            table.other[rows].tolist(),
+            table.param[rows].tolist(),
+            table.count[rows].tolist(),
+            strict=True,
+        ):
+            # Determine Pin A (smaller number) and Pin B (larger number)
+            pin_a = min(source_pin, target_pin)
+            pin_b = max(source_pin, target_pin)
+            pair_key = f"{pin_a}-{pin_b}"
+
+            if pair_key not in pair_connections:
+                pair_connections[pair_key] = {
+                    "pin_a": pin_a,
+                    "pin_b": pin_b,
+                    "a_to_b_vectors": [],
+                    "b_to_a_vectors": [],
+                    "phases": set(),
+                }
 
-                    # Track which phases exist for this pin pair
-                    pair_connections[pair_key]["phases"].add(phase)
+            # Track which phases exist for this pin pair
+            pair_connections[pair_key]["phases"].add(phase)
 
-                    # Determine direction and add vector (2D)
-                    direction = "A_to_B" if source_pin == pin_a else "B_to_A"
-                    vector_2d = PHASE_VECTORS[phase][direction]  # This is now a (x, y) tuple
-                    pair_connections[pair_key][f"{direction.lower()}_vectors"].append(
-                        (vector_2d, phase)
-                    )
+            # Determine direction and add vector (2D), once per session that reported it
+            direction = "A_to_B" if source_pin == pin_a else "B_to_A"
+            x, y = PHASE_VECTORS[phase][direction]
+            vector_2d = (count * x, count * y)
+            pair_connections[pair_key][f"{direction.lower()}_vectors"].append((vector_2d, phase))
 
         # Store all individual phase vectors with filtering
         for data in pair_connections.values():
@@ -192,7 +180,7 @@ def analyze_connections(collector):
 
 def create_vector_plots(collector, base_dir: Path):
     """Create connection vector plots in the given directory"""
-    results = analyze_connections(collector)
+    results = collector.get_connection_vectors()
 
     # Set seaborn style for better looking plots
     sns.set_style("whitegrid")
@@ -410,7 +398,7 @@ def create_vector_plots(collector, base_dir: Path):
 
 def print_vectors(collector):
     """Print simple vector summary"""
-    results = analyze_connections(collector)
+    results = collector.get_connection_vectors()
 
     for device_family, summary_data in results.items():
         log.debug(f"\n=== Connection Vectors - Device {device_family} ===")
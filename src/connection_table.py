@@ -0,0 +1,288 @@
+"""Columnar Connection Store
+
+All connections of a device are kept in one table of numpy columns (source
+pin, other pin, parameter, type, the mask flags and how often it was
+reported), that grows by doubling its capacity. Analysis works on whole
+columns. For backward compatibility pin["connections"] is a ConnectionView,
+a list-like view of the rows of that pin, whose items behave like the former
+connection-dicts.
+
+Every connection is stored once: a connection that is reported again, i.e.
+by a later session, only increments its count.
+"""
+
+from collections.abc import Hashable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Mapping
+from collections.abc import MutableMapping
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+
+from .config_framework import ConnectionType
+from .config_framework import FrameworkKey
+
+MISSING: int = -1  # stored for missing / non-integer values
+
+COLUMNS: Mapping[str, type] = {
+    "source": np.int32,
+    "other": np.int32,
+    "param": np.int64,
+    "type": np.int8,
+    "masked": np.bool_,
+    "phase_masked": np.bool_,
+    "count": np.int32,
+}
+
+# keys of the connection-dicts -> columns
+KEY_2_COLUMN: Mapping = {
+    FrameworkKey.OTHER_PIN: "other",
+    FrameworkKey.CONNECTION_PARAMETER: "param",
+    FrameworkKey.CONNECTION_TYPE: "type",
+    "masked": "masked",
+    "phase_masked": "phase_masked",
+    "count": "count",
+}
+
+_LIMITS: Mapping[str, tuple[int, int]] = {
+    name: (int(np.iinfo(dtype).min), int(np.iinfo(dtype).max))
+    for name, dtype in COLUMNS.items()
+    if dtype != np.bool_
+}
+
+
+def _as_int(value: object, column: str) -> int:
+    low, high = _LIMITS[column]
+    if isinstance(value, int) and low <= value <= high:
+        return int(value)
+    return MISSING
+
+
+class ConnectionTable:
+    """Connections of all pins of one device as numpy columns."""
+
+    def __init__(self, capacity: int = 64) -> None:
+        self.size = 0
+        self._data = {name: np.zeros(capacity, dtype=dtype) for name, dtype in COLUMNS.items()}
+        # parameters that are no integers (param-column is MISSING), by row
+        self.other_params: dict[int, object] = {}
+        # (source, other, param, type) as reported -> row
+        self._row_of: dict[tuple, int] = {}
+
+    def __len__(self) -> int:
+        return self.size
+
+    def column(self, name: str) -> np.ndarray:
+        """Writable view of the filled part of a column."""
+        return self._data[name][: self.size]
+
+    @property
+    def source(self) -> np.ndarray:
+        return self.column("source")
+
+    @property
+    def other(self) -> np.ndarray:
+        return self.column("other")
+
+    @property
+    def param(self) -> np.ndarray:
+        return self.column("param")
+
+    @property
+    def type(self) -> np.ndarray:
+        return self.column("type")
+
+    @property
+    def masked(self) -> np.ndarray:
+        return self.column("masked")
+
+    @property
+    def phase_masked(self) -> np.ndarray:
+        return self.column("phase_masked")
+
+    @property
+    def count(self) -> np.ndarray:
+        return self.column("count")
+
+    def append(self, source: int, other: object, param: object, conn_type: object = 0) -> int:
+        """Add a connection, or count a known one again, and return its row."""
+        return self.extend([(source, other, param, conn_type)])[0]
+
+    def extend(self, connections: Sequence[tuple]) -> list[int]:
+        """Add connections (source, other, param, type), or count known ones again.
+
+        Returns the row of every connection, new rows are numbered from len(table) on.
+        """
+        rows = []
+        new = []
+        known = []
+        for connection in connections:
+            next_row = self.size + len(new)
+            try:
+                row = self._row_of.setdefault(connection, next_row)
+            except TypeError:  # unhashable values are never merged
+                row = next_row
+            if row == next_row:
+                new.append(connection)
+            else:
+                known.append(row)
+            rows.append(row)
+        if new:
+            self._write(new)
+        if known:
+            np.add.at(self._data["count"], known, 1)
+        return rows
+
+    def _write(self, connections: list[tuple]) -> None:
+        start = self.size
+        end = start + len(connections)
+        capacity = len(self._data["source"])
+        if end > capacity:
+            while capacity < end:
+                capacity *= 2
+            for name, values in self._data.items():
+                grown = np.zeros(capacity, dtype=values.dtype)
+                grown[:start] = values[:start]
+                self._data[name] = grown
+        sources, others, params, types = zip(*connections, strict=True)
+        self._data["source"][start:end] = [_as_int(value, "source") for value in sources]
+        self._data["other"][start:end] = [_as_int(value, "other") for value in others]
+        param_values = [_as_int(value, "param") for value in params]
+        self._data["param"][start:end] = param_values
+        for row, value, param in zip(range(start, end), param_values, params, strict=True):
+            if value == MISSING and param != MISSING:
+                self.other_params[row] = param
+        self._data["type"][start:end] = [_as_int(value, "type") for value in types]
+        self._data["count"][start:end] = 1
+        self.size = end
+
+
+class Connection(MutableMapping):
+    """Dict-compatible access to one row of a ConnectionTable."""
+
+    __slots__ = ("row", "table")
+
+    def __init__(self, table: ConnectionTable, row: int) -> None:
+        self.table = table
+        self.row = row
+
+    def __getitem__(self, key: Hashable) -> Any:
+        if key == FrameworkKey.CONNECTION_PARAMETER and self.row in self.table.other_params:
+            return self.table.other_params[self.row]
+        value = self.table.column(KEY_2_COLUMN[key])[self.row]
+        return bool(value) if value.dtype == np.bool_ else int(value)
+
+    def __setitem__(self, key: Hashable, value: object) -> None:
+        column = KEY_2_COLUMN[key]
+        if column == "param":
+            self.table.other_params.pop(self.row, None)
+            if _as_int(value, column) == MISSING and value != MISSING:
+                self.table.other_params[self.row] = value
+        if column in _LIMITS:
+            value = _as_int(value, column)
+        self.table.column(column)[self.row] = value
+
+    def __delitem__(self, key: Hashable) -> None:
+        raise TypeError("columns of a connection can't be removed")
+
+    def __iter__(self) -> Iterator:
+        return iter(KEY_2_COLUMN)
+
+    def __len__(self) -> int:
+        return len(KEY_2_COLUMN)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class ConnectionView(Sequence):
+    """The connections of one pin, a list-like view into the table of the device."""
+
+    def __init__(self, table: ConnectionTable, pin: int) -> None:
+        self.table = table
+        self.pin = pin
+        self._rows: list[int] = []
+
+    @property
+    def rows(self) -> np.ndarray:
+        return np.array(self._rows, dtype=np.int64)
+
+    def __getitem__(self, index: int | slice) -> Connection | list[Connection]:
+        if isinstance(index, slice):
+            return [Connection(self.table, row) for row in self._rows[index]]
+        return Connection(self.table, self._rows[index])
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add_row(self, row: int) -> None:
+        """Attach a new row of the table, a connection of this pin."""
+        self._rows.append(row)
+
+    def append(self, connection: Mapping) -> None:
+        self.extend([connection])
+
+    def extend(self, connections: Iterable[Mapping]) -> None:
+        next_row = len(self.table)
+        rows = self.table.extend(
+            [
+                (
+                    self.pin,
+                    connection.get(FrameworkKey.OTHER_PIN),
+                    connection.get(FrameworkKey.CONNECTION_PARAMETER),
+                    connection.get(FrameworkKey.CONNECTION_TYPE, 0),
+                )
+                for connection in connections
+            ]
+        )
+        for row in rows:
+            if row == next_row:  # a new connection of this pin
+                self._rows.append(row)
+                next_row += 1
+
+
+def pin_major_rows(pins: Sequence) -> np.ndarray:
+    """Rows of the connections in order of the pins (and arrival per pin)."""
+    if not pins:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate([pin["connections"].rows for pin in pins])
+
+
+def lookup(mapping: Mapping[int, int], keys: np.ndarray, default: int = 0) -> np.ndarray:
+    """Vectorized mapping.get(key, default) for integer keys."""
+    known = np.array(sorted(key for key in mapping if isinstance(key, int)), dtype=np.int64)
+    values = np.array([mapping[key] for key in known.tolist()], dtype=np.int64)
+    if not len(known):
+        return np.full(len(keys), default, dtype=np.int64)
+    index = np.minimum(np.searchsorted(known, keys), len(known) - 1)
+    return np.where(known[index] == keys, values[index], default)
+
+
+class ExternalConnections:
+    """Sparse adjacency of the external connections of all devices of a collector.
+
+    Edges (pin, other pin) are grouped by (device, other device), the other
+    device being the connection-parameter as sent by the device.
+    """
+
+    def __init__(self) -> None:
+        self.edges: dict[tuple, list[tuple]] = {}
+
+    def add(self, family: str, other_family: object, pin: int, other_pin: int) -> None:
+        if isinstance(other_family, Hashable):
+            self.edges.setdefault((family, other_family), []).append((pin, other_pin))
+
+    def add_device(self, family: str, table: ConnectionTable) -> None:
+        """Add all external connections of a device (i.e. received from a worker)."""
+        for row in np.flatnonzero(table.type == ConnectionType.EXTERNAL).tolist():
+            other_family = table.other_params.get(row, int(table.param[row]))
+            self.add(family, other_family, int(table.source[row]), int(table.other[row]))
+
+    def remove_device(self, family: str) -> None:
+        for key in [key for key in self.edges if key[0] == family]:
+            del self.edges[key]
+
+    def between(self, family: str, other_family: Hashable) -> list[tuple]:
+        return self.edges.get((family, other_family), [])
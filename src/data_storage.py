@@ -1,11 +1,13 @@
 import base64
 import hashlib
+import itertools
 import sys
+from collections.abc import Mapping
 from datetime import datetime
 from datetime import timezone
 from pathlib import Path
 
-import cbor2
+import numpy as np
 import pandas as pd
 
 from .config_framework import PHASE_NAMES
@@ -14,13 +16,26 @@ from .config_framework import FrameworkKey
 from .config_framework import HeaderKey
 from .config_targets import get_all_pins_sorted
 from .config_targets import get_pin_name
+from .connection_analyzer import analyze_connections
 from .connection_analyzer import create_vector_plots
 from .connection_analyzer import print_vectors
+from .connection_table import ConnectionView
+from .connection_table import ExternalConnections
+from .connection_table import lookup
+from .device_model import Device
+from .device_model import Pin
+from .event_decoder import EVENT_MASKS
 from .event_decoder import PIN_EVENT_TYPES
+from .event_decoder import PIN_EVENTS_REVERSED
 from .event_decoder import decode_event_type_one_hot
 from .logger import log
-from .phase_masking import keep_phase
-from .pin_analyzer import analyze_pin
+from .packet import Packet
+from .packet import pin_records
+from .phase_masking import KEEP_PHASE_TABLE
+from .phase_masking import mask_weak_connections
+from .pin_analyzer import UNKNOWN_STRENGTH
+from .pin_analyzer import analyze_pin_mask
+from .pin_analyzer import analyze_pin_masks
 
 
 class TeeOutput:
@@ -39,17 +54,83 @@ class TeeOutput:
         self.log.flush()
 
 
+_NO_PAIRS = np.empty(0, dtype=np.int64)
+
+
+def _pin_pairs(table, rows):
+    """Directional (source, other) pin pairs of connections as one int64 key"""
+    return (table.source[rows].astype(np.int64) << 32) | (
+        table.other[rows].astype(np.int64) & 0xFFFFFFFF
+    )
+
+
+def get_pin_index(device):
+    """Pin-number -> pin-entry of a device, device["pins"] keeps the order of arrival"""
+    if "pin_index" not in device:  # i.e. device-dicts assembled by hand
+        device["pin_index"] = {pin["pin"]: pin for pin in device["pins"]}
+    return device["pin_index"]
+
+
+def chunk_in_range(chunk_id, total_chunks):
+    """Whether a chunk-id is one the header announced, any is accepted without a total"""
+    return not total_chunks or (isinstance(chunk_id, int) and 0 <= chunk_id < total_chunks)
+
+
+# Events that mark a pin as not working in a phase, events that are not defined
+# by the framework (phases 0, 1, 4, 5 ATM) can't mark a pin as broken
+PHASE_ERROR_EVENTS: Mapping[int, str] = {
+    0: "PIN_IS_NOT_LOW_WHEN_ONE_SET_PULLDOWN",
+    1: "PIN_IS_NOT_HIGH_WHEN_ONE_SET_PULLUP",
+    2: "PIN_IS_NOT_LOW_WHEN_DRIVEN_LOW",
+    3: "PIN_IS_NOT_HIGH_WHEN_DRIVEN_HIGH",
+    4: "PIN_IS_NOT_LOW_WHEN_ALLPULLUP_LOW",
+    5: "PIN_IS_NOT_HIGH_WHEN_ALLPULLDOWN_HIGH",
+}
+PHASE_ERROR_MASKS = np.array(
+    [EVENT_MASKS.get(PHASE_ERROR_EVENTS[phase], 0) for phase in range(6)], dtype=np.int64
+)
+
+
 class DeviceDataCollector:
     """Collects and processes device pin data from CBOR packets"""
 
     def __init__(self):
         self.devices = {}
+        self.external_connections = ExternalConnections()
+        # Derived data (matrices, strengths, vectors) by key, stamped with the data-version
+        self._cache = {}
+        self._versions = itertools.count()
+        self.cache_hits = 0
+        self.cache_misses = 0
         self.current_device_family = None
+        self.announced_chunks = 0  # of the last header on receive, checked before the ACK
         self.output_file = None
         self.original_stdout = None
         self.capture_started = False
 
     # ===== Helper Methods =====
+    def _touch(self, device):
+        """Stamp a new version on a modified device, invalidates its derived data.
+
+        Has to be called by everything that modifies a device, besides
+        process_header / process_chunk and the masking this happens nowhere ATM.
+        """
+        device["data_version"] = next(self._versions)
+
+    def _cached(self, key, version, compute):
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] == version:
+            self.cache_hits += 1
+            return entry[1]
+        self.cache_misses += 1
+        value = compute()
+        self._cache[key] = (version, value)
+        return value
+
+    @property
+    def cache_stats(self):
+        return {"hits": self.cache_hits, "misses": self.cache_misses, "entries": len(self._cache)}
+
     def _save_matrix(self, df, title=None, filename=None):
         if title:
             log.info(f"\n=== {title} ===")
@@ -94,11 +175,11 @@ class DeviceDataCollector:
 
     # ===== Data Processing Methods =====
 
-    def process_header(self, header_result):
-        if not header_result or not header_result.get("hash_valid"):
+    def process_header(self, header: Packet | None):
+        if not header or not header.hash_valid:
             return False
 
-        header_data = header_result.get("data", {})
+        header_data = header.data
         device_family = header_data.get(HeaderKey.DEVICE_FAMILY)
         if device_family is None:
             return False
@@ -109,160 +190,201 @@ class DeviceDataCollector:
         self.current_device_family = device_family
 
         # Clear existing data for this device_family when new header received
-        self.devices[device_family] = {
-            "total_chunks": header_data.get(HeaderKey.TOTAL_CHUNKS, 0),
-            "expected_sessions": header_data.get(HeaderKey.EXPECTED_SESSIONS, 1),
-            "pins": [],
-            "received_sessions": {},
-            "raw_header": header_result.get("raw_bytes", b""),
-            "raw_session_chunks": {},
-            "complete": False,
-            "saved": False,
-            "uuid": header_data.get(HeaderKey.DEVICE_UUID, "UNKNOWN"),
-            "git_commit": git_commit_hash,
-        }
+        self.external_connections.remove_device(device_family)
+        self.devices[device_family] = Device(
+            total_chunks=header_data.get(HeaderKey.TOTAL_CHUNKS, 0),
+            expected_sessions=header_data.get(HeaderKey.EXPECTED_SESSIONS, 1),
+            raw_header=header.raw_bytes,
+            uuid=header_data.get(HeaderKey.DEVICE_UUID, "UNKNOWN"),
+            git_commit=git_commit_hash,
+        )
+        self._touch(self.devices[device_family])
         return True
 
-    def process_chunk(self, chunk_result):
-        if not chunk_result or not chunk_result.get("hash_valid") or not self.current_device_family:
+    def process_chunk(self, chunk: Packet | None):
+        if not chunk or not chunk.hash_valid or not self.current_device_family:
             return False
 
-        chunk_data = chunk_result.get("data", {})
+        chunk_data = chunk.data
         device = self.devices.get(self.current_device_family)
         if not device:
             return False
 
-        chunk_id = chunk_data.get(FrameworkKey.CHUNK_ID, chunk_result.get("packet_id", -1))
+        chunk_id = chunk.chunk_id
+        if not chunk_in_range(chunk_id, device.total_chunks):
+            # i.e. a corrupt PACKET_ID (not covered by the CRC), don't file it as received
+            log.warning(f"Chunk {chunk_id} is out of range (total {device.total_chunks}), dropped")
+            return False
         session_id = chunk_data.get(FrameworkKey.STREAM_NUMBER, 0)
 
-        if session_id not in device["received_sessions"]:
-            device["received_sessions"][session_id] = set()
-            device["raw_session_chunks"][session_id] = {}
+        if session_id not in device.received_sessions:
+            device.received_sessions[session_id] = set()
+            device.raw_session_chunks[session_id] = {}
 
-        if chunk_id in device["received_sessions"][session_id]:
+        if chunk_id in device.received_sessions[session_id]:
             return False
 
         # Store raw chunk bytes
-        device["raw_session_chunks"][session_id][chunk_id] = chunk_result.get("raw_bytes", b"")
-
-        for pin_entry in chunk_data.get(FrameworkKey.PINS, []):
-            events_raw = pin_entry.get(FrameworkKey.EVENTS, 0)
-            events = decode_event_type_one_hot(events_raw) if events_raw else []
-
-            if "EXCEEDS_CONNECTION_LIMIT" in events:
-                pin_name = get_pin_name(self.current_device_family, pin_entry.get(FrameworkKey.PIN))
+        device.raw_session_chunks[session_id][chunk_id] = chunk.raw_bytes
+
+        table = device.connections
+        rows_before = len(table)
+        pins_of_chunk = []
+        connections = []  # (pin, other pin, parameter, type) of all pins of the chunk
+        for pin_num, events_mask, pin_connections in pin_records(chunk_data):
+            if events_mask & EVENT_MASKS["EXCEEDS_CONNECTION_LIMIT"]:
+                pin_name = get_pin_name(self.current_device_family, pin_num)
                 log.warning(f"WARNING: Pin {pin_name} exceeded connection limit!")
 
-            pin_num = pin_entry.get(FrameworkKey.PIN)
-            new_connections = [
-                {
-                    FrameworkKey.OTHER_PIN: c.get(FrameworkKey.OTHER_PIN),
-                    FrameworkKey.CONNECTION_PARAMETER: c.get(FrameworkKey.CONNECTION_PARAMETER),
-                    FrameworkKey.CONNECTION_TYPE: c.get(FrameworkKey.CONNECTION_TYPE, 0),
-                }
-                for c in pin_entry.get(FrameworkKey.CONNECTIONS, [])
-            ]
-
-            strength = analyze_pin(events)
+            strength = analyze_pin_mask(events_mask)
             # Find existing pin entry or create new one
-            existing_pin = next((p for p in device["pins"] if p["pin"] == pin_num), None)
-
-            if existing_pin:
-                # Overwrite events and mask with latest session data
-                existing_pin["events"] = events
-                existing_pin["events_mask"] = events_raw
-                existing_pin["strength"] = strength
-                # Append new connections
-                existing_pin["connections"].extend(new_connections)
+            existing_pin = device.pin_index.get(pin_num)
+
+            if existing_pin is not None:
+                # Overwrite event-mask with latest session data
+                existing_pin.events_mask = events_mask
+                existing_pin.strength = strength
             else:
-                device["pins"].append(
-                    {
-                        "pin": pin_num,
-                        "events": events,
-                        "events_mask": events_raw,
-                        "strength": strength,
-                        "connections": new_connections,
-                    }
-                )
+                existing_pin = Pin(pin_num, events_mask, strength, ConnectionView(table, pin_num))
+                device.pins.append(existing_pin)
+                device.pin_index[pin_num] = existing_pin
+            pins_of_chunk.append(pin_num)
+            connections += pin_connections
+
+        # Append new connections to the connection-table of the device in one go,
+        # connections that are known already are only counted
+        next_row = rows_before
+        for conn, row in zip(connections, table.extend(connections), strict=True):
+            if row == next_row:
+                pin_num, other_pin, param, conn_type = conn
+                device.pin_index[pin_num].connections.add_row(row)
+                if conn_type == ConnectionType.EXTERNAL:
+                    self.external_connections.add(
+                        self.current_device_family, param, pin_num, other_pin
+                    )
+                next_row += 1
 
-        device["received_sessions"][session_id].add(chunk_id)
+        device.received_sessions[session_id].add(chunk_id)
+        self._touch(device)
 
         # Check completion: All expected sessions must have all chunks
-        sessions_done = 0
-        for s_id in range(device["expected_sessions"]):
-            if (
-                s_id in device["received_sessions"]
-                and len(device["received_sessions"][s_id]) == device["total_chunks"]
-            ):
-                sessions_done += 1
-
-        device["complete"] = sessions_done == device["expected_sessions"]
-
-        # Filter connections after all data is loaded
-        if device["complete"]:
+        if session_id in range(device.expected_sessions) and chunk_id in range(device.total_chunks):
+            device.outstanding_chunks -= 1
+        was_complete = device.complete
+        device.complete = device.outstanding_chunks == 0
+
+        # Filter connections after all data is loaded, later chunks only update their rows
+        if was_complete:
+            self._filter_weak_connections(self.current_device_family, pins_of_chunk, rows_before)
+        elif device.complete:
             self._filter_weak_connections(self.current_device_family)
         return True
 
-    def _filter_weak_connections(self, device_family):
-        """Mark connections that are disturbed and apply phase masking"""
+    def _filter_weak_connections(self, device_family, pins=None, start=0):
+        """Mark connections that are disturbed by the drive-strength of source or target pin
+
+        Without pins all connections are checked. Otherwise only the connections from row
+        start on and those of the given pins whose strength changed are updated.
+        """
         device = self.devices.get(device_family)
         if not device:
             return
 
-        # Create mapping of pin number to events
-        pin_events = {pin["pin"]: pin["events"] for pin in device["pins"]}
-
-        # Filter connections for each pin
-        for pin in device["pins"]:
-            for conn in pin["connections"]:
-                conn_type = conn.get(FrameworkKey.CONNECTION_TYPE, 0)
-                if conn_type == ConnectionType.INTERNAL:
-                    phase = conn.get(FrameworkKey.CONNECTION_PARAMETER, -1)
-                    other_pin = conn.get(FrameworkKey.OTHER_PIN)
-
-                    # Check if source or target pin should be masked
-                    source_masked = self._should_mask_connection(pin["events"], phase)
-                    target_events = pin_events.get(other_pin, [])
-                    target_masked = self._should_mask_connection(target_events, phase)
-
-                    # Mark connection if either is masked
-                    if source_masked or target_masked:
-                        conn["masked"] = True
-                    else:
-                        conn["masked"] = False
-                else:
-                    conn["masked"] = False
+        table = device["connections"]
+        strengths = device.get("pin_strengths")
+        if pins is None or strengths is None:
+            # Strength-table of this device, refreshed on every (re-)completion
+            strengths = {pin["pin"]: pin["strength"] for pin in device["pins"]}
+            device["pin_strengths"] = strengths
+            strength_values = {pin: strength or 0 for pin, strength in strengths.items()}
+            rows = slice(None)
+            sources = lookup(strength_values, table.source)
+            others = lookup(strength_values, table.other)
+        else:
+            changed = []
+            for pin in pins:
+                strength = device["pin_index"][pin]["strength"]
+                if (strengths.get(pin) or 0) != (strength or 0):
+                    changed.append(pin)
+                strengths[pin] = strength
+            rows = np.arange(start, len(table))
+            if changed:
+                touched = np.isin(table.source, changed) | np.isin(table.other, changed)
+                rows = np.union1d(rows, np.flatnonzero(touched))
+            sources = np.array([strengths.get(pin) or 0 for pin in table.source[rows].tolist()])
+            others = np.array([strengths.get(pin) or 0 for pin in table.other[rows].tolist()])
+
+        # Mark internal connections if either source or target is masked
+        phases = table.param[rows]
+        masked = mask_weak_connections(sources.astype(np.int64), phases)
+        masked |= mask_weak_connections(others.astype(np.int64), phases)
+        masked &= table.type[rows] == ConnectionType.INTERNAL
+        if not np.array_equal(table.masked[rows], masked):
+            table.masked[rows] = masked
+            self._touch(device)
 
     def _apply_phase_masking(self, device_family):
-        """Apply phase masking per connection based on phases present for each specific directional connection"""
+        """Apply phase masking per connection based on phases present for each specific directional connection
+
+        The phases per pin pair are kept in device["phase_pairs"] (rows seen, pairs, phases), so
+        only new connections and the connections of pairs that got a new phase are updated.
+        """
         device = self.devices.get(device_family)
         if not device:
             return
 
-        # Collect connections grouped by directional pin pairs
-        connection_pairs = {}
-
-        # First pass: group connections by directional pin pairs
-        for pin in device["pins"]:
-            for conn in pin["connections"]:
-                if conn.get(FrameworkKey.CONNECTION_TYPE, 0) == ConnectionType.INTERNAL:
-                    phase = conn.get(FrameworkKey.CONNECTION_PARAMETER, -1)
-                    if 0 <= phase <= 5:
-                        pin_pair = (pin["pin"], conn.get(FrameworkKey.OTHER_PIN))
-                        if pin_pair not in connection_pairs:
-                            connection_pairs[pin_pair] = {"phases": set(), "connections": []}
-                        connection_pairs[pin_pair]["phases"].add(phase)
-                        connection_pairs[pin_pair]["connections"].append(conn)
-
-        # Second pass: apply masking
-        for pair_data in connection_pairs.values():
-            for conn in pair_data["connections"]:
-                phase = conn.get(FrameworkKey.CONNECTION_PARAMETER, -1)
-                conn["phase_masked"] = not keep_phase(phase, pair_data["phases"])
+        table = device["connections"]
+        start, pair_keys, pair_phases = device.get("phase_pairs") or (0, _NO_PAIRS, _NO_PAIRS)
+        if start > len(table):  # connections were replaced
+            start, pair_keys, pair_phases = 0, _NO_PAIRS, _NO_PAIRS
+
+        # New internal connections with a valid phase, everything else is never phase-masked
+        params = table.param[start:]
+        internal = table.type[start:] == ConnectionType.INTERNAL
+        rows = start + np.flatnonzero(internal & (params >= 0) & (params <= 5))
+
+        # Add the phases of the new connections to their directional pin pairs
+        new_keys, pair_of_row = np.unique(_pin_pairs(table, rows), return_inverse=True)
+        new_phases = np.zeros(len(new_keys), dtype=np.int64)
+        np.bitwise_or.at(new_phases, pair_of_row, 1 << table.param[rows])
+        keys = np.union1d(pair_keys, new_keys)
+        phases = np.zeros(len(keys), dtype=np.int64)
+        phases[np.searchsorted(keys, pair_keys)] = pair_phases
+        phases[np.searchsorted(keys, new_keys)] |= new_phases
+        device["phase_pairs"] = (len(table), keys, phases)
+
+        # Former connections of pairs with new phases are masked again
+        changed = pair_keys[phases[np.searchsorted(keys, pair_keys)] != pair_phases]
+        if len(changed):
+            params = table.param[:start]
+            internal = table.type[:start] == ConnectionType.INTERNAL
+            former = np.flatnonzero(internal & (params >= 0) & (params <= 5))
+            former = former[np.isin(_pin_pairs(table, former), changed)]
+            rows = np.concatenate((former, rows))
+
+        # Apply masking
+        pair_of_row = np.searchsorted(keys, _pin_pairs(table, rows))
+        phase_masked = ~KEEP_PHASE_TABLE[table.param[rows], phases[pair_of_row]]
+        if not np.array_equal(table.phase_masked[rows], phase_masked):
+            table.phase_masked[rows] = phase_masked
+            self._touch(device)
 
     def get_all_devices(self):
         return self.devices
 
+    def set_device(self, device_family, device):
+        """Add or replace a device that was collected elsewhere (i.e. by a worker)"""
+        self.devices[device_family] = device
+        self._touch(device)
+        self.external_connections.remove_device(device_family)
+        self.external_connections.add_device(device_family, device["connections"])
+
+    def set_devices(self, devices):
+        self.devices = {}
+        self.external_connections = ExternalConnections()
+        for device_family, device in devices.items():
+            self.set_device(device_family, device)
+
     def _start_output_capture(self, device_family=None, device_uuid=None):
         """Start capturing output to file"""
         if device_family is None:
@@ -306,36 +428,9 @@ class DeviceDataCollector:
         # Print Git commit version
         log.debug(f"Device Version: {device.get('git_commit', 'UNKNOWN')}")
 
-        # --- Collect all matrix and force analysis binary data ---
-        combined_bytes = bytearray()
-        # External connection matrices
-        for other_device in sorted(self.devices.keys()):
-            if device_family != other_device:
-                df = self.create_connection_matrix(device_family, other_device)
-                if df is not None:
-                    combined_bytes += df.to_numpy().tobytes()
-        # All 6 phase matrices
-        for phase in range(6):
-            df = self.create_phase_matrix(device_family, phase)
-            if df is not None:
-                combined_bytes += df.to_numpy().tobytes()
-        # Force analysis - use stored strengths if available
-        strengths = []
-        for pin_data in device["pins"]:
-            pin_num = pin_data.get("pin", "UNKNOWN")
-            pin_name = get_pin_name(device_family, pin_num)
-            # Use stored strength if available, otherwise calculate
-            strength = pin_data.get("strength")
-            if strength is None:
-                events = pin_data.get("events", [])
-                strength = analyze_pin(events)
-            strengths.append(strength)
-
-        # Convert for hash (None -> 0)
-        hash_strengths = [0 if s is None else int(s) for s in strengths]
-        combined_bytes += bytearray([s & 0xFF for s in hash_strengths])
-        combined_hash = hashlib.sha256(combined_bytes).hexdigest()
-        log.info(f"HASH: {combined_hash}")
+        log.info(f"HASH: {self.report_hash(device_family)}")
+        phase_tensor = self.create_phase_tensor(device_family)
+        strengths = self.get_pin_strengths(device_family)
 
         # Print connections summary (filtered for this device)
         log.info("\n=== Pin Connections ===")
@@ -362,7 +457,7 @@ class DeviceDataCollector:
                 self.print_connection_matrix(device_family, other_device)
 
         # All 6 phase matrices
-        self.print_all_phase_matrices(device_family)
+        self.print_all_phase_matrices(device_family, phase_tensor)
 
         # After connections and matrices, print events for all pins
         self.print_all_pin_events(device_family)
@@ -370,6 +465,23 @@ class DeviceDataCollector:
         self.run_pin_analysis(device_family, precalculated_strengths=strengths)
         self._stop_output_capture()
 
+    def report_hash(self, device_family):
+        """SHA-256 digest of the external connection matrices, phase matrices and strengths
+
+        The matrices are fed one by one as little-endian int64 and the strengths as one byte
+        each (None -> 0), so the digest is independent of pandas and of the platform.
+        """
+        hasher = hashlib.sha256()
+        for other_device in sorted(self.devices.keys()):
+            if device_family != other_device:
+                matrix = self.create_connection_array(device_family, other_device)
+                hasher.update(np.ascontiguousarray(matrix, dtype="<i8"))
+        for matrix in self.create_phase_tensor(device_family):
+            hasher.update(np.ascontiguousarray(matrix, dtype="<i8"))
+        strengths = self.get_pin_strengths(device_family)
+        hasher.update(bytes((0 if s is None else int(s)) & 0xFF for s in strengths))
+        return hasher.hexdigest()
+
     def is_complete(self):
         # Check for any completed but unsaved devices
         for family, device in self.devices.items():
@@ -432,16 +544,38 @@ class DeviceDataCollector:
             log.info(f"Device {family}:")
             for pin in device_data["pins"]:
                 pin_name = get_pin_name(family, pin["pin"])
-                events = pin.get("events", [])
                 mask = pin.get("events_mask", 0)
-                if events:
+                if mask:
+                    events = decode_event_type_one_hot(mask)
                     log.info(f"  {pin_name}: {', '.join(events)} (Mask: {mask})")
-                    if "EXCEEDS_CONNECTION_LIMIT" in events:
+                    if mask & EVENT_MASKS["EXCEEDS_CONNECTION_LIMIT"]:
                         log.warning("  WARNING: Connection limit exceeded for this pin!")
                 else:
                     log.info(f"  {pin_name}: No events (Mask: {mask})")
         log.info("=" * 23 + "\n")
 
+    def get_pin_strengths(self, device_family):
+        """Return the strengths of the pins of a device (in order of device["pins"])
+
+        All event-masks are classified in one table lookup, undefined strengths are None.
+        """
+        device = self.devices[device_family]
+
+        def compute():
+            events_masks = [pin_data.get("events_mask", 0) for pin_data in device["pins"]]
+            strengths = analyze_pin_masks(np.array(events_masks, dtype=np.int64))
+            return [
+                None if strength == UNKNOWN_STRENGTH else strength
+                for strength in strengths.tolist()
+            ]
+
+        return self._cached(("strengths", device_family), device["data_version"], compute)
+
+    def get_connection_vectors(self):
+        """Return analyze_connections() for the current data of all devices"""
+        version = tuple((family, device["data_version"]) for family, device in self.devices.items())
+        return self._cached("vectors", version, lambda: analyze_connections(self))
+
     def run_pin_analysis(self, device_family=None, precalculated_strengths=None):
         """Run pin force analysis for all devices or a specific one."""
         devices_to_analyze = (
@@ -455,16 +589,7 @@ class DeviceDataCollector:
             if precalculated_strengths and family == device_family:
                 strengths = precalculated_strengths
             else:
-                strengths = []
-                for pin_data in device_data["pins"]:
-                    pin_num = pin_data.get("pin", "UNKNOWN")
-                    pin_name = get_pin_name(family, pin_num)
-                    # Use stored strength if available, otherwise calculate
-                    strength = pin_data.get("strength")
-                    if strength is None:
-                        events = pin_data.get("events", [])
-                        strength = analyze_pin(events)
-                    strengths.append(strength)
+                strengths = self.get_pin_strengths(family)
 
             log.info(f"\n{'=' * 80}")
             log.info(f"External Drive-Strength of Pins - Device {family}")
@@ -478,47 +603,41 @@ class DeviceDataCollector:
                     log.info(f"  {pin_name}: Undefined")
             log.info(f"{'=' * 80}\n")
 
-    def _should_mask_connection(self, events, phase):
-        # Use stored strength if available, otherwise calculate
-        strength = None
-        for pin in self.devices[self.current_device_family]["pins"]:
-            if pin["events"] == events:
-                strength = pin.get("strength")
-                break
-
-        if strength is None:
-            strength = analyze_pin(events)
+    def create_connection_array(self, controller_a, controller_b):
+        """External connections from pins of device a (rows) to pins of device b (columns)"""
+        version = (
+            self.devices[controller_a]["data_version"],
+            self.devices[controller_b]["data_version"],
+        )
+        return self._cached(
+            ("connections", controller_a, controller_b),
+            version,
+            lambda: self._compute_connection_array(controller_a, controller_b),
+        )
 
-        if strength is None or strength == 0:
-            return False
-        # Mask pins with strength >= 1 in phases 1 and 3
-        if strength >= 1 and phase in (1, 3):
-            return True
-        # Mask pins with strength <= -1 in phases 0 and 2
-        return strength <= -1 and phase in (0, 2)
+    def _compute_connection_array(self, controller_a, controller_b):
+        positions_a = {
+            pin["pin"]: index for index, pin in enumerate(self.devices[controller_a]["pins"])
+        }
+        positions_b = {
+            pin["pin"]: index for index, pin in enumerate(self.devices[controller_b]["pins"])
+        }
+        matrix = np.zeros((len(positions_a), len(positions_b)), dtype=np.int64)
+        for pin, other_pin in self.external_connections.between(controller_a, controller_b):
+            if pin in positions_a and other_pin in positions_b:
+                matrix[positions_a[pin], positions_b[other_pin]] = 1
+        return matrix
 
     def create_connection_matrix(self, controller_a, controller_b):
         if controller_a not in self.devices or controller_b not in self.devices:
             log.error(f"Controller {controller_a} or {controller_b} not found")
             return None
-        device_a = self.devices[controller_a]
-        device_b = self.devices[controller_b]
-        pins_a = [pin["pin"] for pin in device_a["pins"]]
-        pins_b = [pin["pin"] for pin in device_b["pins"]]
+        pins_a = [pin["pin"] for pin in self.devices[controller_a]["pins"]]
+        pins_b = [pin["pin"] for pin in self.devices[controller_b]["pins"]]
         row_labels = [get_pin_name(controller_a, pin) for pin in pins_a]
         col_labels = [get_pin_name(controller_b, pin) for pin in pins_b]
-        df = pd.DataFrame(0, index=row_labels, columns=col_labels)
-        for pin in device_a["pins"]:
-            pin_name_a = get_pin_name(controller_a, pin["pin"])
-            for conn in pin["connections"]:
-                conn_type = conn.get(FrameworkKey.CONNECTION_TYPE, 0)
-                if conn_type == ConnectionType.EXTERNAL:
-                    device_id = conn.get(FrameworkKey.CONNECTION_PARAMETER, -1)
-                    if device_id == controller_b:
-                        pin_name_b = get_pin_name(controller_b, conn.get(FrameworkKey.OTHER_PIN))
-                        if pin_name_b in col_labels:
-                            df.at[pin_name_a, pin_name_b] = 1
-        return df
+        matrix = self.create_connection_array(controller_a, controller_b)
+        return pd.DataFrame(matrix, index=row_labels, columns=col_labels)
 
     def print_connection_matrix(self, controller_a, controller_b, filename=None):
         df = self.create_connection_matrix(controller_a, controller_b)
@@ -530,6 +649,55 @@ class DeviceDataCollector:
             filename,
         )
 
+    def create_phase_tensor(self, controller):
+        """All 6 phase matrices of a device as (phase, pin, other pin) uint8 array.
+
+        Pins are in order of device["pins"]. Values: 1 = connected (or pin works
+        on the diagonal), 2 = masked by pin strength, 3 = phase masked.
+        """
+        if controller not in self.devices:
+            log.error(f"Controller {controller} not found")
+            return None
+        device = self.devices[controller]
+        return self._cached(
+            ("phase_tensor", controller),
+            device["data_version"],
+            lambda: self._compute_phase_tensor(device),
+        )
+
+    def _compute_phase_tensor(self, device):
+        pins = device["pins"]
+        n_pins = len(pins)
+        tensor = np.zeros((6, n_pins, n_pins), dtype=np.uint8)
+
+        # Diagonal elements (self-check) are never masked
+        events_masks = np.array([pin["events_mask"] for pin in pins], dtype=np.int64)
+        pins_working = (events_masks[np.newaxis, :] & PHASE_ERROR_MASKS[:, np.newaxis]) == 0
+        diagonal = np.arange(n_pins)
+        tensor[:, diagonal, diagonal] = pins_working
+
+        table = device["connections"]
+        positions = {pin["pin"]: position for position, pin in enumerate(pins)}
+        phases = table.param
+        sources = lookup(positions, table.source, default=-1)
+        others = lookup(positions, table.other, default=-1)
+        rows = np.flatnonzero(
+            (table.type == ConnectionType.INTERNAL)
+            & (phases >= 0)
+            & (phases <= 5)
+            & (sources >= 0)
+            & (others >= 0)
+        )
+        rows = rows[pins_working[phases[rows], sources[rows]]]
+        # Phase masked connections show as 3, pin strength masked connections as 2
+        values = np.where(table.phase_masked[rows], 3, np.where(table.masked[rows], 2, 1))
+        tensor[phases[rows], sources[rows], others[rows]] = values
+        return tensor
+
+    def _phase_frame(self, controller, matrix):
+        labels = [get_pin_name(controller, pin["pin"]) for pin in self.devices[controller]["pins"]]
+        return pd.DataFrame(matrix.astype(np.int64), index=labels, columns=labels)
+
     def create_phase_matrix(self, controller, phase):
         if controller not in self.devices:
             log.error(f"Controller {controller} not found")
@@ -537,49 +705,13 @@ class DeviceDataCollector:
         if not 0 <= phase <= 5:
             log.error(f"Invalid phase {phase}. Must be between 0 and 5")
             return None
-        device = self.devices[controller]
-        pins = [pin["pin"] for pin in device["pins"]]
-        labels = [get_pin_name(controller, pin) for pin in pins]
-        df = pd.DataFrame(0, index=labels, columns=labels)
-        phase_error_events = {
-            0: "PIN_IS_NOT_LOW_WHEN_ONE_SET_PULLDOWN",
-            1: "PIN_IS_NOT_HIGH_WHEN_ONE_SET_PULLUP",
-            2: "PIN_IS_NOT_LOW_WHEN_DRIVEN_LOW",
-            3: "PIN_IS_NOT_HIGH_WHEN_DRIVEN_HIGH",
-            4: "PIN_IS_NOT_LOW_WHEN_ALLPULLUP_LOW",
-            5: "PIN_IS_NOT_HIGH_WHEN_ALLPULLDOWN_HIGH",
-        }
-        for pin in device["pins"]:
-            pin_name_a = get_pin_name(controller, pin["pin"])
-            error_event = phase_error_events.get(phase)
-            pin_works = error_event and error_event not in pin["events"]
+        return self._phase_frame(controller, self.create_phase_tensor(controller)[phase])
 
-            # Diagonal elements (self-check) are never masked
-            if pin_works:
-                df.at[pin_name_a, pin_name_a] = 1
-
-            for conn in pin["connections"]:
-                conn_type = conn.get(FrameworkKey.CONNECTION_TYPE, 0)
-                if conn_type == ConnectionType.INTERNAL:
-                    conn_phase = conn.get(FrameworkKey.CONNECTION_PARAMETER, -1)
-                    pin_name_b = get_pin_name(controller, conn.get(FrameworkKey.OTHER_PIN))
-
-                    if conn_phase == phase and pin_name_b in labels and pin_works:
-                        is_masked = conn.get("masked", False)
-                        is_phase_masked = conn.get("phase_masked", False)
-
-                        if is_phase_masked:
-                            # Phase masked connections show as 3
-                            df.at[pin_name_a, pin_name_b] = 3
-                        elif is_masked:
-                            # Pin strength masked connections show as 2
-                            df.at[pin_name_a, pin_name_b] = 2
-                        else:
-                            df.at[pin_name_a, pin_name_b] = 1
-        return df
-
-    def print_phase_matrix(self, controller, phase, filename=None):
-        df = self.create_phase_matrix(controller, phase)
+    def print_phase_matrix(self, controller, phase, filename=None, tensor=None):
+        if tensor is None:
+            df = self.create_phase_matrix(controller, phase)
+        else:
+            df = self._phase_frame(controller, tensor[phase])
         if df is None:
             return
         phase_names = PHASE_NAMES
@@ -589,9 +721,13 @@ class DeviceDataCollector:
             filename,
         )
 
-    def print_all_phase_matrices(self, controller):
+    def print_all_phase_matrices(self, controller, tensor=None):
+        if tensor is None:
+            tensor = self.create_phase_tensor(controller)
+            if tensor is None:
+                return
         for phase in range(6):
-            self.print_phase_matrix(controller, phase)
+            self.print_phase_matrix(controller, phase, tensor=tensor)
 
     def save_raw_xml(self):
         """Save all collected data to an XML file with metadata (per device CBOR base64)"""
@@ -688,9 +824,10 @@ class DeviceDataCollector:
                         self._save_heatmap(df, path_file, "Blues", "Pin", "Pin")
 
             # Phase matrices
+            phase_tensor = self.create_phase_tensor(device_family)
             for phase in range(6):
-                df = self.create_phase_matrix(device_family, phase)
-                if df is not None and not df.empty:
+                df = self._phase_frame(device_family, phase_tensor[phase])
+                if not df.empty:
                     # Custom colormap: 0=White, 1=Green, 2=Red (pin masked), 3=Dark Red (phase masked)
                     from matplotlib.colors import ListedColormap
 
@@ -724,19 +861,17 @@ class DeviceDataCollector:
 
             # Get all pins sorted
             sorted_pins = get_all_pins_sorted(device_family, device_data)
+            strength_of_pin = {
+                pin_data["pin"]: strength
+                for pin_data, strength in zip(
+                    device_data["pins"], self.get_pin_strengths(device_family), strict=True
+                )
+            }
 
             for pin_num in sorted_pins:
-                pin_name = get_pin_name(device_family, pin_num)
-                # Find pin data
-                pin_entry = next((p for p in device_data["pins"] if p["pin"] == pin_num), None)
-                if pin_entry:
-                    # Use stored strength if available, otherwise calculate
-                    strength = pin_entry.get("strength")
-                    if strength is None:
-                        events = pin_entry.get("events", [])
-                        strength = analyze_pin(events)
-                    pin_names.append(pin_name)
-                    pin_strengths.append(strength)
+                if pin_num in strength_of_pin:
+                    pin_names.append(get_pin_name(device_family, pin_num))
+                    pin_strengths.append(strength_of_pin[pin_num])
 
             if pin_names:
                 plt.figure(figsize=(15, 8))
@@ -822,23 +957,18 @@ class DeviceDataCollector:
 
         # Get all possible events
         all_events = sorted(set(PIN_EVENT_TYPES.values()))
+        event_bits = np.array([PIN_EVENTS_REVERSED[event] for event in all_events])
 
-        # Create DataFrame
+        # Bit tests of all pins (rows) and events (columns) at once
+        pin_index = get_pin_index(device_data)
+        masks = np.array(
+            [pin_index[p]["events_mask"] if p in pin_index else 0 for p in sorted_pins],
+            dtype=np.int64,
+        )
         pin_labels = [get_pin_name(device_family, p) for p in sorted_pins]
-        df = pd.DataFrame(0, index=pin_labels, columns=all_events)
-
-        # Fill DataFrame
-        for pin_num in sorted_pins:
-            pin_name = get_pin_name(device_family, pin_num)
-            pin_entry = next((p for p in device_data["pins"] if p["pin"] == pin_num), None)
-
-            if pin_entry:
-                events = pin_entry.get("events", [])
-                for event in events:
-                    if event in df.columns:
-                        df.at[pin_name, event] = 1
-
-        return df
+        return pd.DataFrame(
+            (masks[:, np.newaxis] >> event_bits) & 1, index=pin_labels, columns=all_events
+        )
 
     def load_from_xml(self, filename):
         """Load data from an XML file generated by save_raw_xml"""
@@ -857,6 +987,7 @@ class DeviceDataCollector:
 
         # Reset current state
         self.devices = {}
+        self.external_connections = ExternalConnections()
         self.current_device_family = None
 
         devices_elem = root.find("Devices")
@@ -874,9 +1005,7 @@ class DeviceDataCollector:
             if header_elem is not None:
                 raw_bytes = base64.b64decode(header_elem.text)
                 try:
-                    data = cbor2.loads(raw_bytes)
-                    header_result = {"hash_valid": True, "data": data, "raw_bytes": raw_bytes}
-                    self.process_header(header_result)
+                    self.process_header(Packet.from_raw(raw_bytes))
                 except Exception as e:
                     log.exception("Failed to decode header", exc_info=e)
                     continue
@@ -885,14 +1014,8 @@ class DeviceDataCollector:
             for chunk_elem in device_elem.findall("RawData[@Type='Chunk']"):
                 raw_bytes = base64.b64decode(chunk_elem.text)
                 try:
-                    data = cbor2.loads(raw_bytes)
-                    chunk_result = {
-                        "hash_valid": True,
-                        "data": data,
-                        "raw_bytes": raw_bytes,
-                        "packet_id": int(chunk_elem.get("ChunkId", -1)),
-                    }
-                    self.process_chunk(chunk_result)
+                    packet_id = int(chunk_elem.get("ChunkId", -1))
+                    self.process_chunk(Packet.from_raw(raw_bytes, packet_id))
                 except Exception as e:
                     log.exception("Failed to decode chunk", exc_info=e)
 
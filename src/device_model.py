@@ -0,0 +1,121 @@
+"""Compact Device Model
+
+Devices and pins of a collector are __slots__ classes instead of dicts. The
+collector uses their attributes on ingest. For the existing callers they
+stay dict-compatible: device["pins"], pin.get("strength"), "pin_index" in
+device, ... access the attributes; a field that is not set behaves like a
+missing key. Connections are rows of the ConnectionTable of the device.
+"""
+
+from collections.abc import Iterator
+from collections.abc import MutableMapping
+from typing import Any
+
+from .connection_table import ConnectionTable
+from .connection_table import ConnectionView
+
+
+class SlotMapping(MutableMapping):
+    """Dict-compatible access to the fields (__slots__) of a class."""
+
+    __slots__ = ()
+    _fields: frozenset = frozenset()
+
+    def __init_subclass__(cls) -> None:
+        super().__init_subclass__()
+        cls._fields = frozenset(cls.__slots__)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._fields:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: object) -> None:
+        if key not in self._fields:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        delattr(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._fields and hasattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default) if key in self._fields else default
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key in self.__slots__ if hasattr(self, key))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __bool__(self) -> bool:
+        return True  # records always have fields, spares counting them
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+class Pin(SlotMapping):
+    """A pin of a device, its latest event-mask and strength and its connections."""
+
+    __slots__ = ("connections", "events_mask", "pin", "strength")
+
+    def __init__(
+        self, pin: int, events_mask: int, strength: int | None, connections: ConnectionView
+    ) -> None:
+        self.pin = pin
+        self.events_mask = events_mask
+        self.strength = strength
+        self.connections = connections
+
+
+class Device(SlotMapping):
+    """Data of a device collected since its last header."""
+
+    __slots__ = (
+        "complete",
+        "connections",
+        "data_version",
+        "expected_sessions",
+        "git_commit",
+        "outstanding_chunks",
+        "phase_pairs",  # set by phase-masking
+        "pin_index",
+        "pin_strengths",  # set by weak-masking
+        "pins",
+        "raw_header",
+        "raw_session_chunks",
+        "received_sessions",
+        "saved",
+        "total_chunks",
+        "uuid",
+    )
+
+    def __init__(
+        self,
+        total_chunks: int,
+        expected_sessions: int,
+        raw_header: bytes,
+        uuid: int | str,
+        git_commit: str | None,
+    ) -> None:
+        self.total_chunks = total_chunks
+        self.expected_sessions = expected_sessions
+        self.outstanding_chunks = total_chunks * expected_sessions
+        self.pins: list[Pin] = []
+        self.pin_index: dict[int, Pin] = {}
+        self.connections = ConnectionTable()
+        self.received_sessions: dict[int, set] = {}
+        self.raw_header = raw_header
+        self.raw_session_chunks: dict[int, dict] = {}
+        self.complete = False
+        self.saved = False
+        self.uuid = uuid
+        self.git_commit = git_commit
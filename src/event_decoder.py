@@ -40,14 +40,31 @@ PIN_EVENT_TYPES: Mapping[int, str] = {
 PIN_EVENTS_REVERSED = {v: k for k, v in PIN_EVENT_TYPES.items()}
 
 
+# Single-bit mask of every event, for bit tests on the events_mask of a pin
+EVENT_MASKS: Mapping[str, int] = {name: 1 << bit for bit, name in PIN_EVENT_TYPES.items()}
+
+# Names of the set bits for every value of every byte of the 32-bit event-mask
+_BYTE_NAMES: list[list[tuple[str, ...]]] = [
+    [
+        tuple(
+            PIN_EVENT_TYPES.get(8 * index + bit, f"UNKNOWN_EVENT_{8 * index + bit}")
+            for bit in range(8)
+            if value & (1 << bit)
+        )
+        for value in range(256)
+    ]
+    for index in range(4)
+]
+
+
 def decode_event_type_one_hot(event_bits: int) -> list[str]:
     """Return list of event names for bits set in event_bits."""
-    events = []
-    for bit_position in range(32):
-        if event_bits & (1 << bit_position):
-            event_name = PIN_EVENT_TYPES.get(bit_position, f"UNKNOWN_EVENT_{bit_position}")
-            events.append(event_name)
-    return events
+    return [
+        *_BYTE_NAMES[0][event_bits & 0xFF],
+        *_BYTE_NAMES[1][(event_bits >> 8) & 0xFF],
+        *_BYTE_NAMES[2][(event_bits >> 16) & 0xFF],
+        *_BYTE_NAMES[3][(event_bits >> 24) & 0xFF],
+    ]
 
 
 @deprecated("not used ATM")
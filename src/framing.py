@@ -0,0 +1,285 @@
+"""Framing of the raw serial byte-stream into header- and chunk-payloads.
+
+The device wraps every packet into 4 byte start- and end-markers:
+[START][PACKET_ID (chunks only)][LENGTH][CBOR][CRC][END]
+Everything outside of these frames (i.e. DEBUG-text) is skipped
+by the framer and can be extracted separately.
+"""
+
+import re
+import struct
+import zlib
+from collections.abc import Iterator
+from enum import Enum
+
+# Protocol identifiers (4 bytes each, little endian)
+HEADER_START: bytes = bytes([0x0C, 0x0B, 0x0A, 0x09])
+HEADER_END: bytes = bytes([0x10, 0x0F, 0x0E, 0x0D])
+CHUNK_START: bytes = bytes([0x04, 0x03, 0x02, 0x01])
+CHUNK_END: bytes = bytes([0x08, 0x07, 0x06, 0x05])
+
+MARKER_SIZE: int = 4
+PACKET_ID_SIZE: int = 4
+LENGTH_SIZE: int = 2
+CRC_SIZE: int = 4
+# Largest accepted CBOR-payload. The LENGTH-field could hold 64 KiB, but the
+# packets of the devices are far smaller (~100 bytes in the recordings). A
+# corrupt LENGTH therefore is dropped at once instead of waiting for 64 KiB.
+MAX_LENGTH: int = 2048
+
+# CRC calculation (CRC-32, identical to crcmod's predefined "crc-32")
+calculate_crc = zlib.crc32
+
+
+class FrameType(int, Enum):
+    """Kind of frame, given by its start-marker."""
+
+    HEADER = 0
+    CHUNK = 1
+
+
+_START_RE = re.compile(re.escape(HEADER_START) + b"|" + re.escape(CHUNK_START))
+_LENGTH = struct.Struct("<H")
+
+
+class FrameParser:
+    """Length-directed framing engine for the marker-protocol.
+
+    After a start-marker the LENGTH-field is read and the parser jumps straight
+    to the CRC and end-marker, so the CBOR-payload is never scanned and may
+    contain marker-sequences. If the end-marker is not where LENGTH says,
+    the frame is dropped and the parser resyncs on the next start-marker
+    (beginning right after the wrong one). While waiting for the rest of a
+    frame, a complete frame that starts inside it (a corrupt LENGTH that is
+    too large, but below max_length) also leads to a resync, so the
+    following frames are not held back.
+
+    Received data is appended to an internal buffer. Instead of re-slicing the
+    buffer per consumed byte, a read-offset is moved forward and the buffer
+    gets compacted only when the consumed part gets large.
+    Payloads ([PACKET_ID?][LENGTH][CBOR][CRC]) are handed out as memoryview
+    into the buffer and are only valid until the iterator continues -
+    copy them (i.e. bytes(view)) to keep them.
+    """
+
+    def __init__(self, compact_threshold: int = 64 * 1024, max_length: int = MAX_LENGTH) -> None:
+        self.compact_threshold = compact_threshold
+        self.max_length = max_length
+        self._buffer = bytearray()
+        self._offset = 0  # start of unconsumed data (start-marker of current frame)
+        self._scan = 0  # search for start-marker continues here
+        self._probe = 0  # search for a frame inside the incomplete frame continues here
+        self._frame_type: FrameType | None = None
+        self.frames_header = 0
+        self.frames_chunk = 0
+        self.resyncs = 0
+        self.bytes_skipped = 0
+        self.bytes_received = 0
+
+    @property
+    def receiving(self) -> bool:
+        return self._frame_type is not None
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered bytes that are not consumed yet."""
+        return len(self._buffer) - self._offset
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "bytes_received": self.bytes_received,
+            "bytes_skipped": self.bytes_skipped,
+            "frames_header": self.frames_header,
+            "frames_chunk": self.frames_chunk,
+            "resyncs": self.resyncs,
+        }
+
+    def reset(self) -> None:
+        self._buffer.clear()
+        self._offset = 0
+        self._scan = 0
+        self._probe = 0
+        self._frame_type = None
+
+    def feed(self, data: bytes) -> Iterator[tuple[FrameType, memoryview]]:
+        """Add new data and return an iterator over all frames that are complete now.
+
+        The iterator must be exhausted before feeding the next data.
+        """
+        self.bytes_received += len(data)
+        self._compact()
+        self._buffer.extend(data)
+        return self._frames()
+
+    def _frames(self) -> Iterator[tuple[FrameType, memoryview]]:
+        buffer = self._buffer
+        while True:
+            if self._frame_type is None:
+                match = _START_RE.search(buffer, self._scan)
+                if match is None:
+                    # last bytes could be the beginning of a marker
+                    self._scan = max(self._scan, len(buffer) - MARKER_SIZE + 1)
+                    self.bytes_skipped += self._scan - self._offset
+                    self._offset = self._scan
+                    return
+                self.bytes_skipped += match.start() - self._offset
+                self._offset = match.start()
+                self._frame_type = (
+                    FrameType.HEADER if match.group() == HEADER_START else FrameType.CHUNK
+                )
+                self._probe = self._offset + 1
+
+            frame_start = self._offset + MARKER_SIZE
+            if self._frame_type == FrameType.HEADER:
+                length_pos = frame_start
+                end_marker = HEADER_END
+            else:
+                length_pos = frame_start + PACKET_ID_SIZE
+                end_marker = CHUNK_END
+            if len(buffer) < length_pos + LENGTH_SIZE:
+                return  # wait for more data
+            length = _LENGTH.unpack_from(buffer, length_pos)[0]
+            frame_end = length_pos + LENGTH_SIZE + length + CRC_SIZE
+
+            if length <= self.max_length:
+                if len(buffer) < frame_end + MARKER_SIZE:
+                    next_frame = self._frame_ahead()
+                    if next_frame is None:
+                        return  # wait for more data
+                    # LENGTH is corrupt -> continue with the frame inside
+                    self.resyncs += 1
+                    self._frame_type = None
+                    self._scan = next_frame
+                    continue
+                if buffer.startswith(end_marker, frame_end):
+                    frame_type = self._frame_type
+                    if frame_type == FrameType.HEADER:
+                        self.frames_header += 1
+                    else:
+                        self.frames_chunk += 1
+                    with memoryview(buffer) as view, view[frame_start:frame_end] as payload:
+                        yield frame_type, payload
+                    self._frame_type = None
+                    self._offset = self._scan = frame_end + MARKER_SIZE
+                    continue
+
+            # corrupt frame -> search next start-marker after the current one
+            self.resyncs += 1
+            self._frame_type = None
+            self._scan = self._offset + 1
+
+    def _frame_ahead(self) -> int | None:
+        """Return the start of a complete frame inside the incomplete current frame.
+
+        Candidates that are not complete yet are probed again with the next data.
+        """
+        buffer = self._buffer
+        incomplete = None
+        for match in _START_RE.finditer(buffer, self._probe):
+            start = match.start()
+            if match.group() == HEADER_START:
+                length_pos = start + MARKER_SIZE
+                end_marker = HEADER_END
+            else:
+                length_pos = start + MARKER_SIZE + PACKET_ID_SIZE
+                end_marker = CHUNK_END
+            if len(buffer) < length_pos + LENGTH_SIZE:
+                if incomplete is None:
+                    incomplete = start
+                break
+            length = _LENGTH.unpack_from(buffer, length_pos)[0]
+            if length > self.max_length:
+                continue
+            frame_end = length_pos + LENGTH_SIZE + length + CRC_SIZE
+            if len(buffer) < frame_end + MARKER_SIZE:
+                if incomplete is None:
+                    incomplete = start
+            elif buffer.startswith(end_marker, frame_end):
+                return start
+        # last bytes could be the beginning of a marker
+        tail = max(len(buffer) - MARKER_SIZE + 1, self._probe)
+        self._probe = tail if incomplete is None else incomplete
+        return None
+
+    def _compact(self) -> None:
+        """Drop consumed data from the front of the buffer, but only occasionally."""
+        if self._offset == 0:
+            return
+        if self._offset == len(self._buffer):
+            self._buffer.clear()
+        elif self._offset < self.compact_threshold:
+            return
+        else:
+            del self._buffer[: self._offset]
+        self._scan = max(self._scan - self._offset, 0)
+        self._probe = max(self._probe - self._offset, 0)
+        self._offset = 0
+
+
+class DebugLineExtractor:
+    """Extracts "DEBUG:"-lines from the raw byte-stream.
+
+    Works on whole reads: only occurrences of the prefix are looked at,
+    the partial line at the end of a read is carried over to the next one.
+    """
+
+    prefix: bytes = b"DEBUG:"
+
+    def __init__(self, max_line_length: int = 1000) -> None:
+        self.max_line_length = max_line_length
+        self._carry = bytearray()
+
+    def feed(self, data: bytes) -> list[str]:
+        """Return all DEBUG-lines that got completed by data."""
+        lines: list[str] = []
+        first_newline = data.find(b"\n")
+        if first_newline < 0:
+            self._carry_over(data)
+            return lines
+
+        # complete the line that was started by the previous read
+        if self._carry:
+            self._carry += data[:first_newline]
+            self._add_line(self._carry, lines)
+            self._carry.clear()
+        else:
+            self._add_line(data[:first_newline], lines)
+
+        # complete lines in between - only visit the ones containing the prefix
+        last_newline = data.rfind(b"\n")
+        position = data.find(self.prefix, first_newline + 1, last_newline)
+        while position >= 0:
+            line_start = data.rfind(b"\n", 0, position) + 1
+            line_end = data.find(b"\n", position)
+            self._add_line(data[line_start:line_end], lines)
+            position = data.find(self.prefix, line_end + 1, last_newline)
+
+        self._carry_over(data[last_newline + 1 :])
+        return lines
+
+    def _carry_over(self, data: bytes) -> None:
+        self._carry += data
+        if len(self._carry) > self.max_line_length:
+            # Prevent memory leak - drop lines that are too long
+            self._carry.clear()
+
+    def _add_line(self, line: bytes, lines: list[str]) -> None:
+        if self.prefix not in line:
+            return
+        line_text = line.decode("utf-8", errors="ignore").strip()
+        # Only keep lines that start with DEBUG:
+        if line_text.startswith("DEBUG:"):
+            lines.append(line_text)
+
+
+def encode_frame(frame_type: FrameType, cbor_bytes: bytes, packet_id: int | None = None) -> bytes:
+    """Wrap CBOR data into a frame: [START][PACKET_ID?][LENGTH][CBOR][CRC][END]."""
+    frame = bytearray(HEADER_START if frame_type == FrameType.HEADER else CHUNK_START)
+    if packet_id is not None:
+        frame += packet_id.to_bytes(4, "little")
+    frame += len(cbor_bytes).to_bytes(2, "little")
+    frame += cbor_bytes
+    frame += calculate_crc(cbor_bytes).to_bytes(4, "little")
+    frame += HEADER_END if frame_type == FrameType.HEADER else CHUNK_END
+    return bytes(frame)
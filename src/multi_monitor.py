@@ -0,0 +1,222 @@
+"""Monitor many serial ports in one process with a single selector loop.
+
+Every port keeps its own framing state and collector, while reading, framing
+and ACKs of all ports are served by one thread. Collector-work happens in one
+shared collector thread. Only available on POSIX, as selectors need a fileno().
+"""
+
+import queue
+import selectors
+import sys
+import threading
+import time
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+
+from serial import Serial
+
+from .ack_writer import AckWriter
+from .capture import CaptureWriter
+from .concurrent_monitor import IDLE_TIMEOUT
+from .concurrent_monitor import collector_worker
+from .concurrent_monitor import process_frame
+from .data_storage import DeviceDataCollector
+from .framing import DebugLineExtractor
+from .framing import FrameParser
+from .logger import log
+
+READ_SIZE: int = 64 * 1024
+
+
+class PortSession:
+    """Receive-state of one serial port."""
+
+    def __init__(
+        self,
+        serial: Serial,
+        packet_queue: queue.SimpleQueue,
+        collector: DeviceDataCollector | None = None,
+        *,
+        debug_lines: bool = True,
+        capture: Callable[[bytes], None] | None = None,
+    ) -> None:
+        self.serial = serial
+        self.capture = capture
+        self.name = serial.port
+        self.packet_queue = packet_queue
+        self.collector = DeviceDataCollector() if collector is None else collector
+        self.framer = FrameParser()
+        self.debug_extractor = DebugLineExtractor() if debug_lines else None
+        self.ack_writer = AckWriter(serial, threaded=False)
+        self.reads = 0
+        self.t_start = time.perf_counter()
+
+    def fileno(self) -> int:
+        return self.serial.fileno()
+
+    def on_readable(self) -> None:
+        """Read everything that is available (non-blocking) and process it."""
+        data = self.serial.read(max(1, min(self.serial.in_waiting, READ_SIZE)))
+        if data:
+            if self.capture:
+                self.capture(data)
+            self.feed(data)
+
+    def feed(self, data: bytes) -> None:
+        self.reads += 1
+        if self.debug_extractor:
+            for line_text in self.debug_extractor.feed(data):
+                log.debug("%s: %s", self.name, line_text)
+        for frame_type, payload in self.framer.feed(data):
+            process_frame(self.ack_writer, self.packet_queue, self.collector, frame_type, payload)
+
+    @property
+    def stats(self) -> dict[str, float]:
+        duration = time.perf_counter() - self.t_start
+        return {
+            **self.framer.stats,
+            "throughput_kBps": self.framer.bytes_received / duration / 1e3,
+            **self.ack_writer.stats,
+        }
+
+
+class MultiPortMonitor:
+    """One selector loop multiplexing N serial ports (and stdin for commands)."""
+
+    def __init__(
+        self,
+        serial_ports: list[str],
+        baudrate: int = 9600,
+        *,
+        debug_lines: bool = True,
+        interactive: bool = True,
+        capture: Path | None = None,
+    ) -> None:
+        self.serial_ports = serial_ports
+        self.baudrate = baudrate
+        self.debug_lines = debug_lines
+        self.interactive = interactive
+        self.capture = capture
+        self.capture_writer: CaptureWriter | None = None
+        self.packet_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.sessions: list[PortSession] = []
+        self.selector = selectors.DefaultSelector()
+        self.stop_event = threading.Event()
+        self.command_source = sys.stdin if interactive else None
+
+    def open(self) -> None:
+        if self.capture:
+            self.capture_writer = CaptureWriter(self.capture)
+        for port in self.serial_ports:
+            log.debug(f"Opening {port} at {self.baudrate} baud...")
+            # timeout=0 -> non-blocking reads, the selector does the waiting
+            serial = Serial(port, self.baudrate, timeout=0)
+            capture_port = None
+            if self.capture_writer:
+                capture_port = partial(
+                    self.capture_writer.write, self.capture_writer.add_port(port)
+                )
+            session = PortSession(
+                serial,
+                self.packet_queue,
+                self.create_collector(port),
+                debug_lines=self.debug_lines,
+                capture=capture_port,
+            )
+            self.selector.register(session, selectors.EVENT_READ)
+            self.sessions.append(session)
+        if self.command_source is not None:
+            self.selector.register(self.command_source, selectors.EVENT_READ)
+
+    def create_collector(self, _port: str) -> DeviceDataCollector:
+        return DeviceDataCollector()
+
+    def close(self) -> None:
+        for key in list(self.selector.get_map().values()):
+            self.selector.unregister(key.fileobj)
+        for session in self.sessions:
+            session.serial.close()
+        self.selector.close()
+        if self.capture_writer:
+            self.capture_writer.close()
+
+    def run(self) -> None:
+        """Serve all ports until 'q' is entered or stop() is called."""
+        collector_thread = threading.Thread(
+            target=collector_worker, args=(self.packet_queue,), name="Collector", daemon=True
+        )
+        collector_thread.start()
+        log.info("Starting monitoring of %d ports...", len(self.sessions))
+        if self.interactive:
+            log.info("Press 's' to save, 'r' to save raw XML, 'v' to visualize, 'q' to quit")
+        try:
+            while not self.stop_event.is_set():
+                for key, _ in self.selector.select(timeout=IDLE_TIMEOUT):
+                    if key.fileobj is self.command_source:
+                        cmd = self.read_command()
+                        if not cmd:
+                            # EOF, i.e. without a tty (nohup, systemd) -> keep on monitoring
+                            log.debug("No more commands on stdin")
+                            self.selector.unregister(self.command_source)
+                        elif not self.handle_command(cmd):
+                            return
+                        continue
+                    try:
+                        key.fileobj.on_readable()
+                    except OSError as e:
+                        # device was unplugged (or the pty closed)
+                        log.warning(f"Lost {key.fileobj.name}: {e}")
+                        self.selector.unregister(key.fileobj)
+                    except Exception as e:  # noqa: BLE001 - keeps the other ports running
+                        log.exception(f"Error on {key.fileobj.name}", exc_info=e)
+                        self.selector.unregister(key.fileobj)
+        finally:
+            self.packet_queue.put(None)
+            collector_thread.join(timeout=2)
+            self.log_stats()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def log_stats(self) -> None:
+        for session in self.sessions:
+            log.info("%s: %s", session.name, session.stats)
+
+    def read_command(self) -> str:
+        return self.command_source.read(1)
+
+    def handle_command(self, cmd: str) -> bool:
+        """Execute a command for all ports, returns False to quit."""
+        collectors = [session.collector for session in self.sessions]
+        if cmd == "s":
+            for collector in collectors:
+                collector.manual_save()
+        elif cmd == "r":
+            for collector in collectors:
+                collector.save_raw_xml()
+        elif cmd == "v":
+            for collector in collectors:
+                collector.visualize_matrices()
+        elif cmd == "q":
+            return False
+        return True
+
+
+def monitor_serials(
+    serial_ports: list[str],
+    baudrate: int = 9600,
+    *,
+    debug_lines: bool = True,
+    capture: Path | None = None,
+) -> None:
+    """Monitor many serial ports in a single selector loop"""
+    monitor = MultiPortMonitor(serial_ports, baudrate, debug_lines=debug_lines, capture=capture)
+    monitor.open()
+    try:
+        monitor.run()
+    except KeyboardInterrupt:
+        log.info("\nStopping...")
+    finally:
+        monitor.close()
+        log.debug("Monitor stopped")
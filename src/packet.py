@@ -0,0 +1,125 @@
+"""Decoding of framed packets: [PACKET_ID?][LENGTH][CBOR][CRC]."""
+
+import struct
+from typing import NamedTuple
+
+import cbor2
+
+from .config_framework import FrameworkKey
+from .config_framework import HeaderKey
+from .framing import CRC_SIZE
+from .framing import calculate_crc
+from .logger import log
+
+_CRC = struct.Struct("<I")
+_LENGTH = struct.Struct("<H")
+_ID_LENGTH = struct.Struct("<IH")
+
+# keys of the chunk-schema as plain ints, for the lookups in the decoded maps
+_PINS = int(FrameworkKey.PINS)
+_PIN = int(FrameworkKey.PIN)
+_EVENTS = int(FrameworkKey.EVENTS)
+_CONNECTIONS = int(FrameworkKey.CONNECTIONS)
+_OTHER_PIN = int(FrameworkKey.OTHER_PIN)
+_CONNECTION_PARAMETER = int(FrameworkKey.CONNECTION_PARAMETER)
+_CONNECTION_TYPE = int(FrameworkKey.CONNECTION_TYPE)
+
+
+class Packet(NamedTuple):
+    """Decoded header- or chunk-packet."""
+
+    packet_id: int
+    data: dict
+    hash_valid: bool
+    received_hash: int
+    calculated_hash: int
+    raw_bytes: bytes
+    ack_requested: int = 0
+
+    @property
+    def chunk_id(self) -> object:
+        """Chunk-ID of a chunk-packet, its packet-ID if the CBOR data has none."""
+        return self.data.get(FrameworkKey.CHUNK_ID, self.packet_id)
+
+    @classmethod
+    def from_raw(cls, raw_bytes: bytes, packet_id: int = -1) -> "Packet":
+        """Create packet from trusted CBOR data (i.e. a stored recording)."""
+        data = cbor2.loads(raw_bytes)
+        crc = calculate_crc(raw_bytes)
+        return cls(
+            packet_id=packet_id,
+            data=data,
+            hash_valid=True,
+            received_hash=crc,
+            calculated_hash=crc,
+            raw_bytes=raw_bytes,
+            ack_requested=data.get(HeaderKey.ACK_REQUESTED, 0),
+        )
+
+
+def parse_packet(payload: bytes | memoryview, *, has_packet_id: bool = False) -> Packet | None:
+    """Parse CBOR packet: [PACKET_ID?][LENGTH][CBOR][CRC]"""
+    try:
+        if has_packet_id:
+            packet_id, length = _ID_LENGTH.unpack_from(payload)
+            cbor_start = _ID_LENGTH.size
+        else:
+            packet_id = -1
+            length = _LENGTH.unpack_from(payload)[0]
+            cbor_start = _LENGTH.size
+        cbor_end = cbor_start + length
+        cbor_bytes = bytes(payload[cbor_start:cbor_end])
+        if len(cbor_bytes) != length or len(payload) < cbor_end + CRC_SIZE:
+            log.warning("Packet is truncated")
+            return None
+
+        # Verify hash (4 bytes at end)
+        received_hash = _CRC.unpack_from(payload, cbor_end)[0]
+        calculated_hash = calculate_crc(cbor_bytes)
+
+        # Decode CBOR
+        try:
+            decoded = cbor2.loads(cbor_bytes)
+        except cbor2.CBORDecodeError:
+            decoded = None
+        if not isinstance(decoded, dict):
+            decoded = {"error": "cbor decode failed"}
+
+        return Packet(
+            packet_id,
+            decoded,
+            received_hash == calculated_hash,
+            received_hash,
+            calculated_hash,
+            cbor_bytes,
+            decoded.get(HeaderKey.ACK_REQUESTED, 0),
+        )
+    except Exception as e:
+        log.exception("Parse packet error", exc_info=e)
+    return None
+
+
+class PinRecord(NamedTuple):
+    """Pin of a chunk, its connections as (pin, other pin, parameter, type)."""
+
+    pin: int
+    events_mask: int
+    connections: list[tuple]
+
+
+def pin_records(data: dict) -> list[PinRecord]:
+    """Pins of a decoded chunk as compact records, in one pass over the maps."""
+    records = []
+    for entry in data.get(_PINS) or ():
+        pin = entry.get(_PIN)
+        connections = [
+            (
+                pin,
+                conn.get(_OTHER_PIN),
+                conn.get(_CONNECTION_PARAMETER),
+                conn.get(_CONNECTION_TYPE, 0),
+            )
+            for conn in entry.get(_CONNECTIONS) or ()
+        ]
+        records.append(PinRecord(pin, entry.get(_EVENTS) or 0, connections))
+    return records
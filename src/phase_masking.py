@@ -5,6 +5,7 @@ Centralized phase filtering logic for connections and matrices.
 
 from collections.abc import Sequence
 
+import numpy as np
 from typing_extensions import deprecated
 
 MASK_VALUE: int = 3  # Value to use for masked phases
@@ -31,6 +32,26 @@ def keep_phase(phase: int, existing_phases: Sequence) -> bool:
     return True
 
 
+# keep_phase() of every phase (rows) and every set of existing phases (bitmask, columns)
+KEEP_PHASE_TABLE: np.ndarray = np.array(
+    [
+        [keep_phase(phase, {p for p in range(6) if existing >> p & 1}) for existing in range(64)]
+        for phase in range(6)
+    ]
+)
+
+
+def mask_weak_connections(strengths: np.ndarray, phases: np.ndarray) -> np.ndarray:
+    """Vectorized check which connections are disturbed by the drive-strength of a pin.
+
+    Pins with strength >= 1 get masked in phases 1 and 3, pins with
+    strength <= -1 in phases 0 and 2 (undefined strength is passed as 0).
+    """
+    return ((strengths >= 1) & ((phases == 1) | (phases == 3))) | (
+        (strengths <= -1) & ((phases == 0) | (phases == 2))
+    )
+
+
 @deprecated("not used ATM")
 def mask_matrix_values(matrix_data, existing_phases: Sequence):
     """Mask matrix values based on phase filtering rules."""
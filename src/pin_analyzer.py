@@ -1,11 +1,16 @@
 """Analyze single pin measurements to determine external drive strength."""
 
 # TODO: rename file to step_analyze_pin
+import functools
+import operator
 from collections.abc import Mapping
 from collections.abc import Sequence
 
+import numpy as np
 from typing_extensions import deprecated
 
+from .event_decoder import EVENT_MASKS
+
 STRENGTH_2_PATTERN: Mapping[int, tuple] = {
     6: (1, 1, 1, 1, 1, 1),
     5: (1, 1, 1, 1, "U", 1),
@@ -25,6 +30,9 @@ PATTERN_2_STRENGTH = {v: k for k, v in STRENGTH_2_PATTERN.items()}
 
 # Order: Stage 1 N/P, Stage 2 N/P, Stage 3 N/P
 CHECKS: list[str] = ["STEP_1_A", "STEP_1_B", "STEP_2_A", "STEP_2_B", "STEP_3_A", "STEP_3_B"]
+CHECK_MASKS: list[tuple[int, int]] = [
+    (EVENT_MASKS[f"{stage}_HIGH"], EVENT_MASKS[f"{stage}_LOW"]) for stage in CHECKS
+]
 
 
 def get_value_of_stage(stage: str, events: Sequence) -> int | str:
@@ -42,7 +50,40 @@ def analyze_pin(pin_events: Sequence) -> int | None:
     return PATTERN_2_STRENGTH.get(pattern)
 
 
+def _analyze_checks(events_mask: int) -> int | None:
+    """Analyze the event-mask of a pin with bit tests, like analyze_pin()."""
+    pattern = tuple(
+        1 if events_mask & high else 0 if events_mask & low else "U" for high, low in CHECK_MASKS
+    )
+    return PATTERN_2_STRENGTH.get(pattern)
+
+
+# The check-bits of an event-mask (bits 13 to 24) as key of a table of all their strengths
+_CHECKS_MASK: int = functools.reduce(operator.or_, (high | low for high, low in CHECK_MASKS))
+_CHECKS_SHIFT = (_CHECKS_MASK & -_CHECKS_MASK).bit_length() - 1
+_STRENGTH_OF_KEY: list[int | None] = [
+    _analyze_checks(key << _CHECKS_SHIFT) for key in range((_CHECKS_MASK >> _CHECKS_SHIFT) + 1)
+]
+
+UNKNOWN_STRENGTH: int = int(np.iinfo(np.int8).min)  # no strength matches the checks
+STRENGTH_TABLE: np.ndarray = np.array(
+    [UNKNOWN_STRENGTH if strength is None else strength for strength in _STRENGTH_OF_KEY],
+    dtype=np.int8,
+)
+
+
+def analyze_pin_mask(events_mask: int) -> int | None:
+    """Analyze the check-bits of the event-mask of a pin, like analyze_pin()."""
+    return _STRENGTH_OF_KEY[(events_mask & _CHECKS_MASK) >> _CHECKS_SHIFT]
+
+
+def analyze_pin_masks(events_masks: np.ndarray) -> np.ndarray:
+    """Analyze an array of event-masks, UNKNOWN_STRENGTH instead of None."""
+    keys = (np.asarray(events_masks, dtype=np.int64) & _CHECKS_MASK) >> _CHECKS_SHIFT
+    return STRENGTH_TABLE[keys]
+
+
 @deprecated("not used ATM")
 def analyze_pins(device_pins: Mapping) -> list[int | None]:
     """Analyze events of multiple pins to derive external drive strength."""
-    return [analyze_pin(p.get("events", [])) for p in device_pins]
+    return [analyze_pin_mask(p.get("events_mask", 0)) for p in device_pins]
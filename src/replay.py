@@ -0,0 +1,123 @@
+"""Replay of raw captures through the live receive-pipeline.
+
+The capture is memory-mapped and its blocks are fed port by port into the
+same framing, parse_packet and collector path as in live monitoring (see
+PortSession). ACKs go to a stub serial port that discards them. Replay runs
+either at max speed (regression tests, throughput measurement) or with
+the timing of the recording (to reproduce timing-bugs from the field).
+"""
+
+import contextlib
+import mmap
+import queue
+import threading
+import time
+from pathlib import Path
+
+from .capture import RecordType
+from .capture import iter_records
+from .concurrent_monitor import collector_worker
+from .data_storage import DeviceDataCollector
+from .logger import log
+from .multi_monitor import PortSession
+
+
+class NullSerial:
+    """Stand-in for a serial port that swallows the ACKs."""
+
+    def __init__(self, port: str) -> None:
+        self.port = port
+        self.bytes_written = 0
+
+    def write(self, data: bytes) -> int:
+        self.bytes_written += len(data)
+        return len(data)
+
+
+class Replay:
+    """Feed a capture into one PortSession per recorded port."""
+
+    def __init__(self, path: Path, *, realtime: bool = False, debug_lines: bool = True) -> None:
+        self.path = Path(path)
+        self.realtime = realtime
+        self.debug_lines = debug_lines
+        self.packet_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.sessions: dict[str, PortSession] = {}
+        self.bytes_replayed = 0
+        self.duration = 0.0
+
+    @property
+    def collectors(self) -> dict[str, DeviceDataCollector]:
+        return {name: session.collector for name, session in self.sessions.items()}
+
+    def _session(self, name: str) -> PortSession:
+        if name not in self.sessions:
+            self.sessions[name] = PortSession(
+                NullSerial(name), self.packet_queue, debug_lines=self.debug_lines
+            )
+        return self.sessions[name]
+
+    def run(self) -> None:
+        collector_thread = threading.Thread(
+            target=collector_worker, args=(self.packet_queue,), name="Collector", daemon=True
+        )
+        collector_thread.start()
+        t_start = time.perf_counter()
+        try:
+            with (
+                self.path.open("rb") as file,
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data,
+            ):
+                self._replay(data)
+        finally:
+            self.packet_queue.put(None)
+            collector_thread.join()
+        self.duration = time.perf_counter() - t_start
+
+    def _replay(self, data: mmap.mmap) -> None:
+        ports: dict[int, PortSession] = {}
+        t_base = None  # timestamps are monotonic per capture-session
+        # the views into the mmap are released (also on errors), so it can be closed
+        with contextlib.closing(iter_records(data)) as records:
+            for record in records:
+                try:
+                    if record.record_type == RecordType.START:
+                        ports = {}
+                        t_base = None
+                    elif record.record_type == RecordType.PORT:
+                        ports[record.port] = self._session(bytes(record.payload).decode())
+                    elif record.record_type == RecordType.DATA:
+                        if self.realtime:
+                            if t_base is None:
+                                t_base = time.perf_counter() - record.timestamp_ns * 1e-9
+                            delay = t_base + record.timestamp_ns * 1e-9 - time.perf_counter()
+                            if delay > 0:
+                                time.sleep(delay)
+                        session = ports.get(record.port)
+                        if session is None:
+                            session = ports[record.port] = self._session(f"port{record.port}")
+                        session.feed(bytes(record.payload))
+                        self.bytes_replayed += len(record.payload)
+                finally:
+                    record.payload.release()
+
+    def log_stats(self) -> None:
+        for name, session in self.sessions.items():
+            log.info("%s: %s", name, session.framer.stats)
+        log.info(
+            "Replayed %d bytes in %.3f s (%.2f MB/s)",
+            self.bytes_replayed,
+            self.duration,
+            self.bytes_replayed / max(self.duration, 1e-9) / 1e6,
+        )
+
+
+def replay_capture(path: Path, *, realtime: bool = False, debug_lines: bool = True) -> Replay:
+    """Replay a capture, completed devices get reported as in live monitoring"""
+    replay = Replay(path, realtime=realtime, debug_lines=debug_lines)
+    try:
+        replay.run()
+    except KeyboardInterrupt:
+        log.info("\nStopping...")
+    replay.log_stats()
+    return replay
@@ -0,0 +1,153 @@
+"""Coalescing byte ring-buffer between serial reader and packet processor."""
+
+import threading
+from enum import Enum
+
+from .logger import log
+
+
+class OverflowPolicy(str, Enum):
+    """What put() does when the buffer is full."""
+
+    BLOCK = "block"  # writer waits until the reader makes room
+    GROW = "grow"  # capacity is doubled as needed
+    DROP = "drop"  # data that does not fit is discarded and counted
+
+
+class ByteRingBuffer:
+    """Thread-safe FIFO for bytes that merges all written fragments.
+
+    A reader always gets everything that is buffered as one bytes-object,
+    instead of one queue-item per fragment of serial.read().
+    Fill level, high-water mark and overflow counters are kept for monitoring.
+    """
+
+    def __init__(
+        self, capacity: int = 1024 * 1024, policy: OverflowPolicy = OverflowPolicy.GROW
+    ) -> None:
+        if capacity < 1:
+            raise ValueError("Capacity must be positive")
+        self.policy = OverflowPolicy(policy)
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._head = 0  # read position
+        self._size = 0  # number of buffered bytes
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._writers_waiting = 0
+        self.high_water = 0
+        self.bytes_written = 0
+        self.bytes_dropped = 0
+        self.writes_blocked = 0
+        self.writes = 0
+        self.reads = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def fill_level(self) -> int:
+        """Number of buffered bytes."""
+        return self._size
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "capacity": self.capacity,
+            "fill_level": self._size,
+            "high_water": self.high_water,
+            "bytes_written": self.bytes_written,
+            "bytes_dropped": self.bytes_dropped,
+            "writes_blocked": self.writes_blocked,
+            "writes": self.writes,
+            "reads": self.reads,
+        }
+
+    def put(self, data: bytes, timeout: float | None = None) -> int:
+        """Append data according to the overflow-policy, returns number of accepted bytes.
+
+        With policy BLOCK the timeout limits each wait for free space.
+        """
+        with self._lock:
+            self.writes += 1
+            was_empty = self._size == 0
+            if len(data) <= self.capacity - self._size:
+                # fast path: everything fits
+                self._write(data)
+                written = len(data)
+            else:
+                written = self._put_overflowing(memoryview(data), timeout)
+            if was_empty and self._size:
+                self._not_empty.notify()
+            self.bytes_written += written
+            self.high_water = max(self.high_water, self._size)
+        return written
+
+    def get(self, timeout: float | None = None, max_size: int | None = None) -> bytes:
+        """Return all buffered data (or up to max_size), empty bytes after a timeout."""
+        with self._lock:
+            if self._size == 0 and not self._not_empty.wait_for(lambda: self._size, timeout):
+                return b""
+            size = self._size if max_size is None else min(max_size, self._size)
+            end = self._head + size
+            if end <= self.capacity:
+                data = bytes(self._view[self._head : end])
+            else:
+                data = b"".join((self._view[self._head :], self._view[: end - self.capacity]))
+            self._size -= size
+            self._head = 0 if self._size == 0 else end % self.capacity
+            self.reads += 1
+            if self._writers_waiting:
+                self._not_full.notify_all()
+        return data
+
+    def _put_overflowing(self, data: memoryview, timeout: float | None) -> int:
+        written = 0
+        while written < len(data):
+            free = self.capacity - self._size
+            if free == 0:
+                if self.policy == OverflowPolicy.GROW:
+                    self._grow(self._size + len(data) - written)
+                    continue
+                if self.policy == OverflowPolicy.DROP:
+                    self.bytes_dropped += len(data) - written
+                    break
+                self.writes_blocked += 1
+                self._writers_waiting += 1
+                has_room = self._not_full.wait(timeout)
+                self._writers_waiting -= 1
+                if not has_room:
+                    break
+                continue
+            size = min(free, len(data) - written)
+            self._write(data[written : written + size])
+            written += size
+            # the reader may have emptied the buffer while this writer was waiting
+            self._not_empty.notify()
+        return written
+
+    def _write(self, data: bytes | memoryview) -> None:
+        tail = (self._head + self._size) % self.capacity
+        first = min(len(data), self.capacity - tail)
+        self._view[tail : tail + first] = data[:first]
+        if first < len(data):
+            self._view[: len(data) - first] = data[first:]
+        self._size += len(data)
+
+    def _grow(self, min_capacity: int) -> None:
+        capacity = max(2 * self.capacity, min_capacity)
+        buffer = bytearray(capacity)
+        end = self._head + self._size
+        if end <= self.capacity:
+            buffer[: self._size] = self._view[self._head : end]
+        else:
+            first = self.capacity - self._head
+            buffer[:first] = self._view[self._head :]
+            buffer[first : self._size] = self._view[: end - self.capacity]
+        self._view.release()
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+        self._head = 0
+        log.warning("Receive buffer grew to %d bytes, processing lags behind", capacity)
@@ -0,0 +1,338 @@
+"""Simulator of BIST devices on pseudo-terminals (linux / macOS only).
+
+Every virtual device sends a header and then the chunks of all sessions,
+CBOR-encoded with the HeaderKey / FrameworkKey layout and framed with CRC,
+just like the firmware. When ACKs are requested a frame is repeated until
+its ACK arrives (stop-and-wait). Noise corrupts frames and inserts garbage
+between them. All devices are served by one selector loop.
+"""
+
+import itertools
+import math
+import os
+import random
+import selectors
+import statistics
+import threading
+import time
+from collections.abc import Iterator
+
+import cbor2
+
+from .ack_writer import ACK_END
+from .ack_writer import ACK_START
+from .config_framework import ConnectionType
+from .config_framework import FrameworkKey
+from .config_framework import HeaderKey
+from .event_decoder import PIN_EVENTS_REVERSED
+from .framing import CHUNK_START
+from .framing import MARKER_SIZE
+from .framing import PACKET_ID_SIZE
+from .framing import FrameType
+from .framing import encode_frame
+from .logger import log
+from .pin_analyzer import CHECKS
+from .pin_analyzer import STRENGTH_2_PATTERN
+
+_ACK_START = ACK_START.to_bytes(4, "little")
+_ACK_END = ACK_END.to_bytes(4, "little")
+ACK_SIZE: int = 12
+MAX_BURST: int = 64  # frames per port and loop-iteration, keeps the loop responsive
+
+
+class VirtualDevice:
+    """Deterministic (seeded) test-results of one device, encoded as CBOR packets."""
+
+    def __init__(
+        self,
+        family: str = "NRF52840",
+        uuid: int | None = None,
+        *,
+        pins: int = 48,
+        sessions: int = 7,
+        pins_per_chunk: int = 2,
+        ack_requested: bool = True,
+        seed: int | None = None,
+    ) -> None:
+        self.rng = random.Random(seed)  # noqa: S311
+        self.family = family
+        self.uuid = self.rng.getrandbits(63) if uuid is None else uuid
+        self.pins = pins
+        self.sessions = sessions
+        self.pins_per_chunk = pins_per_chunk
+        self.total_chunks = math.ceil(pins / pins_per_chunk)
+        self.ack_requested = int(ack_requested)
+        self.events, self.connections = self._wiring()
+
+    def _wiring(self) -> tuple[list[int], list[list[dict]]]:
+        """Random drive-strengths and some shorted pin-pairs."""
+        strengths = [0] * self.pins
+        for pin in self.rng.sample(range(self.pins), self.pins // 8):
+            strengths[pin] = self.rng.choice([-6, -4, -2, 2, 4, 6])
+        connections: list[list[dict]] = [[] for _ in range(self.pins)]
+        for _ in range(self.pins // 8):
+            pin_a, pin_b = self.rng.sample(range(self.pins), 2)
+            for phase in self.rng.sample(range(6), self.rng.randint(1, 6)):
+                for pin, other_pin in ((pin_a, pin_b), (pin_b, pin_a)):
+                    connections[pin].append(
+                        {
+                            FrameworkKey.CONNECTION_TYPE: ConnectionType.INTERNAL,
+                            FrameworkKey.OTHER_PIN: other_pin,
+                            FrameworkKey.CONNECTION_PARAMETER: phase,
+                        }
+                    )
+        events = []
+        for pin in range(self.pins):
+            mask = 0
+            for check, value in zip(CHECKS, STRENGTH_2_PATTERN[strengths[pin]], strict=True):
+                mask |= 1 << PIN_EVENTS_REVERSED[f"{check}_{'HIGH' if value else 'LOW'}"]
+            if connections[pin]:
+                mask |= 1 << PIN_EVENTS_REVERSED["PIN_IS_CONNECTED_WITH_INTERNAL_PIN"]
+            events.append(mask)
+        return events, connections
+
+    def header(self) -> bytes:
+        return cbor2.dumps(
+            {
+                HeaderKey.ACK_REQUESTED: self.ack_requested,
+                HeaderKey.DEVICE_UUID: self.uuid,
+                HeaderKey.DEVICE_FAMILY: self.family,
+                HeaderKey.TOTAL_CHUNKS: self.total_chunks,
+                HeaderKey.TOTAL_PINS: self.pins,
+                HeaderKey.VERSION: "SIM",
+                HeaderKey.EXPECTED_SESSIONS: self.sessions,
+            }
+        )
+
+    def chunk(self, session: int, chunk_id: int) -> bytes:
+        first = chunk_id * self.pins_per_chunk
+        pins = range(first, min(first + self.pins_per_chunk, self.pins))
+        return cbor2.dumps(
+            {
+                HeaderKey.ACK_REQUESTED: self.ack_requested,
+                FrameworkKey.STREAM_NUMBER: session,
+                FrameworkKey.PINS: [
+                    {
+                        FrameworkKey.PIN: pin,
+                        FrameworkKey.EVENTS: self.events[pin],
+                        FrameworkKey.CONNECTIONS: self.connections[pin],
+                    }
+                    for pin in pins
+                ],
+            }
+        )
+
+    def frames(self) -> Iterator[bytes]:
+        """Header and all chunks of all sessions, the packet-ID is the chunk-ID."""
+        yield encode_frame(FrameType.HEADER, self.header())
+        for session in range(self.sessions):
+            for chunk_id in range(self.total_chunks):
+                yield encode_frame(FrameType.CHUNK, self.chunk(session, chunk_id), chunk_id)
+
+
+class SimulatedPort:
+    """Pseudo-terminal that transmits the frames of a virtual device."""
+
+    def __init__(
+        self,
+        device: VirtualDevice,
+        *,
+        rounds: int = 1,
+        chunk_rate: float = 0,
+        ack_timeout: float = 0.5,
+        retries: int = 5,
+        noise: float = 0,
+        debug_lines: bool = False,
+    ) -> None:
+        self.device = device
+        self.ack = bool(device.ack_requested)
+        self.interval = 1 / chunk_rate if chunk_rate > 0 else 0
+        self.ack_timeout = ack_timeout
+        self.retries = retries
+        self.noise = noise
+        self.debug_lines = debug_lines
+        import tty  # posix only
+
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)  # no echo or line-editing until the monitor opens the port
+        os.set_blocking(self.master, False)
+        self.name = os.ttyname(self.slave)
+        repeats = itertools.count() if rounds < 1 else range(rounds)
+        self._frames = itertools.chain.from_iterable(device.frames() for _ in repeats)
+        self._frame: bytes | None = None
+        self._crc = 0
+        self._attempts = 0
+        self._t_sent = 0.0
+        self._t_next = 0.0
+        self._rx = bytearray()
+        self.tx = bytearray()
+        self.finished = False
+        self.frames_sent = 0
+        self.retransmissions = 0
+        self.failures = 0
+        self.acks = 0
+        self.rtts: list[float] = []
+
+    def fileno(self) -> int:
+        return self.master
+
+    def close(self) -> None:
+        os.close(self.master)
+        os.close(self.slave)
+
+    @property
+    def waiting_for_ack(self) -> bool:
+        return self._frame is not None
+
+    def deadline(self) -> float | None:
+        """Time of the next transmission or retransmission."""
+        if self.finished or self.tx:
+            return None
+        if self.waiting_for_ack:
+            return self._t_sent + self.ack_timeout
+        return self._t_next
+
+    def on_timer(self, now: float) -> None:
+        """Send everything that is due (a burst of frames when ACKs are off)."""
+        for _ in range(MAX_BURST):
+            deadline = self.deadline()
+            if deadline is None or now < deadline:
+                return
+            if not self.waiting_for_ack:
+                frame = next(self._frames, None)
+                if frame is None:
+                    self.finished = True
+                    return
+                self._frame = frame
+                self._crc = int.from_bytes(frame[-8:-4], "little")  # [..][CRC][END]
+                self._attempts = 0
+            elif self._attempts > self.retries:
+                log.warning("%s: no ACK after %d retries, skipping frame", self.name, self.retries)
+                self.failures += 1
+                self._frame = None
+                self._t_next = now
+                continue
+            else:
+                self.retransmissions += 1
+            self._transmit(now)
+
+    def _transmit(self, now: float) -> None:
+        frame = self._frame
+        if self.debug_lines:
+            self.tx += f"DEBUG: sending frame {self.frames_sent}\n".encode()
+        if self.noise and self.device.rng.random() < self.noise:
+            garbage = self.device.rng.randbytes(self.device.rng.randint(1, 32))
+            position = self.device.rng.randrange(len(frame))
+            if frame.startswith(CHUNK_START) and position - MARKER_SIZE in range(PACKET_ID_SIZE):
+                # neither CRC nor markers protect the PACKET_ID, hit the start-marker instead
+                position -= PACKET_ID_SIZE
+            frame = frame[:position] + bytes([frame[position] ^ 0xFF]) + frame[position + 1 :]
+            self.tx += garbage
+        self.tx += frame
+        self._attempts += 1
+        self.frames_sent += 1
+        self._t_sent = now
+        self._t_next = now + self.interval
+        if not self.ack:
+            self._frame = None  # fire and forget
+        self.on_writable()
+
+    def on_writable(self) -> None:
+        try:
+            written = os.write(self.master, self.tx)
+        except BlockingIOError:
+            return  # nobody reads the port yet
+        del self.tx[:written]
+
+    def on_readable(self) -> None:
+        try:
+            self._rx += os.read(self.master, 4096)
+        except BlockingIOError:
+            return
+        while (start := self._rx.find(_ACK_START)) >= 0 and len(self._rx) >= start + ACK_SIZE:
+            ack = self._rx[start : start + ACK_SIZE]
+            del self._rx[: start + ACK_SIZE]
+            if ack[8:] != _ACK_END:
+                continue
+            if self.waiting_for_ack and int.from_bytes(ack[4:8], "little") == self._crc:
+                now = time.perf_counter()
+                self.rtts.append(now - self._t_sent)
+                self.acks += 1
+                self._frame = None
+                self._t_next = max(now, self._t_sent + self.interval)
+        if len(self._rx) > 4096:
+            del self._rx[:-ACK_SIZE]  # no ACKs in there
+
+    @property
+    def stats(self) -> dict[str, float]:
+        stats = {
+            "frames_sent": self.frames_sent,
+            "retransmissions": self.retransmissions,
+            "failures": self.failures,
+            "acks": self.acks,
+        }
+        if self.rtts:
+            rtts = sorted(self.rtts)
+            stats["rtt_median"] = 1e3 * statistics.median(rtts)
+            stats["rtt_p99"] = 1e3 * rtts[int(0.99 * (len(rtts) - 1))]
+        return stats
+
+
+class Simulator:
+    """Serve many simulated ports in one selector loop."""
+
+    def __init__(self, ports: list[SimulatedPort]) -> None:
+        self.ports = ports
+        self.stop_event = threading.Event()
+
+    def run(self) -> None:
+        """Transmit until every device is finished or stop() is called."""
+        selector = selectors.DefaultSelector()
+        events = {}
+        for port in self.ports:
+            events[port] = selectors.EVENT_READ
+            selector.register(port, events[port])
+        try:
+            while not self.stop_event.is_set() and not all(port.finished for port in self.ports):
+                now = time.perf_counter()
+                deadlines = [d for port in self.ports if (d := port.deadline()) is not None]
+                timeout = min(max(min(deadlines, default=now + 0.1) - now, 0), 0.1)
+                for port in self.ports:
+                    wanted = selectors.EVENT_READ | (selectors.EVENT_WRITE if port.tx else 0)
+                    if wanted != events[port]:
+                        events[port] = wanted
+                        selector.modify(port, wanted)
+                for key, mask in selector.select(timeout):
+                    if mask & selectors.EVENT_READ:
+                        key.fileobj.on_readable()
+                    if mask & selectors.EVENT_WRITE:
+                        key.fileobj.on_writable()
+                now = time.perf_counter()
+                for port in self.ports:
+                    port.on_timer(now)
+        finally:
+            selector.close()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def close(self) -> None:
+        for port in self.ports:
+            port.close()
+
+    def log_stats(self) -> None:
+        for port in self.ports:
+            log.info("%s: %s", port.name, port.stats)
+
+
+def run_simulation(ports: list[SimulatedPort]) -> None:
+    """Simulate devices until all are done or ctrl+c is pressed"""
+    log.info("Simulated ports: %s", " ".join(port.name for port in ports))
+    simulator = Simulator(ports)
+    try:
+        simulator.run()
+    except KeyboardInterrupt:
+        log.info("\nStopping...")
+    finally:
+        simulator.log_stats()
+        simulator.close()
@@ -0,0 +1,297 @@
+"""Shard serial ports across worker processes for large test racks.
+
+Every worker runs the complete framing / ACK / collector pipeline of a
+MultiPortMonitor for its share of the ports, so framing and CBOR decoding
+scale with the number of CPU cores. Completed devices (and snapshots on
+request) stream back to the coordinator over pipes. The coordinator is the
+only place that reports: device reports, saving, raw XML export and
+visualization happen there for the whole rack.
+"""
+
+import contextlib
+import multiprocessing
+import selectors
+import sys
+import threading
+from collections.abc import Callable
+from multiprocessing.connection import Connection
+from pathlib import Path
+
+from .data_storage import DeviceDataCollector
+from .logger import log
+from .multi_monitor import MultiPortMonitor
+from .packet import Packet
+
+
+def shard_ports(serial_ports: list[str], n_workers: int) -> list[list[str]]:
+    """Distribute ports round-robin, omits empty shards."""
+    shards = [serial_ports[index::n_workers] for index in range(max(n_workers, 1))]
+    return [shard for shard in shards if shard]
+
+
+class ReportingCollector(DeviceDataCollector):
+    """Collector of a worker that forwards completed devices to the coordinator.
+
+    Workers do not save reports, the coordinator reports the forwarded devices.
+
+    The lock keeps snapshots (requested from the selector loop) consistent
+    with the collector thread.
+    """
+
+    def __init__(self, port: str, send: Callable[[tuple], None]) -> None:
+        super().__init__()
+        self.port = port
+        self.send = send
+        self.lock = threading.Lock()
+
+    def process_header(self, header: Packet | None) -> bool:
+        with self.lock:
+            return super().process_header(header)
+
+    def process_chunk(self, chunk: Packet | None) -> bool:
+        with self.lock:
+            return super().process_chunk(chunk)
+
+    def is_complete(self) -> bool:
+        with self.lock:
+            for family, device in self.devices.items():
+                if device["complete"] and not device.get("saved", False):
+                    self.send(("complete", self.port, family, device))
+                    device["saved"] = True  # saved by the coordinator
+        return False
+
+    def snapshot(self) -> None:
+        with self.lock:
+            self.send(("snapshot", self.port, self.devices))
+
+
+class WorkerMonitor(MultiPortMonitor):
+    """MultiPortMonitor of a worker-process, controlled via pipe instead of stdin."""
+
+    def __init__(
+        self,
+        serial_ports: list[str],
+        conn: Connection,
+        baudrate: int = 9600,
+        *,
+        debug_lines: bool,
+        capture: Path | None = None,
+    ) -> None:
+        super().__init__(
+            serial_ports, baudrate, debug_lines=debug_lines, interactive=False, capture=capture
+        )
+        self.conn = conn
+        self.command_source = conn
+        self._send_lock = threading.Lock()
+
+    def send(self, message: tuple) -> None:
+        with self._send_lock:
+            self.conn.send(message)
+
+    def create_collector(self, port: str) -> DeviceDataCollector:
+        return ReportingCollector(port, self.send)
+
+    def read_command(self) -> str:
+        try:
+            return self.conn.recv()
+        except EOFError:
+            return "q"  # coordinator is gone
+
+    def handle_command(self, cmd: str) -> bool:
+        if cmd == "snapshot":
+            for session in self.sessions:
+                session.collector.snapshot()
+            self.send(("snapshot_done",))
+            return True
+        return cmd != "q"
+
+
+def worker_main(
+    serial_ports: list[str],
+    conn: Connection,
+    *,
+    baudrate: int,
+    debug_lines: bool,
+    log_level: int,
+    capture: Path | None = None,
+) -> None:
+    """Entry point of a worker-process."""
+    log.setLevel(log_level)
+    monitor = WorkerMonitor(serial_ports, conn, baudrate, debug_lines=debug_lines, capture=capture)
+    try:
+        monitor.open()
+        monitor.send(("ready",))
+        monitor.run()
+    except KeyboardInterrupt:
+        pass  # the coordinator stops the workers
+    finally:
+        for session in monitor.sessions:
+            monitor.send(("stats", session.name, session.stats))
+        monitor.send(("stopped",))
+        monitor.close()
+
+
+class WorkerPool:
+    """Coordinator of the worker-processes, holds a collector per port for reporting."""
+
+    def __init__(
+        self,
+        serial_ports: list[str],
+        n_workers: int,
+        baudrate: int = 9600,
+        *,
+        debug_lines: bool = True,
+        interactive: bool = True,
+        capture: Path | None = None,
+    ) -> None:
+        self.shards = shard_ports(serial_ports, n_workers)
+        self.baudrate = baudrate
+        self.debug_lines = debug_lines
+        self.capture = capture
+        self.collectors = {port: DeviceDataCollector() for port in serial_ports}
+        self.port_stats: dict[str, dict] = {}
+        self.processes: list[multiprocessing.Process] = []
+        self.connections: list[Connection] = []
+        self.selector = selectors.DefaultSelector()
+        self.command_source = sys.stdin if interactive else None
+        self.devices_completed = 0
+
+    def start(self) -> None:
+        for index, shard in enumerate(self.shards):
+            capture = None
+            if self.capture:
+                # one capture per worker, i.e. out_0.bin, out_1.bin
+                capture = self.capture.with_stem(f"{self.capture.stem}_{index}")
+            conn, worker_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=worker_main,
+                args=(shard, worker_conn),
+                kwargs={
+                    "baudrate": self.baudrate,
+                    "debug_lines": self.debug_lines,
+                    "log_level": log.getEffectiveLevel(),
+                    "capture": capture,
+                },
+                name=f"Worker{index}",
+                daemon=True,
+            )
+            process.start()
+            worker_conn.close()
+            self.processes.append(process)
+            self.connections.append(conn)
+            self.selector.register(conn, selectors.EVENT_READ)
+        if self.command_source is not None:
+            self.selector.register(self.command_source, selectors.EVENT_READ)
+        # data arriving before a port is opened would be flushed
+        for conn in list(self.connections):
+            while self._receive(conn) not in ("ready", "stopped"):
+                pass
+        log.info("Started %d workers for %d ports", len(self.shards), len(self.collectors))
+
+    def run(self) -> None:
+        """Receive results until 'q' is entered or all workers stopped."""
+        if self.command_source is not None:
+            log.info("Press 's' to save, 'r' to save raw XML, 'v' to visualize, 'q' to quit")
+        while self.connections and self.poll():
+            pass
+
+    def poll(self, timeout: float | None = None) -> bool:
+        """Handle pending commands and results of workers, returns False to quit."""
+        for key, _ in self.selector.select(timeout):
+            if key.fileobj is self.command_source:
+                cmd = self.command_source.read(1)
+                if not cmd:  # EOF, i.e. without a tty -> keep on monitoring
+                    self.selector.unregister(self.command_source)
+                elif not self.handle_command(cmd):
+                    return False
+            else:
+                self._receive(key.fileobj)
+        return True
+
+    def stop(self, timeout: float = 5) -> None:
+        for conn in self.connections:
+            with contextlib.suppress(OSError):  # worker already gone
+                conn.send("q")
+        # drain remaining results and the final stats
+        while self.connections:
+            ready = [conn for conn in self.connections if conn.poll(timeout)]
+            if not ready:
+                log.warning("Workers did not stop in time")
+                break
+            for conn in ready:
+                self._receive(conn)
+        for process in self.processes:
+            process.join(timeout=timeout)
+            if process.is_alive():
+                process.terminate()
+        self.selector.close()
+        for port, stats in self.port_stats.items():
+            log.info("%s: %s", port, stats)
+
+    def request_snapshots(self) -> None:
+        """Fetch the current state of all devices (also incomplete ones) from the workers."""
+        pending = list(self.connections)
+        for conn in pending:
+            conn.send("snapshot")
+        for conn in pending:
+            while conn in self.connections and self._receive(conn) != "snapshot_done":
+                pass
+
+    def handle_command(self, cmd: str) -> bool:
+        """Execute a command for all ports, returns False to quit."""
+        if cmd in ("s", "r", "v"):
+            self.request_snapshots()
+        for collector in self.collectors.values():
+            if not collector.devices:
+                continue
+            if cmd == "s":
+                collector.manual_save()
+            elif cmd == "r":
+                collector.save_raw_xml()
+            elif cmd == "v":
+                collector.visualize_matrices()
+        return cmd != "q"
+
+    def _receive(self, conn: Connection) -> str | None:
+        """Handle one message of a worker, returns its kind."""
+        try:
+            kind, *content = conn.recv()
+        except EOFError:
+            kind, content = "stopped", []
+        if kind == "complete":
+            port, family, device = content
+            self.collectors[port].set_device(family, device)
+            self.collectors[port].is_complete()  # saves the device-report
+            self.devices_completed += 1
+            log.info("Device %s complete on %s", family, port)
+        elif kind == "snapshot":
+            port, devices = content
+            self.collectors[port].set_devices(devices)
+        elif kind == "stats":
+            port, stats = content
+            self.port_stats[port] = stats
+        elif kind == "stopped":
+            self.selector.unregister(conn)
+            self.connections.remove(conn)
+            conn.close()
+        return kind
+
+
+def monitor_workers(
+    serial_ports: list[str],
+    n_workers: int,
+    baudrate: int = 9600,
+    *,
+    debug_lines: bool = True,
+    capture: Path | None = None,
+) -> None:
+    """Monitor serial ports sharded across worker-processes"""
+    pool = WorkerPool(serial_ports, n_workers, baudrate, debug_lines=debug_lines, capture=capture)
+    pool.start()
+    try:
+        pool.run()
+    except KeyboardInterrupt:
+        log.info("\nStopping...")
+    finally:
+        pool.stop()
+        log.debug("Monitor stopped")
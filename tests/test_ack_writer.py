@@ -0,0 +1,30 @@
+import time
+
+from bistmon.ack_writer import ACK_END
+from bistmon.ack_writer import ACK_START
+from bistmon.ack_writer import AckWriter
+
+
+class FakeSerial:
+    def __init__(self) -> None:
+        self.written = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self.written += data
+        return len(data)
+
+
+def test_ack_writer_sends_acks_and_records_latency() -> None:
+    serial = FakeSerial()
+    ack_writer = AckWriter(serial)
+    ack_writer.start()
+    ack_writer.send(0x12345678, time.perf_counter())
+    ack_writer.send(0x9ABCDEF0)
+    ack_writer.stop()
+    assert serial.written[:4] == ACK_START.to_bytes(4, "little")
+    assert serial.written[4:8] == (0x12345678).to_bytes(4, "little")
+    assert serial.written[8:12] == ACK_END.to_bytes(4, "little")
+    assert len(serial.written) == 24
+    stats = ack_writer.stats
+    assert stats["acks_sent"] == 2
+    assert 0 <= stats["latency_median"] <= stats["latency_max"]
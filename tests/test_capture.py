@@ -0,0 +1,35 @@
+from pathlib import Path
+
+import pytest
+from bistmon.capture import CaptureWriter
+from bistmon.capture import RecordType
+from bistmon.capture import iter_records
+
+
+def test_capture_roundtrip_and_append(tmp_path: Path) -> None:
+    path = tmp_path / "capture.bin"
+    for _ in range(2):
+        with CaptureWriter(path) as writer:
+            port = writer.add_port("/dev/ttyACM0")
+            writer.write(port, b"DEBUG: hello\n")
+            writer.write(port, b"\x09\x0a\x0b\x0c")
+    records = list(iter_records(path.read_bytes()))
+    assert [record.record_type for record in records] == 2 * [
+        RecordType.START,
+        RecordType.PORT,
+        RecordType.DATA,
+        RecordType.DATA,
+    ]
+    assert bytes(records[1].payload) == b"/dev/ttyACM0"
+    assert bytes(records[3].payload) == b"\x09\x0a\x0b\x0c"
+    assert records[2].timestamp_ns <= records[3].timestamp_ns
+
+
+def test_capture_ignores_truncated_record(tmp_path: Path) -> None:
+    path = tmp_path / "capture.bin"
+    with CaptureWriter(path) as writer:
+        writer.write(writer.add_port("A"), b"0123456789")
+    data = path.read_bytes()
+    assert len(list(iter_records(data[:-3]))) == 2
+    with pytest.raises(ValueError, match="no capture"):
+        list(iter_records(b"x" * len(data)))
@@ -27,3 +27,15 @@ def test_cli_load_recording(file: Path) -> None:
 def test_cli_list_serial_ports() -> None:
     res = CliRunner().invoke(cli, ["--verbose", "list"])
     assert res.exit_code == 0
+
+
+@pytest.mark.parametrize("options", [["--serial-ports", "b"], ["--workers", "2"]])
+def test_cli_serial_rejects_buffer_policy(options: list[str], monkeypatch) -> None:  # noqa: ANN001
+    def monitor(*_args: object, **_kwargs: object) -> None:
+        pytest.fail("ports must not be opened")
+
+    for name in ("monitor_serial", "monitor_serials", "monitor_workers"):
+        monkeypatch.setattr(f"bistmon.cli.{name}", monitor)
+    args = ["serial", "--serial-ports", "a", *options, "--buffer-policy", "drop"]
+    res = CliRunner().invoke(cli, args)
+    assert res.exit_code == 0
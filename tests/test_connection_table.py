@@ -0,0 +1,139 @@
+import random
+
+import numpy as np
+from bistmon.config_framework import ConnectionType
+from bistmon.config_framework import FrameworkKey
+from bistmon.connection_table import ConnectionTable
+from bistmon.connection_table import ConnectionView
+from bistmon.connection_table import pin_major_rows
+from bistmon.data_storage import DeviceDataCollector
+from bistmon.packet import Packet
+from bistmon.simulator import VirtualDevice
+
+
+def connection(other: int, param, conn_type: int = ConnectionType.INTERNAL) -> dict:  # noqa: ANN001
+    return {
+        FrameworkKey.OTHER_PIN: other,
+        FrameworkKey.CONNECTION_PARAMETER: param,
+        FrameworkKey.CONNECTION_TYPE: conn_type,
+    }
+
+
+def test_views_of_pins() -> None:
+    table = ConnectionTable(capacity=2)
+    pins = [{"pin": pin, "connections": ConnectionView(table, pin)} for pin in (5, 3)]
+    for index in range(100):  # interleaved like sessions, grows the table
+        pins[index % 2]["connections"].append(connection(index, index % 6))
+    assert len(table) == 100
+    assert len(pins[0]["connections"]) == 50
+    conn = pins[1]["connections"][-1]
+    assert conn[FrameworkKey.OTHER_PIN] == 99
+    assert conn.get("masked", True) is False
+    conn["masked"] = True
+    assert table.masked.sum() == 1
+    assert dict(pins[0]["connections"][0]) == {
+        **connection(0, 0),
+        "masked": False,
+        "phase_masked": False,
+        "count": 1,
+    }
+    assert table.source[pin_major_rows(pins)].tolist() == [5] * 50 + [3] * 50
+
+
+def test_repeated_connections() -> None:
+    device = VirtualDevice(pins=24, seed=0)
+    device.connections[0].append(connection(1, "DEV_B", ConnectionType.EXTERNAL))
+    collectors = {}
+    for sessions in (1, 3):
+        device.sessions = sessions
+        collector = DeviceDataCollector()
+        collector.process_header(Packet.from_raw(device.header()))
+        for session in range(sessions):
+            for chunk_id in range(device.total_chunks):
+                collector.process_chunk(Packet.from_raw(device.chunk(session, chunk_id), chunk_id))
+        collector._apply_phase_masking(device.family)  # noqa: SLF001
+        collectors[sessions] = collector
+    once, thrice = (collectors[sessions].devices[device.family] for sessions in (1, 3))
+    assert len(thrice["connections"]) == len(once["connections"])
+    assert set(thrice["connections"].count.tolist()) == {3}
+    assert thrice["pins"][0]["connections"][-1]["count"] == 3
+    assert collectors[3].external_connections.between(device.family, "DEV_B") == [(0, 1)]
+    assert np.array_equal(
+        collectors[3].create_phase_tensor(device.family),
+        collectors[1].create_phase_tensor(device.family),
+    )
+    (vectors,) = collectors[3].get_connection_vectors().values()
+    (vectors_once,) = collectors[1].get_connection_vectors().values()
+    assert [vector["value"] for pair in vectors for vector in pair["grouped_vectors"]] == [
+        (3 * x, 3 * y)
+        for pair in vectors_once
+        for x, y in (v["value"] for v in pair["grouped_vectors"])
+    ]
+
+
+def test_extend_table() -> None:
+    table = ConnectionTable(capacity=2)
+    table.append(1, 2, 0)
+    rows = table.extend([(1, 3, 0, 0), (1, 2, 0, 0), (1, 3, 0, 0), (2, [4], 0, 0), (2, [4], 0, 0)])
+    assert rows == [1, 0, 1, 2, 3]  # unhashable values are never merged
+    assert table.count.tolist() == [2, 2, 1, 1]
+    assert table.other.tolist() == [2, 3, -1, -1]
+
+
+def test_parameters_that_are_no_integers() -> None:
+    table = ConnectionTable()
+    view = ConnectionView(table, 1)
+    view.extend([connection(2, "DEV_B", ConnectionType.EXTERNAL), connection(2, None)])
+    assert view[0][FrameworkKey.CONNECTION_PARAMETER] == "DEV_B"
+    assert view[1][FrameworkKey.CONNECTION_PARAMETER] is None
+    view[0][FrameworkKey.CONNECTION_PARAMETER] = 7
+    assert view[0][FrameworkKey.CONNECTION_PARAMETER] == 7
+    assert table.param.tolist() == [7, -1]
+
+
+def test_connection_matrix() -> None:
+    collector = DeviceDataCollector()
+    for family, other_family in ((1, "DEV_B"), ("DEV_B", 1)):
+        device = {"pins": [], "connections": ConnectionTable()}
+        for pin in range(3):
+            view = ConnectionView(device["connections"], pin)
+            view.append(connection(2 - pin, other_family, ConnectionType.EXTERNAL))
+            view.append(connection(pin, 0))
+            device["pins"].append({"pin": pin, "connections": view})
+        collector.set_device(family, device)
+    for family, other_family in ((1, "DEV_B"), ("DEV_B", 1)):
+        matrix = collector.create_connection_matrix(family, other_family)
+        assert matrix.to_numpy().tolist() == [[0, 0, 1], [0, 1, 0], [1, 0, 0]]
+
+
+def test_external_connections_of_fleet() -> None:
+    rng = random.Random(0)
+    collector = DeviceDataCollector()
+    devices = [VirtualDevice(f"DEV{index}", pins=8, sessions=2, seed=index) for index in range(4)]
+    for device in devices:
+        for connections in device.connections:
+            other = rng.randrange(5)  # DEV4 is unknown
+            connections.append(
+                connection(rng.randrange(10), f"DEV{other}", ConnectionType.EXTERNAL)
+            )
+        collector.process_header(Packet.from_raw(device.header()))
+        for session in range(device.sessions):
+            for chunk_id in range(device.total_chunks):
+                collector.process_chunk(Packet.from_raw(device.chunk(session, chunk_id), chunk_id))
+
+    for family_a, device_a in collector.devices.items():
+        for family_b, device_b in collector.devices.items():
+            pins_b = [pin["pin"] for pin in device_b["pins"]]
+            expected = [[0] * len(pins_b) for _ in device_a["pins"]]
+            for row, pin in enumerate(device_a["pins"]):
+                for conn in pin["connections"]:
+                    other = conn[FrameworkKey.OTHER_PIN]
+                    if conn[FrameworkKey.CONNECTION_PARAMETER] == family_b and other in pins_b:
+                        expected[row][pins_b.index(other)] = 1
+            matrix = collector.create_connection_matrix(family_a, family_b)
+            assert matrix.to_numpy().tolist() == expected
+
+    collector.process_header(Packet.from_raw(devices[0].header()))  # device restarts
+    edges = collector.external_connections.edges
+    assert not [key for key in edges if key[0] == "DEV0"]
+    assert [key for key in edges if key[1] == "DEV0"]
@@ -0,0 +1,184 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from bistmon.config_framework import ConnectionType
+from bistmon.config_framework import FrameworkKey
+from bistmon.data_storage import PHASE_ERROR_EVENTS
+from bistmon.data_storage import DeviceDataCollector
+from bistmon.data_storage import get_pin_index
+from bistmon.event_decoder import EVENT_MASKS
+from bistmon.packet import Packet
+from bistmon.pin_analyzer import analyze_pin_mask
+from bistmon.simulator import VirtualDevice
+
+from tests.conftest import path_here
+
+
+@pytest.mark.parametrize("recording", sorted(path_here.glob("raw_*.xml")))
+def test_pin_index(recording: Path) -> None:
+    collector = DeviceDataCollector()
+    collector.load_from_xml(recording)
+    for device in collector.devices.values():
+        index = device["pin_index"]
+        assert list(index.values()) == device["pins"]
+        assert all(index[pin["pin"]] is pin for pin in device["pins"])
+        del device["pin_index"]
+        assert get_pin_index(device) == index
+
+
+@pytest.mark.parametrize("recording", sorted(path_here.glob("raw_*.xml")))
+def test_pin_strengths(recording: Path) -> None:
+    collector = DeviceDataCollector()
+    collector.load_from_xml(recording)
+    for family, device in collector.devices.items():
+        expected = [analyze_pin_mask(pin["events_mask"]) for pin in device["pins"]]
+        assert None in expected  # undefined strengths stay None
+        assert collector.get_pin_strengths(family) == expected
+
+
+def test_chunk_out_of_range_is_dropped() -> None:
+    device = VirtualDevice(pins=4, sessions=1, seed=0)
+    collector = DeviceDataCollector()
+    collector.process_header(Packet.from_raw(device.header()))
+    # a corrupt PACKET_ID (the CRC only covers the CBOR data)
+    assert not collector.process_chunk(Packet.from_raw(device.chunk(0, 1), 0xFF000001))
+    stored = collector.devices[device.family]
+    assert not stored["received_sessions"]
+    assert not stored["pins"]
+    for chunk_id in range(device.total_chunks):  # the retransmission is taken
+        assert collector.process_chunk(Packet.from_raw(device.chunk(0, chunk_id), chunk_id))
+    assert stored["complete"]
+
+
+@pytest.mark.parametrize("recording", sorted(path_here.glob("raw_*.xml")))
+def test_filter_weak_connections_of_other_device(recording: Path) -> None:
+    collector = DeviceDataCollector()
+    collector.load_from_xml(recording)
+    for family, device in collector.devices.items():
+        expected = [conn["masked"] for pin in device["pins"] for conn in pin["connections"]]
+        collector.current_device_family = "OTHER"  # must not be used for the strengths
+        collector._filter_weak_connections(family)  # noqa: SLF001
+        assert [conn["masked"] for pin in device["pins"] for conn in pin["connections"]] == expected
+        assert device["pin_strengths"] == {pin["pin"]: pin["strength"] for pin in device["pins"]}
+
+
+def reference_phase_matrix(collector: DeviceDataCollector, family: str, phase: int) -> list:
+    """Cell by cell, like the phase matrices were created before the tensor."""
+    device = collector.devices[family]
+    position = {pin["pin"]: index for index, pin in enumerate(device["pins"])}
+    matrix = [[0] * len(position) for _ in position]
+    error_mask = EVENT_MASKS.get(PHASE_ERROR_EVENTS[phase], 0)
+    for pin in device["pins"]:
+        if pin["events_mask"] & error_mask:
+            continue
+        row = matrix[position[pin["pin"]]]
+        row[position[pin["pin"]]] = 1
+        for conn in pin["connections"]:
+            other = conn[FrameworkKey.OTHER_PIN]
+            if (
+                conn[FrameworkKey.CONNECTION_TYPE] == ConnectionType.INTERNAL
+                and conn[FrameworkKey.CONNECTION_PARAMETER] == phase
+                and other in position
+            ):
+                row[position[other]] = 3 if conn["phase_masked"] else 2 if conn["masked"] else 1
+    return matrix
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_phase_tensor(seed: int) -> None:
+    device = VirtualDevice(pins=40, sessions=2, seed=seed)
+    device.events = [mask | (seed << 8) for mask in device.events]  # pins not working
+    device.connections[0].append(  # self-connection and unknown pin
+        {FrameworkKey.OTHER_PIN: 0, FrameworkKey.CONNECTION_PARAMETER: 2}
+    )
+    device.connections[1].append({FrameworkKey.OTHER_PIN: 99, FrameworkKey.CONNECTION_PARAMETER: 2})
+    collector = DeviceDataCollector()
+    collector.process_header(Packet.from_raw(device.header()))
+    for session in range(device.sessions):
+        for chunk_id in range(device.total_chunks):
+            collector.process_chunk(Packet.from_raw(device.chunk(session, chunk_id), chunk_id))
+    collector._apply_phase_masking(device.family)  # noqa: SLF001
+    tensor = collector.create_phase_tensor(device.family)
+    assert tensor.dtype == np.uint8
+    for phase in range(6):
+        expected = reference_phase_matrix(collector, device.family, phase)
+        assert tensor[phase].tolist() == expected
+        assert collector.create_phase_matrix(device.family, phase).to_numpy().tolist() == expected
+
+
+def test_incremental_masking() -> None:
+    device = VirtualDevice(pins=40, sessions=1, seed=0)
+    later = VirtualDevice(pins=40, sessions=1, seed=1)  # other strengths
+    phase = FrameworkKey.CONNECTION_PARAMETER
+    later.connections = [  # other phases of the same pin pairs
+        [{**conn, phase: (conn[phase] + 2) % 6} for conn in connections]
+        for connections in device.connections
+    ]
+    packets = [device.chunk(0, chunk_id) for chunk_id in range(device.total_chunks)]
+    packets += [
+        later.chunk(session, chunk_id)
+        for session in (1, 2)
+        for chunk_id in range(later.total_chunks)
+    ]
+    collector = DeviceDataCollector()
+    reference = DeviceDataCollector()  # masks everything from scratch
+    for chunk_id, packet in enumerate(packets):
+        for each in (collector, reference):
+            if not chunk_id:
+                each.process_header(Packet.from_raw(device.header()))
+            each.process_chunk(Packet.from_raw(packet, chunk_id % device.total_chunks))
+        reference.devices[device.family].pop("phase_pairs", None)
+        reference._filter_weak_connections(device.family)  # noqa: SLF001
+        for each in (collector, reference):
+            each._apply_phase_masking(device.family)  # noqa: SLF001
+        table = collector.devices[device.family]["connections"]
+        expected = reference.devices[device.family]["connections"]
+        assert collector.devices[device.family]["complete"] == (chunk_id >= device.total_chunks - 1)
+        assert table.phase_masked.tolist() == expected.phase_masked.tolist()
+        if collector.devices[device.family]["complete"]:
+            assert table.masked.tolist() == expected.masked.tolist()
+    assert table.phase_masked.any()
+
+
+def test_derived_data_cache(tmp_path: Path, monkeypatch) -> None:  # noqa: ANN001
+    monkeypatch.chdir(tmp_path)  # reports are saved to ./logs
+    device = VirtualDevice(pins=16, sessions=2, seed=0)
+    collector = DeviceDataCollector()
+    collector.process_header(Packet.from_raw(device.header()))
+    for session in range(device.sessions):
+        for chunk_id in range(device.total_chunks - 1):
+            collector.process_chunk(Packet.from_raw(device.chunk(session, chunk_id), chunk_id))
+    tensor = collector.create_phase_tensor(device.family)
+    assert collector.create_phase_tensor(device.family) is tensor
+    assert collector.cache_stats == {"hits": 1, "misses": 1, "entries": 1}
+
+    for session in range(device.sessions):  # completes the device
+        chunk_id = device.total_chunks - 1
+        collector.process_chunk(Packet.from_raw(device.chunk(session, chunk_id), chunk_id))
+    assert collector.create_phase_tensor(device.family) is not tensor
+    misses = collector.cache_misses
+    collector.save_device_report(device.family)
+    collector.manual_save()
+    assert collector.cache_misses == misses + 2  # strengths and vectors, once
+    assert collector.cache_hits > 1
+
+
+@pytest.mark.parametrize(
+    ("recording", "expected"),
+    [
+        (
+            "raw_data_2025_11_22_19_54_21.xml",
+            "2cc1f6380756e3822b2b4ff97a6b3721844e44a5191eaea7636e5ce5ee7c8d1c",
+        ),
+        (
+            "raw_data_2025_11_26_11_31_04.xml",
+            "d0507d0bee009463be3712936a72973d2ee4c6d4bbff7a0b501ed4e59b9d0749",
+        ),
+    ],
+)
+def test_report_hash(recording: str, expected: str) -> None:
+    collector = DeviceDataCollector()
+    collector.load_from_xml(path_here / recording)
+    (family,) = collector.devices
+    assert collector.report_hash(family) == expected
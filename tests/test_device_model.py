@@ -0,0 +1,40 @@
+import pickle
+
+import pytest
+from bistmon.data_storage import DeviceDataCollector
+from bistmon.device_model import Device
+from bistmon.device_model import Pin
+from bistmon.packet import Packet
+from bistmon.simulator import VirtualDevice
+
+
+def test_dict_compatible_access() -> None:
+    device = Device(total_chunks=3, expected_sessions=2, raw_header=b"", uuid=1, git_commit=None)
+    assert device["outstanding_chunks"] == 6
+    assert device.get("pin_strengths") is None
+    assert "phase_pairs" not in device
+    device["phase_pairs"] = (0, None, None)
+    assert device.pop("phase_pairs") == (0, None, None)
+    assert device.pop("phase_pairs", None) is None
+    assert "items" not in device  # methods are no fields
+    with pytest.raises(KeyError):
+        device["unknown"] = 1
+    pin = Pin(4, events_mask=0, strength=None, connections=[])
+    assert dict(pin) == {"pin": 4, "events_mask": 0, "strength": None, "connections": []}
+
+
+def test_devices_of_collector() -> None:
+    simulated = VirtualDevice(pins=16, sessions=2, seed=0)
+    collector = DeviceDataCollector()
+    collector.process_header(Packet.from_raw(simulated.header()))
+    for session in range(simulated.sessions):
+        for chunk_id in range(simulated.total_chunks):
+            collector.process_chunk(Packet.from_raw(simulated.chunk(session, chunk_id), chunk_id))
+    device = collector.devices[simulated.family]
+    assert isinstance(device, Device)
+    assert device["complete"]
+    assert all(isinstance(pin, Pin) for pin in device["pins"])
+
+    copy = pickle.loads(pickle.dumps(device))  # like devices sent by workers
+    assert dict(copy).keys() == dict(device).keys()
+    assert [pin["events_mask"] for pin in copy["pins"]] == simulated.events
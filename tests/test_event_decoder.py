@@ -0,0 +1,15 @@
+import random
+
+from bistmon.event_decoder import PIN_EVENT_TYPES
+from bistmon.event_decoder import decode_event_type_one_hot
+
+
+def test_decode_event_type_one_hot() -> None:
+    rng = random.Random(0)
+    for event_bits in [0, 0xFFFFFFFF, 1 << 40, *(rng.getrandbits(32) for _ in range(1000))]:
+        expected = [
+            PIN_EVENT_TYPES.get(bit, f"UNKNOWN_EVENT_{bit}")
+            for bit in range(32)
+            if event_bits & (1 << bit)
+        ]
+        assert decode_event_type_one_hot(event_bits) == expected
@@ -0,0 +1,88 @@
+import random
+
+import pytest
+from bistmon.framing import CHUNK_END
+from bistmon.framing import CHUNK_START
+from bistmon.framing import HEADER_START
+from bistmon.framing import DebugLineExtractor
+from bistmon.framing import FrameParser
+from bistmon.framing import FrameType
+from bistmon.framing import encode_frame
+
+
+def collect(framer: FrameParser, reads: list[bytes]) -> list[tuple[FrameType, bytes]]:
+    return [(kind, bytes(payload)) for data in reads for kind, payload in framer.feed(data)]
+
+
+def test_framer_extracts_header_and_chunk() -> None:
+    stream = (
+        b"DEBUG: boot\n"
+        + encode_frame(FrameType.HEADER, b"\xa1\x01\x02")
+        + b"noise"
+        + encode_frame(FrameType.CHUNK, b"\xa1\x00\x00", packet_id=7)
+    )
+    frames = collect(FrameParser(), [stream])
+    assert [kind for kind, _ in frames] == [FrameType.HEADER, FrameType.CHUNK]
+    assert frames[1][1][:4] == (7).to_bytes(4, "little")
+
+
+@pytest.mark.parametrize("read_size", [1, 3, 5, 64, 4096])
+def test_framer_is_independent_of_read_size(read_size: int) -> None:
+    rng = random.Random(read_size)
+    stream = b"".join(
+        encode_frame(FrameType.CHUNK, rng.randbytes(rng.randrange(1, 200)), packet_id=i)
+        + rng.randbytes(rng.randrange(10))
+        for i in range(200)
+    )
+    reference = collect(FrameParser(), [stream])
+    reads = [stream[i : i + read_size] for i in range(0, len(stream), read_size)]
+    assert collect(FrameParser(compact_threshold=16), reads) == reference
+
+
+def test_framer_ignores_end_marker_in_payload() -> None:
+    payload = b"\x45" + CHUNK_END + HEADER_START
+    frames = collect(FrameParser(), [encode_frame(FrameType.CHUNK, payload, packet_id=1)])
+    assert len(frames) == 1
+    assert frames[0][1][6:-4] == payload
+
+
+def test_framer_resyncs_after_corrupt_frame() -> None:
+    corrupt = bytearray(encode_frame(FrameType.CHUNK, b"\xa0", packet_id=1))
+    corrupt[8] += 1  # wrong LENGTH
+    valid = encode_frame(FrameType.CHUNK, b"\xa0", packet_id=2)
+    framer = FrameParser()
+    frames = collect(framer, [bytes(corrupt) + valid + CHUNK_START])
+    assert [payload[:4] for _, payload in frames] == [(2).to_bytes(4, "little")]
+    assert framer.resyncs == 1
+    assert framer.receiving
+
+
+@pytest.mark.parametrize("length", [0x1234, 1000])
+@pytest.mark.parametrize("read_size", [1, 7, 64])
+def test_framer_resyncs_early_after_corrupt_length(length: int, read_size: int) -> None:
+    corrupt = bytearray(encode_frame(FrameType.CHUNK, b"\xa1\x00\x00", packet_id=0))
+    corrupt[8:10] = length.to_bytes(2, "little")  # above and below max_length
+    framer = FrameParser()
+    assert collect(framer, [bytes(corrupt)]) == []
+    for packet_id in range(1, 200):
+        frame = encode_frame(FrameType.CHUNK, bytes(30), packet_id=packet_id)
+        frames = collect(
+            framer, [frame[i : i + read_size] for i in range(0, len(frame), read_size)]
+        )
+        # every valid frame is handed out (and ACKed) at once, not after up to 64 KiB
+        assert [payload[:4] for _, payload in frames] == [packet_id.to_bytes(4, "little")]
+    assert framer.resyncs == 1
+    assert not framer.receiving
+
+
+@pytest.mark.parametrize("read_size", [1, 4, 4096])
+def test_debug_lines_are_extracted_across_reads(read_size: int) -> None:
+    stream = (
+        b"DEBUG: boot\n"
+        + encode_frame(FrameType.CHUNK, b"DEBUG: in payload", packet_id=1)
+        + b"INFO: skipped\n  DEBUG: indented \nDEBUG: unfinished"
+    )
+    extractor = DebugLineExtractor()
+    reads = [stream[i : i + read_size] for i in range(0, len(stream), read_size)]
+    lines = [line for data in reads for line in extractor.feed(data)]
+    assert lines == ["DEBUG: boot", "DEBUG: indented"]
@@ -0,0 +1,85 @@
+import os
+import queue
+import select
+import sys
+import threading
+
+import cbor2
+import pytest
+from bistmon.ack_writer import ACK_START
+from bistmon.config_framework import FrameworkKey
+from bistmon.config_framework import HeaderKey
+from bistmon.framing import FrameType
+from bistmon.framing import calculate_crc
+from bistmon.framing import encode_frame
+from bistmon.multi_monitor import MultiPortMonitor
+from bistmon.multi_monitor import PortSession
+from bistmon.replay import NullSerial
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs pseudo-terminals")
+def test_multi_monitor_serves_every_port() -> None:
+    ptys = [os.openpty() for _ in range(3)]
+    monitor = MultiPortMonitor([os.ttyname(slave) for _, slave in ptys], interactive=False)
+    monitor.open()
+    thread = threading.Thread(target=monitor.run)
+    thread.start()
+    try:
+        for index, (master, _) in enumerate(ptys):
+            cbor_bytes = cbor2.dumps(
+                {HeaderKey.DEVICE_FAMILY: f"DEV{index}", HeaderKey.ACK_REQUESTED: 1}
+            )
+            os.write(master, encode_frame(FrameType.HEADER, cbor_bytes))
+            ack = os.read(master, 12)
+            assert ack[:4] == ACK_START.to_bytes(4, "little")
+            assert ack[4:8] == calculate_crc(cbor_bytes).to_bytes(4, "little")
+    finally:
+        monitor.stop()
+        thread.join()
+        monitor.close()
+        for master, slave in ptys:
+            os.close(master)
+            os.close(slave)
+
+    # every port has its own collector
+    for index, session in enumerate(monitor.sessions):
+        assert list(session.collector.devices) == [f"DEV{index}"]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs pseudo-terminals")
+def test_multi_monitor_keeps_running_without_stdin() -> None:
+    master, slave = os.openpty()
+    read_end, write_end = os.pipe()
+    os.close(write_end)  # EOF, like stdin of nohup or systemd
+    monitor = MultiPortMonitor([os.ttyname(slave)], interactive=False)
+    monitor.command_source = os.fdopen(read_end)
+    monitor.open()
+    thread = threading.Thread(target=monitor.run)
+    thread.start()
+    try:
+        cbor_bytes = cbor2.dumps({HeaderKey.DEVICE_FAMILY: "DEV", HeaderKey.ACK_REQUESTED: 1})
+        os.write(master, encode_frame(FrameType.HEADER, cbor_bytes))
+        assert select.select([master], [], [], 5)[0], "monitor stopped on EOF"
+        assert os.read(master, 12)[:4] == ACK_START.to_bytes(4, "little")
+        assert thread.is_alive()
+    finally:
+        monitor.stop()
+        thread.join()
+        monitor.close()
+        monitor.command_source.close()
+        os.close(master)
+        os.close(slave)
+
+
+def test_port_session_does_not_ack_chunk_out_of_range() -> None:
+    serial = NullSerial("port")
+    packet_queue: queue.SimpleQueue = queue.SimpleQueue()
+    session = PortSession(serial, packet_queue, debug_lines=False)
+    header = {HeaderKey.DEVICE_FAMILY: "DEV", HeaderKey.TOTAL_CHUNKS: 2, HeaderKey.ACK_REQUESTED: 1}
+    chunk = cbor2.dumps({HeaderKey.ACK_REQUESTED: 1, FrameworkKey.PINS: []})
+    session.feed(encode_frame(FrameType.HEADER, cbor2.dumps(header)))
+    session.feed(encode_frame(FrameType.CHUNK, chunk, packet_id=0xFF000001))  # corrupt PACKET_ID
+    session.feed(encode_frame(FrameType.CHUNK, chunk, packet_id=1))
+    assert serial.bytes_written == 2 * 12  # header and the valid chunk
+    queued = [packet_queue.get_nowait()[2] for _ in range(packet_queue.qsize())]
+    assert [packet.chunk_id for packet in queued[1:]] == [1]
@@ -0,0 +1,51 @@
+import cbor2
+from bistmon.config_framework import FrameworkKey
+from bistmon.config_framework import HeaderKey
+from bistmon.framing import FrameParser
+from bistmon.framing import FrameType
+from bistmon.framing import encode_frame
+from bistmon.packet import parse_packet
+from bistmon.packet import pin_records
+
+
+def test_parse_chunk_packet() -> None:
+    cbor = cbor2.dumps({FrameworkKey.CHUNK_ID: 3, HeaderKey.ACK_REQUESTED: 1})
+    frame = encode_frame(FrameType.CHUNK, cbor, packet_id=42)
+    packets = [
+        parse_packet(payload, has_packet_id=True) for _, payload in FrameParser().feed(frame)
+    ]
+    assert len(packets) == 1
+    packet = packets[0]
+    assert packet is not None
+    assert packet.packet_id == 42
+    assert packet.data == {FrameworkKey.CHUNK_ID: 3, HeaderKey.ACK_REQUESTED: 1}
+    assert packet.hash_valid
+    assert packet.ack_requested == 1
+    assert packet.raw_bytes == cbor
+
+
+def test_parse_packet_detects_crc_error() -> None:
+    payload = bytearray(encode_frame(FrameType.HEADER, cbor2.dumps({1: "NRF"}))[4:-4])
+    payload[-1] ^= 0xFF
+    packet = parse_packet(payload)
+    assert packet is not None
+    assert not packet.hash_valid
+    assert packet.packet_id == -1
+
+
+def test_pin_records() -> None:
+    connection = {FrameworkKey.OTHER_PIN: 3, FrameworkKey.CONNECTION_PARAMETER: "DEV_B"}
+    data = {
+        FrameworkKey.PINS: [
+            {
+                FrameworkKey.PIN: 1,
+                FrameworkKey.EVENTS: 0x30,
+                FrameworkKey.CONNECTIONS: [connection],
+            },
+            {FrameworkKey.PIN: 2},
+        ]
+    }
+    records = pin_records(cbor2.loads(cbor2.dumps(data)))
+    assert records == [(1, 0x30, [(1, 3, "DEV_B", 0)]), (2, 0, [])]
+    assert records[0].events_mask == 0x30
+    assert pin_records({}) == []
@@ -0,0 +1,26 @@
+import random
+
+import numpy as np
+from bistmon.event_decoder import decode_event_type_one_hot
+from bistmon.pin_analyzer import CHECK_MASKS
+from bistmon.pin_analyzer import UNKNOWN_STRENGTH
+from bistmon.pin_analyzer import analyze_pin
+from bistmon.pin_analyzer import analyze_pin_mask
+from bistmon.pin_analyzer import analyze_pin_masks
+
+
+def test_analyze_pin_mask() -> None:
+    step_bits = [mask for pair in CHECK_MASKS for mask in pair]
+    for combination in range(1 << len(step_bits)):
+        events_mask = sum(bit for index, bit in enumerate(step_bits) if combination >> index & 1)
+        events = decode_event_type_one_hot(events_mask)
+        assert analyze_pin_mask(events_mask) == analyze_pin(events)
+
+
+def test_analyze_pin_masks() -> None:
+    rng = random.Random(0)
+    events_masks = [*range(0, 1 << 26, 1 << 13), *(rng.getrandbits(32) for _ in range(1000))]
+    expected = [analyze_pin(decode_event_type_one_hot(mask)) for mask in events_masks]
+    assert [analyze_pin_mask(mask) for mask in events_masks] == expected
+    strengths = analyze_pin_masks(np.array(events_masks, dtype=np.int64))
+    assert strengths.tolist() == [UNKNOWN_STRENGTH if s is None else s for s in expected]
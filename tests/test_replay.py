@@ -0,0 +1,66 @@
+import base64
+from pathlib import Path
+
+import defusedxml.ElementTree as eTree
+import pytest
+from bistmon.capture import CaptureWriter
+from bistmon.data_storage import DeviceDataCollector
+from bistmon.framing import FrameType
+from bistmon.framing import encode_frame
+from bistmon.multi_monitor import PortSession
+from bistmon.replay import Replay
+from bistmon.replay import replay_capture
+
+from tests.conftest import path_here
+
+
+def capture_recording(recording: Path, capture: Path, block_size: int = 37) -> None:
+    """Re-frame a XML recording like a device would send it, interleaved with DEBUG text."""
+    data = bytearray(b"DEBUG: booting\n")
+    for device in eTree.parse(recording).getroot().find("Devices").findall("Device"):
+        for element in device.findall("RawData"):
+            raw = base64.b64decode(element.text)
+            if element.get("Type") == "Header":
+                data += encode_frame(FrameType.HEADER, raw)
+            else:
+                data += encode_frame(FrameType.CHUNK, raw, int(element.get("ChunkId")))
+            data += b"DEBUG: next\n"
+    with CaptureWriter(capture) as writer:
+        port = writer.add_port("/dev/ttyACM0")
+        for position in range(0, len(data), block_size):
+            writer.write(port, bytes(data[position : position + block_size]))
+
+
+@pytest.mark.parametrize("recording", sorted(path_here.glob("raw_*.xml")))
+def test_replay_matches_recording(recording: Path, tmp_path: Path, monkeypatch) -> None:  # noqa: ANN001
+    monkeypatch.chdir(tmp_path)  # device-reports are saved to ./logs
+    capture_recording(recording, tmp_path / "capture.bin")
+    replay = replay_capture(tmp_path / "capture.bin", debug_lines=False)
+
+    reference = DeviceDataCollector()
+    reference.load_from_xml(recording)
+    collector = replay.collectors["/dev/ttyACM0"]
+    assert collector.devices.keys() == reference.devices.keys()
+    for family, device in reference.devices.items():
+        assert collector.devices[family]["complete"] == device["complete"]
+        for phase in range(6):
+            expected = reference.create_phase_matrix(family, phase)
+            assert collector.create_phase_matrix(family, phase).equals(expected)
+    assert replay.sessions["/dev/ttyACM0"].framer.resyncs == 0
+
+
+@pytest.mark.parametrize("error", [RuntimeError, KeyboardInterrupt])
+def test_replay_keeps_error(error: type[BaseException], tmp_path: Path, monkeypatch) -> None:  # noqa: ANN001
+    capture_recording(min(path_here.glob("raw_*.xml")), tmp_path / "capture.bin")
+    fed = []
+
+    def feed(_session: PortSession, data: bytes) -> None:
+        fed.append(data)
+        if len(fed) == 10:
+            raise error
+
+    monkeypatch.setattr(PortSession, "feed", feed)
+    replay = Replay(tmp_path / "capture.bin", debug_lines=False)
+    with pytest.raises(error):  # not hidden by a BufferError of the mmap
+        replay.run()
+    assert len(fed) == 10
@@ -0,0 +1,44 @@
+import threading
+
+from bistmon.ring_buffer import ByteRingBuffer
+from bistmon.ring_buffer import OverflowPolicy
+
+
+def test_ring_buffer_coalesces_and_wraps() -> None:
+    ring = ByteRingBuffer(capacity=8, policy=OverflowPolicy.BLOCK)
+    ring.put(b"abcdef")
+    assert ring.get(max_size=4) == b"abcd"
+    ring.put(b"ghi")
+    ring.put(b"jk")
+    assert ring.fill_level == 7
+    assert ring.get() == b"efghijk"
+    assert ring.high_water == 7
+    assert ring.get(timeout=0.01) == b""
+
+
+def test_ring_buffer_drop_counts_bytes() -> None:
+    ring = ByteRingBuffer(capacity=4, policy=OverflowPolicy.DROP)
+    assert ring.put(b"abcdef") == 4
+    assert ring.bytes_dropped == 2
+    assert ring.get() == b"abcd"
+
+
+def test_ring_buffer_grows() -> None:
+    ring = ByteRingBuffer(capacity=4, policy=OverflowPolicy.GROW)
+    ring.put(b"abc")
+    assert ring.get(max_size=2) == b"ab"
+    ring.put(b"defghij")
+    assert ring.capacity >= 8
+    assert ring.get() == b"cdefghij"
+
+
+def test_ring_buffer_blocks_until_reader_makes_room() -> None:
+    ring = ByteRingBuffer(capacity=4, policy=OverflowPolicy.BLOCK)
+    writer = threading.Thread(target=ring.put, args=(b"abcdefgh",))
+    writer.start()
+    received = b""
+    while len(received) < 8:
+        received += ring.get(timeout=1)
+    writer.join()
+    assert received == b"abcdefgh"
+    assert ring.writes_blocked >= 1
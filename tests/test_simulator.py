@@ -0,0 +1,58 @@
+import sys
+import threading
+
+import pytest
+from bistmon.framing import FrameParser
+from bistmon.framing import FrameType
+from bistmon.multi_monitor import MultiPortMonitor
+from bistmon.packet import parse_packet
+from bistmon.simulator import SimulatedPort
+from bistmon.simulator import Simulator
+from bistmon.simulator import VirtualDevice
+
+
+def test_virtual_device_frames_decode() -> None:
+    device = VirtualDevice(pins=5, sessions=2, pins_per_chunk=2, seed=1)
+    framer = FrameParser()
+    packets = [
+        (frame_type, parse_packet(payload, has_packet_id=frame_type == FrameType.CHUNK))
+        for frame in device.frames()
+        for frame_type, payload in framer.feed(frame)
+    ]
+    assert len(packets) == 1 + 2 * 3
+    assert all(packet.hash_valid and packet.ack_requested for _, packet in packets)
+    assert packets[0][1].data[1] == "NRF52840"
+    assert [packet.packet_id for _, packet in packets[1:]] == [0, 1, 2, 0, 1, 2]
+    assert [pin[4] for pin in packets[-1][1].data[2]] == [4]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs pseudo-terminals")
+def test_simulator_retransmits_through_noise(tmp_path, monkeypatch) -> None:  # noqa: ANN001
+    monkeypatch.chdir(tmp_path)  # device-reports are saved to ./logs
+    ports = [
+        SimulatedPort(
+            VirtualDevice(pins=16, sessions=2, seed=index), ack_timeout=0.05, retries=20, noise=0.3
+        )
+        for index in range(2)
+    ]
+    monitor = MultiPortMonitor([port.name for port in ports], interactive=False)
+    monitor.open()
+    thread = threading.Thread(target=monitor.run)
+    thread.start()
+    simulator = Simulator(ports)
+    try:
+        simulator.run()
+    finally:
+        monitor.stop()
+        thread.join()
+        monitor.close()
+        simulator.close()
+
+    for port, session in zip(ports, monitor.sessions, strict=True):
+        assert port.finished
+        assert port.failures == 0
+        assert port.acks == 1 + 2 * 8
+        device = session.collector.devices["NRF52840"]
+        assert device["complete"]
+        assert len(device["pins"]) == 16
+    assert sum(port.retransmissions for port in ports) > 0
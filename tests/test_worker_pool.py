@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+import cbor2
+import pytest
+from bistmon.config_framework import FrameworkKey
+from bistmon.config_framework import HeaderKey
+from bistmon.framing import FrameType
+from bistmon.framing import encode_frame
+from bistmon.worker_pool import WorkerPool
+from bistmon.worker_pool import shard_ports
+
+
+def test_shard_ports_round_robin() -> None:
+    assert shard_ports(["a", "b", "c", "d", "e"], 2) == [["a", "c", "e"], ["b", "d"]]
+    assert shard_ports(["a"], 4) == [["a"]]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs pseudo-terminals")
+def test_worker_pool_streams_completed_devices(tmp_path: Path, monkeypatch) -> None:  # noqa: ANN001
+    monkeypatch.chdir(tmp_path)  # the coordinator saves the device-reports to ./logs
+    ptys = [os.openpty() for _ in range(3)]
+    ports = [os.ttyname(slave) for _, slave in ptys]
+    pool = WorkerPool(ports, n_workers=2, interactive=False)
+    pool.start()
+    try:
+        for index, (master, _) in enumerate(ptys):
+            header = {HeaderKey.DEVICE_FAMILY: f"DEV{index}", HeaderKey.TOTAL_CHUNKS: 1}
+            chunk = {FrameworkKey.CHUNK_ID: 0, FrameworkKey.PINS: [{FrameworkKey.PIN: 1}]}
+            os.write(master, encode_frame(FrameType.HEADER, cbor2.dumps(header)))
+            os.write(master, encode_frame(FrameType.CHUNK, cbor2.dumps(chunk), packet_id=0))
+        deadline = time.monotonic() + 30  # includes start of the workers
+        while pool.devices_completed < len(ports) and time.monotonic() < deadline:
+            pool.poll(timeout=0.1)
+    finally:
+        pool.stop()
+        for master, slave in ptys:
+            os.close(master)
+            os.close(slave)
+
+    for index, port in enumerate(ports):
+        device = pool.collectors[port].devices[f"DEV{index}"]
+        assert device["complete"]
+        assert device["pins"][0]["pin"] == 1
+        assert device["saved"]
+    reports = sorted(path.name.split("_")[1] for path in (tmp_path / "logs").iterdir())
+    assert reports == [f"DEV{index}" for index in range(len(ports))]  # one report per device
+    assert set(pool.port_stats) == set(ports)